@@ -0,0 +1,150 @@
+"""
+Dependency-graph executor for the multi-agent career analysis.
+
+Each node is an agent step with the names of the nodes whose outputs it reads.
+`AgentGraph.run()` starts every node as soon as its dependencies have
+finished, on a bounded thread pool, so independent LLM calls overlap and the
+wall time is the critical path instead of the sum of all steps.
+
+A node function gets a snapshot of the shared context and its own `out`
+dict (same shape as the final results: an "agents_status" map plus result
+keys). It returns the context values it produces. Its `out` is merged into
+the results only when it finishes in time, so a node that overruns its
+timeout and completes later cannot overwrite what was already reported. A
+failed or timed-out node gets `failed: ...` as its status, and its
+`fallback(ctx, error)` value stands in for its output so dependents still run.
+
+`on_event`, if given, is called from the coordinating thread when a node
+starts ({"type": "status", ...}) and when it finishes, fails or times out
+({"type": "agent", ...} with the result keys it contributed), so callers can
+stream partial results.
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentNode:
+    name: str
+    fn: Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]
+    output: str
+    deps: Tuple[str, ...] = ()
+    timeout: float = 150.0
+    fallback: Optional[Callable[[Dict[str, Any], str], Any]] = None
+    started_at: float = field(default=0.0, repr=False)
+
+
+class AgentGraph:
+    def __init__(self, max_workers: int = 4, default_timeout: float = 150.0):
+        self.max_workers = max(1, max_workers)
+        self.default_timeout = default_timeout
+        self.nodes: Dict[str, AgentNode] = {}
+
+    def add(self, name: str, fn, output: str, deps=(), timeout: Optional[float] = None, fallback=None):
+        self.nodes[name] = AgentNode(
+            name=name,
+            fn=fn,
+            output=output,
+            deps=tuple(deps),
+            timeout=timeout or self.default_timeout,
+            fallback=fallback,
+        )
+        return self
+
+    @staticmethod
+    def _call(node: AgentNode, ctx: Dict[str, Any]):
+        out: Dict[str, Any] = {"agents_status": {}}
+        try:
+            return out, node.fn(ctx, out) or {}
+        finally:
+            # Worker threads open their own DB connections (e.g. job matching)
+            connections.close_all()
+
+    def _fail(self, node: AgentNode, ctx: Dict[str, Any], results: Dict[str, Any], error: str) -> Dict[str, Any]:
+        logger.warning(f"Agent {node.name} failed: {error}")
+        results["agents_status"][node.name] = f"failed: {error}"
+        value = node.fallback(ctx, error) if node.fallback else {"error": error}
+        ctx[node.output] = value
+        results[node.output] = value
+        return {node.output: value}
+
+    def run(self, ctx: Dict[str, Any], results: Dict[str, Any], on_event=None) -> Dict[str, Any]:
+        status = results.setdefault("agents_status", {})
+        timing = results.setdefault("agents_timing_ms", {})
+
+        def emit(event: Dict[str, Any]):
+            if on_event is None:
+                return
+            try:
+                on_event(event)
+            except Exception as e:
+                logger.warning(f"Agent event callback failed: {e}")
+
+        def finished_event(node: AgentNode, contributed: Dict[str, Any]):
+            emit({
+                "type": "agent",
+                "agent": node.name,
+                "status": status.get(node.name),
+                "elapsed_ms": timing.get(node.name),
+                "results": contributed,
+                "agents_status": dict(status),
+            })
+
+        pending = dict(self.nodes)
+        running = {}
+        done = set()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="career-agent")
+        try:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    if all(dep in done for dep in node.deps):
+                        status[name] = "running"
+                        node.started_at = time.monotonic()
+                        running[pool.submit(self._call, node, dict(ctx))] = node
+                        del pending[name]
+                        emit({"type": "status", "agent": name, "status": "running", "agents_status": dict(status)})
+                if not running:
+                    for node in pending.values():
+                        contributed = self._fail(node, ctx, results, f"unmet dependencies {', '.join(node.deps)}")
+                        finished_event(node, contributed)
+                    break
+
+                now = time.monotonic()
+                next_deadline = min(node.started_at + node.timeout for node in running.values())
+                finished, _ = wait(list(running), timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    node = running.pop(future)
+                    timing[node.name] = round((time.monotonic() - node.started_at) * 1000)
+                    try:
+                        out, produced = future.result()
+                    except Exception as e:
+                        contributed = self._fail(node, ctx, results, str(e))
+                    else:
+                        status.update(out.pop("agents_status", {}))
+                        results.update(out)
+                        ctx.update(produced)
+                        contributed = out
+                    done.add(node.name)
+                    finished_event(node, contributed)
+
+                now = time.monotonic()
+                for future, node in list(running.items()):
+                    if now - node.started_at >= node.timeout:
+                        # The thread can't be interrupted; its late result is discarded
+                        running.pop(future)
+                        future.cancel()
+                        timing[node.name] = round((now - node.started_at) * 1000)
+                        contributed = self._fail(node, ctx, results, f"timed out after {node.timeout:g}s")
+                        done.add(node.name)
+                        finished_event(node, contributed)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return ctx
@@ -0,0 +1,118 @@
+"""
+Access to a CV's stored chunk vectors.
+
+CVUploadView (via the embedding outbox) writes one vector per CV chunk into
+cv_embeddings and records the text hash, model and dimensions in
+cv_index_state. Match endpoints call `get_cv_vectors()` instead of re-embedding
+the CV text: the stored vectors are returned while the CV text, embedding model
+and dimensions still match, otherwise the CV is re-embedded once, written back
+and recorded so the next call is a plain read.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from decouple import config
+from django.db import connection
+
+from .embedding_models import CVIndexState
+from .rag import chunk_text, content_hash, embed_texts, embedding_identity, embedding_model_name
+from .vector_adapter import from_pg_vector, vector_column
+from .vector_writer import replace_embeddings
+
+logger = logging.getLogger(__name__)
+
+EMB_DIM = config("FIREWORKS_EMBEDDING_DIM", default=None, cast=int)
+
+
+def embed_text_chunks(text: str) -> Tuple[List[List[float]], List[str]]:
+    """Chunk and embed text; returns (usable vectors, per-chunk warnings)."""
+    chunks = chunk_text(text) if text else []
+    embeddings, embed_errors = embed_texts(chunks)
+    vectors, warnings = [], []
+    for i, emb in enumerate(embeddings):
+        if emb is None:
+            warnings.append(f"chunk_{i}: {embed_errors.get(i)}")
+            continue
+        if EMB_DIM and len(emb) != EMB_DIM:
+            warnings.append(f"chunk_{i}: unexpected dim {len(emb)}")
+            continue
+        vectors.append(emb)
+    return vectors, warnings
+
+
+def save_cv_vectors(cv_id, text: str, vectors, warnings):
+    """Replace a CV's cv_embeddings rows and record what was stored."""
+    replace_embeddings("cv_embeddings", cv_id, vectors)
+    if vectors and not warnings:
+        _, _, dims = embedding_identity()
+        CVIndexState.objects.update_or_create(
+            cv_id=cv_id,
+            defaults={
+                "content_hash": content_hash(text),
+                "embedding_model": embedding_model_name(),
+                "dimensions": len(vectors[0]) or dims,
+                "chunk_count": len(vectors),
+            },
+        )
+    else:
+        CVIndexState.objects.filter(cv_id=cv_id).delete()
+
+
+def load_cv_vectors(cv_id) -> List[List[float]]:
+    """Stored chunk vectors of a CV, in insertion order (same shape as embed_texts output)."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as c:
+            c.execute(
+                f"SELECT {vector_column('embedding')} FROM cv_embeddings "
+                "WHERE cv_id = %s AND embedding IS NOT NULL ORDER BY created_at",
+                [str(cv_id)],
+            )
+            rows = [r[0] for r in c.fetchall()]
+    else:
+        from .supabase_models import CVEmbedding
+        rows = list(
+            CVEmbedding.objects.filter(cv_id=cv_id, embedding__isnull=False)
+            .order_by("created_at")
+            .values_list("embedding", flat=True)
+        )
+    vectors = [from_pg_vector(r) for r in rows]
+    return [v.tolist() for v in vectors if v is not None and len(v)]
+
+
+def _is_current(state: Optional[CVIndexState], text: str) -> bool:
+    if state is None:
+        # Vectors written before index state was tracked: the model is unknown
+        return False
+    _, _, dims = embedding_identity()
+    return (
+        state.embedding_model == embedding_model_name()
+        and (dims is None or state.dimensions == dims)
+        and state.content_hash == content_hash(text)
+    )
+
+
+def get_cv_vectors(cv_id, parsed_text: Optional[str] = None) -> List[List[float]]:
+    """
+    Chunk vectors for a stored CV, re-embedding only when they are missing or
+    were built from other text, another model or another dimension.
+    """
+    if parsed_text is None:
+        from .supabase_models import CV
+        parsed_text = CV.objects.filter(id=cv_id).values_list("parsed_text", flat=True).first() or ""
+    if not parsed_text:
+        return []
+
+    state = CVIndexState.objects.filter(cv_id=cv_id).first()
+    if _is_current(state, parsed_text):
+        vectors = load_cv_vectors(cv_id)
+        if vectors and len(vectors) == state.chunk_count:
+            return vectors
+
+    logger.info(f"Stored vectors for CV {cv_id} are missing or stale; re-embedding")
+    vectors, warnings = embed_text_chunks(parsed_text)
+    try:
+        save_cv_vectors(cv_id, parsed_text, vectors, warnings)
+    except Exception as e:
+        # The caller still gets usable vectors; the next call retries the write
+        logger.warning(f"Could not store vectors for CV {cv_id}: {e}")
+    return vectors
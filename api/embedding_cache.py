@@ -0,0 +1,130 @@
+"""
+Content-addressed embedding cache.
+
+Embeddings are keyed by sha256(provider, model, dimensions, normalized text),
+so an unchanged CV or job chunk is embedded once per model no matter how many
+times it is matched. Lookups go through a bounded in-process LRU first and
+then the `embedding_cache` table; provider calls only happen on a miss.
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_ENABLED = config("EMBEDDING_CACHE_ENABLED", default=True, cast=bool)
+EMBEDDING_CACHE_MAX_ENTRIES = config("EMBEDDING_CACHE_MAX_ENTRIES", default=5000, cast=int)
+EMBEDDING_CACHE_PERSIST = config("EMBEDDING_CACHE_PERSIST", default=True, cast=bool)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def cache_key(provider: str, model: str, dimensions: Optional[int], text: str) -> str:
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    fingerprint = f"{provider}\x1f{model}\x1f{dimensions or ''}\x1f{text_hash}"
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, persist: bool = EMBEDDING_CACHE_PERSIST):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._misses = 0
+
+    def _remember(self, key: str, embedding: List[float]):
+        # Caller holds the lock
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                emb = self._entries.get(key)
+                if emb is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = emb
+            self._memory_hits += len(found)
+
+        missing = [k for k in keys if k not in found]
+        if missing and self.persist:
+            try:
+                from .embedding_models import EmbeddingCacheEntry
+                rows = EmbeddingCacheEntry.objects.filter(key__in=missing).values_list("key", "embedding")
+                from_db = {k: emb for k, emb in rows if emb}
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+                from_db = {}
+            with self._lock:
+                for key, emb in from_db.items():
+                    self._remember(key, emb)
+                self._db_hits += len(from_db)
+            found.update(from_db)
+
+        with self._lock:
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, List[float]], provider: str, model: str, dimensions: Optional[int]):
+        if not entries:
+            return
+        with self._lock:
+            for key, emb in entries.items():
+                self._remember(key, emb)
+        if not self.persist:
+            return
+        try:
+            from .embedding_models import EmbeddingCacheEntry
+            EmbeddingCacheEntry.objects.bulk_create(
+                [
+                    EmbeddingCacheEntry(key=key, provider=provider, model=model, dimensions=dimensions, embedding=emb)
+                    for key, emb in entries.items()
+                ],
+                ignore_conflicts=True,
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._memory_hits + self._db_hits
+            lookups = hits + self._misses
+            return {
+                "enabled": EMBEDDING_CACHE_ENABLED,
+                "persist": self.persist,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self._memory_hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+            }
+
+
+_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    return _cache
@@ -0,0 +1,151 @@
+"""
+In-process micro-batching of single-text embedding calls.
+
+Concurrent request threads (e.g. RAGSearchView query embeddings) call
+`embed_text()` one short input at a time. Instead of one provider round-trip
+each, cache misses are submitted here and get a Future back. Worker threads
+wait up to EMBEDDING_DISPATCH_WINDOW_MS after the first pending text,
+collect up to EMBEDDING_DISPATCH_MAX_BATCH texts, and embed them with one
+batched provider call (`rag._embed_texts_uncached`, which still isolates a
+failing input). Identical texts pending or in flight share one Future.
+
+Set EMBEDDING_DISPATCH_ENABLED=False to call the provider directly.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DISPATCH_ENABLED = config("EMBEDDING_DISPATCH_ENABLED", default=True, cast=bool)
+EMBEDDING_DISPATCH_WINDOW_MS = config("EMBEDDING_DISPATCH_WINDOW_MS", default=5.0, cast=float)
+EMBEDDING_DISPATCH_MAX_BATCH = config("EMBEDDING_DISPATCH_MAX_BATCH", default=64, cast=int)
+EMBEDDING_DISPATCH_WORKERS = config("EMBEDDING_DISPATCH_WORKERS", default=2, cast=int)
+EMBEDDING_DISPATCH_TIMEOUT = config("EMBEDDING_DISPATCH_TIMEOUT", default=120, cast=int)
+
+EmbedBatch = Callable[[List[str]], Tuple[List[Optional[List[float]]], Dict[int, str]]]
+
+
+class EmbeddingDispatcher:
+    def __init__(
+        self,
+        embed_batch: EmbedBatch,
+        window_ms: float = EMBEDDING_DISPATCH_WINDOW_MS,
+        max_batch: int = EMBEDDING_DISPATCH_MAX_BATCH,
+        workers: int = EMBEDDING_DISPATCH_WORKERS,
+    ):
+        self._embed_batch = embed_batch
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[str, Future]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._batches = 0
+        self._texts = 0
+        self._deduplicated = 0
+
+    def _ensure_workers(self):
+        # Caller holds the lock. Threads don't survive a fork (e.g. gunicorn --preload)
+        if self._pid == os.getpid() and all(t.is_alive() for t in self._threads):
+            return
+        self._pid = os.getpid()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"embedding-dispatch-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, text: str) -> Future:
+        with self._cond:
+            self._ensure_workers()
+            future = self._pending.get(text) or self._inflight.get(text)
+            if future is not None:
+                self._deduplicated += 1
+                return future
+            future = Future()
+            self._pending[text] = future
+            self._cond.notify()
+            return future
+
+    def embed(self, text: str) -> List[float]:
+        return self.submit(text).result(timeout=EMBEDDING_DISPATCH_TIMEOUT)
+
+    def _take_batch(self) -> List[Tuple[str, Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            # The first text opened the window; give concurrent callers until it closes to join
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                text, future = self._pending.popitem(last=False)
+                self._inflight[text] = future
+                batch.append((text, future))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            embeddings, errors = self._embed_batch(texts)
+        except Exception as e:
+            embeddings, errors = [None] * len(texts), {i: str(e) for i in range(len(texts))}
+        with self._cond:
+            for text in texts:
+                self._inflight.pop(text, None)
+            self._batches += 1
+            self._texts += len(texts)
+        for i, (_, future) in enumerate(batch):
+            if embeddings[i] is None:
+                future.set_exception(RuntimeError(errors.get(i, "embedding failed")))
+            else:
+                future.set_result(embeddings[i])
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "enabled": EMBEDDING_DISPATCH_ENABLED,
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "workers": self.workers,
+                "pending": len(self._pending),
+                "in_flight": len(self._inflight),
+                "batches": self._batches,
+                "texts": self._texts,
+                "deduplicated": self._deduplicated,
+                "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else None,
+            }
+
+
+_dispatcher: Optional[EmbeddingDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_embedding_dispatcher() -> EmbeddingDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            from .rag import _embed_texts_uncached
+
+            _dispatcher = EmbeddingDispatcher(_embed_texts_uncached)
+        return _dispatcher
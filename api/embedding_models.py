@@ -0,0 +1,192 @@
+from django.db import models
+
+
+class EmbeddingCacheEntry(models.Model):
+    """
+    Durable tier of the embedding cache (see api/embedding_cache.py).
+    One row per (provider, model, dimensions, normalized text) fingerprint.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    provider = models.CharField(max_length=50)
+    model = models.CharField(max_length=255)
+    dimensions = models.IntegerField(blank=True, null=True)
+    embedding = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "embedding_cache"
+
+    def __str__(self):
+        return f"{self.provider}/{self.model} ({self.key[:12]})"
+
+
+class JobIndexState(models.Model):
+    """
+    What is currently embedded for a job: the hash of the indexed text and the
+    embedding model that produced its chunks. reindex_job_embeddings skips a
+    job when both still match.
+    """
+    job_id = models.UUIDField(primary_key=True)
+    content_hash = models.CharField(max_length=64)
+    embedding_model = models.CharField(max_length=255)
+    dimensions = models.IntegerField(blank=True, null=True)
+    chunk_count = models.IntegerField(default=0)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "job_index_state"
+
+    def __str__(self):
+        return f"{self.job_id} ({self.embedding_model}, {self.chunk_count} chunks)"
+
+
+class EmbeddingOutboxItem(models.Model):
+    """
+    Pending (re-)embedding of a job or CV, drained by the process_embedding_outbox
+    worker (see api/embedding_outbox.py). One row per owner: enqueueing again
+    while a row is pending just resets it.
+    """
+    KIND_JOB = "job"
+    KIND_CV = "cv"
+    KIND_CHOICES = [(KIND_JOB, "Job"), (KIND_CV, "CV")]
+
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    owner_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    warnings = models.JSONField(default=list, blank=True)
+    available_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "embedding_outbox"
+        unique_together = [("kind", "owner_id")]
+        indexes = [models.Index(fields=["status", "available_at"], name="embedding_outbox_ready_idx")]
+
+    def __str__(self):
+        return f"{self.kind} {self.owner_id} ({self.status})"
+
+
+class CVIndexState(models.Model):
+    """
+    What is currently stored in cv_embeddings for a CV. api.cv_vectors reuses
+    the stored chunk vectors while the text hash, model and dimensions match.
+    """
+    cv_id = models.UUIDField(primary_key=True)
+    content_hash = models.CharField(max_length=64)
+    embedding_model = models.CharField(max_length=255)
+    dimensions = models.IntegerField(blank=True, null=True)
+    chunk_count = models.IntegerField(default=0)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "cv_index_state"
+
+    def __str__(self):
+        return f"{self.cv_id} ({self.embedding_model}, {self.chunk_count} chunks)"
+
+
+class CVJobMatch(models.Model):
+    """
+    Materialized top-K job matches per CV (see api/match_table.py), kept current
+    by rescoring only the CV or job that changed.
+    """
+    cv_id = models.UUIDField()
+    job_id = models.UUIDField()
+    score = models.FloatField()
+    index_version = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "cv_job_matches"
+        unique_together = [("cv_id", "job_id")]
+        indexes = [
+            models.Index(fields=["cv_id", "-score"], name="cv_job_matches_cv_score_idx"),
+            models.Index(fields=["job_id"], name="cv_job_matches_job_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.cv_id} -> {self.job_id} ({self.score:.3f})"
+
+
+class CVMatchState(models.Model):
+    """CVs whose cv_job_matches rows are complete for the given index version."""
+    cv_id = models.UUIDField(primary_key=True)
+    index_version = models.IntegerField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "cv_match_state"
+
+    def __str__(self):
+        return f"{self.cv_id} (v{self.index_version})"
+
+
+class SearchIndexVersion(models.Model):
+    """
+    Counter bumped on every job write; cached search results (see
+    api/search_cache.py) are keyed on it, so a bump invalidates all of them.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "search_index_version"
+
+    def __str__(self):
+        return f"{self.name} (v{self.version})"
+
+
+class VectorIndexMetadata(models.Model):
+    """
+    Shape of an embedding table (see api/index_metadata.py): recomputed by the
+    indexing paths so request-time diagnostics don't have to scan the table.
+    """
+    table_name = models.CharField(max_length=63, primary_key=True)
+    embedding_model = models.CharField(max_length=255, blank=True, default="")
+    dimensions = models.IntegerField(blank=True, null=True)
+    chunk_count = models.BigIntegerField(default=0)
+    active_chunk_count = models.BigIntegerField(default=0)
+    active_job_count = models.BigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "vector_index_metadata"
+
+    def __str__(self):
+        return f"{self.table_name} ({self.embedding_model}, {self.dimensions}d, {self.chunk_count} chunks)"
+
+
+class LLMCacheEntry(models.Model):
+    """
+    Durable tier of the LLM completion cache (see api/llm_cache.py). One row
+    per (model, system prompt, user prompt, temperature, response_format)
+    fingerprint; rows past `expires_at` are ignored and overwritten.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    endpoint = models.CharField(max_length=100)
+    model = models.CharField(max_length=255)
+    response = models.TextField()
+    created_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "llm_cache"
+        indexes = [models.Index(fields=["expires_at"], name="llm_cache_expires_idx")]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.model} ({self.key[:12]})"
@@ -0,0 +1,247 @@
+"""
+DB-backed outbox for embedding jobs and CVs off the request path.
+
+JobViewSet.create and CVUploadView enqueue the saved row and return
+immediately; `python manage.py process_embedding_outbox` claims pending items
+in batches (SELECT ... FOR UPDATE SKIP LOCKED on Postgres, so several workers
+can run side by side), embeds and writes their chunks, and records the result.
+Failed items are retried with exponential backoff up to
+EMBEDDING_OUTBOX_MAX_ATTEMPTS. Clients poll `indexing_status()` through
+GET /api/rag/indexing-status/.
+
+With EMBEDDING_ASYNC=False the endpoints index inline as before.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from decouple import config
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cv_vectors import embed_text_chunks, save_cv_vectors
+from .embedding_models import EmbeddingOutboxItem
+from .index_metadata import refresh_index_metadata, refresh_index_metadata_async
+from .local_vector_index import get_local_index
+from .match_table import forget_jobs, refresh_cv_matches, refresh_job_matches
+from .rag import job_index_text, record_job_index_state, refresh_job_summaries
+from .search_cache import bump_job_index_version
+from .vector_writer import replace_embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_ASYNC = config("EMBEDDING_ASYNC", default=True, cast=bool)
+EMBEDDING_OUTBOX_MAX_ATTEMPTS = config("EMBEDDING_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+EMBEDDING_OUTBOX_LEASE_SECONDS = config("EMBEDDING_OUTBOX_LEASE_SECONDS", default=300, cast=int)
+
+
+# ----- indexing ----------------------------------------------------------
+
+def _embed_all(text: str) -> List[List[float]]:
+    """
+    Vectors for every chunk of `text`, or raise if any chunk failed, so a
+    provider outage leaves the stored chunks alone and the item is retried.
+    """
+    vectors, warnings = embed_text_chunks(text)
+    if warnings:
+        raise RuntimeError(f"{len(warnings)} chunk(s) failed to embed: {'; '.join(warnings[:3])}")
+    if text.strip() and not vectors:
+        raise RuntimeError("embedding produced no vectors")
+    return vectors
+
+
+def index_job(job_id) -> List[str]:
+    """
+    Embed a job's current text and replace its chunks. Returns warnings for
+    outcomes a retry cannot change; embedding failures raise.
+    """
+    from .supabase_models import Job
+
+    job = Job.objects.filter(id=job_id).values("title", "description", "requirements", "is_active").first()
+    if job is None:
+        forget_jobs([job_id])
+        return [f"job {job_id} no longer exists"]
+    if not job["is_active"]:
+        # Chunks stay for a later reactivation; the job just leaves every CV's matches
+        forget_jobs([job_id])
+        return []
+    text = job_index_text(job["title"], job["description"], job["requirements"])
+    vectors = _embed_all(text)
+    replace_embeddings("job_embeddings", job_id, vectors)
+    refresh_job_summaries([job_id])
+    record_job_index_state(job_id, text, len(vectors))
+    get_local_index().mark_dirty()
+    refresh_job_matches(job_id)
+    bump_job_index_version()
+    return []
+
+
+def index_cv(cv_id) -> List[str]:
+    """Embed a CV's parsed text and replace its chunks; same contract as index_job."""
+    from .supabase_models import CV
+
+    parsed_text = CV.objects.filter(id=cv_id).values_list("parsed_text", flat=True).first()
+    if parsed_text is None:
+        return [f"cv {cv_id} has no parsed text"]
+    vectors = _embed_all(parsed_text)
+    save_cv_vectors(cv_id, parsed_text, vectors, [])
+    refresh_cv_matches(cv_id, vectors)
+    return []
+
+
+INDEXERS = {
+    EmbeddingOutboxItem.KIND_JOB: index_job,
+    EmbeddingOutboxItem.KIND_CV: index_cv,
+}
+
+
+# ----- queue -------------------------------------------------------------
+
+def enqueue(kind: str, owner_id) -> EmbeddingOutboxItem:
+    """Queue (or re-queue) embedding of a job or CV."""
+    defaults = {
+        "status": EmbeddingOutboxItem.STATUS_PENDING,
+        "attempts": 0,
+        "last_error": "",
+        "warnings": [],
+        "available_at": timezone.now(),
+    }
+    try:
+        item, _ = EmbeddingOutboxItem.objects.update_or_create(kind=kind, owner_id=owner_id, defaults=defaults)
+    except IntegrityError:
+        # Lost a race with a concurrent enqueue of the same owner; theirs is just as good
+        item = EmbeddingOutboxItem.objects.get(kind=kind, owner_id=owner_id)
+    return item
+
+
+def claim_batch(batch_size: int) -> List[EmbeddingOutboxItem]:
+    """Lease up to `batch_size` ready items (including ones whose worker died)."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=EMBEDDING_OUTBOX_LEASE_SECONDS)
+    # An item that keeps killing its worker (OOM on a huge document) never reaches _fail
+    EmbeddingOutboxItem.objects.filter(
+        status=EmbeddingOutboxItem.STATUS_PROCESSING,
+        updated_at__lt=stale,
+        attempts__gte=EMBEDDING_OUTBOX_MAX_ATTEMPTS,
+    ).update(
+        status=EmbeddingOutboxItem.STATUS_FAILED,
+        last_error="worker lost the item on every attempt",
+        updated_at=now,
+    )
+    ready = Q(status=EmbeddingOutboxItem.STATUS_PENDING, available_at__lte=now) | Q(
+        status=EmbeddingOutboxItem.STATUS_PROCESSING,
+        updated_at__lt=stale,
+        attempts__lt=EMBEDDING_OUTBOX_MAX_ATTEMPTS,
+    )
+    with transaction.atomic():
+        qs = EmbeddingOutboxItem.objects.filter(ready).order_by("available_at")
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        items = list(qs[:batch_size])
+        if items:
+            EmbeddingOutboxItem.objects.filter(id__in=[i.id for i in items]).update(
+                status=EmbeddingOutboxItem.STATUS_PROCESSING, attempts=F("attempts") + 1, updated_at=now
+            )
+    for item in items:
+        item.status = EmbeddingOutboxItem.STATUS_PROCESSING
+        item.attempts += 1
+    return items
+
+
+def _claimed(item: EmbeddingOutboxItem):
+    # `attempts` fences out a worker whose lease expired and was re-claimed
+    return EmbeddingOutboxItem.objects.filter(
+        id=item.id, status=EmbeddingOutboxItem.STATUS_PROCESSING, attempts=item.attempts
+    )
+
+
+def _finish(item: EmbeddingOutboxItem, warnings: List[str]):
+    # Only mark done if nobody re-enqueued the owner while we were working on it
+    _claimed(item).update(
+        status=EmbeddingOutboxItem.STATUS_DONE,
+        last_error="",
+        warnings=warnings,
+        updated_at=timezone.now(),
+    )
+
+
+def _fail(item: EmbeddingOutboxItem, error: str):
+    now = timezone.now()
+    if item.attempts >= EMBEDDING_OUTBOX_MAX_ATTEMPTS:
+        new_status, available_at = EmbeddingOutboxItem.STATUS_FAILED, now
+    else:
+        new_status, available_at = EmbeddingOutboxItem.STATUS_PENDING, now + timedelta(seconds=2 ** item.attempts * 10)
+    _claimed(item).update(
+        status=new_status,
+        last_error=error[:2000],
+        available_at=available_at,
+        updated_at=now,
+    )
+
+
+def process_item(item: EmbeddingOutboxItem) -> bool:
+    indexer = INDEXERS.get(item.kind)
+    try:
+        if indexer is None:
+            raise ValueError(f"unknown outbox kind {item.kind!r}")
+        warnings = indexer(item.owner_id)
+    except Exception as e:
+        logger.warning(f"Embedding {item.kind} {item.owner_id} failed (attempt {item.attempts}): {e}")
+        _fail(item, str(e))
+        return False
+    _finish(item, warnings)
+    return True
+
+
+def drain(batch_size: int = 20, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Process ready items until the queue is empty (or max_batches is hit)."""
+    counts = {"done": 0, "failed": 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        items = claim_batch(batch_size)
+        if not items:
+            break
+        batches += 1
+        for item in items:
+            counts["done" if process_item(item) else "failed"] += 1
+        if any(item.kind == EmbeddingOutboxItem.KIND_JOB for item in items):
+            # Once per batch rather than per job: it counts the whole table
+            refresh_index_metadata()
+    return counts
+
+
+def index_now_or_enqueue(kind: str, owner_id) -> dict:
+    """What the write endpoints call: enqueue when async, else index inline."""
+    if EMBEDDING_ASYNC:
+        enqueue(kind, owner_id)
+        return {"status": EmbeddingOutboxItem.STATUS_PENDING}
+    try:
+        warnings = INDEXERS[kind](owner_id)
+    except Exception as e:
+        return {"status": EmbeddingOutboxItem.STATUS_FAILED, "warnings": [str(e)]}
+    if kind == EmbeddingOutboxItem.KIND_JOB:
+        # Runs on the request thread here; the full-table recount does not
+        refresh_index_metadata_async()
+    return {"status": EmbeddingOutboxItem.STATUS_DONE, "warnings": warnings}
+
+
+def indexing_status(kind: str, owner_id) -> dict:
+    item = EmbeddingOutboxItem.objects.filter(kind=kind, owner_id=owner_id).first()
+    if item is None:
+        # Indexed before the outbox existed, or inline with EMBEDDING_ASYNC=False
+        table, column = ("job_embeddings", "job_id") if kind == EmbeddingOutboxItem.KIND_JOB else ("cv_embeddings", "cv_id")
+        with connection.cursor() as c:
+            c.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} = %s", [str(owner_id)])
+            chunks = c.fetchone()[0]
+        return {"kind": kind, "id": str(owner_id), "status": "indexed" if chunks else "not_indexed", "chunks": chunks}
+    return {
+        "kind": kind,
+        "id": str(owner_id),
+        "status": item.status,
+        "attempts": item.attempts,
+        "last_error": item.last_error or None,
+        "warnings": item.warnings,
+        "queued_at": item.available_at,
+        "updated_at": item.updated_at,
+    }
@@ -0,0 +1,156 @@
+"""
+Shared, pooled HTTP clients for the remote AI providers (Fireworks, Groq,
+OpenAI, ElevenLabs, Whisper) and the profile services (LeetCode, HackerRank).
+
+`post()` / `get()` / `request()` take the same arguments as `requests.*` and
+send through one keep-alive `requests.Session` per host, so repeated calls
+reuse TLS connections instead of handshaking every time. Each call gets:
+
+  - (connect, read) timeouts: HTTP_CONNECT_TIMEOUT plus the caller's timeout;
+  - retries on connection errors and 429 responses, plus 5xx responses for
+    idempotent calls, with exponential backoff and full jitter (Retry-After
+    is honoured), limited by a per-request budget of HTTP_RETRY_BUDGET
+    retries and HTTP_RETRY_BUDGET_SECONDS of sleeping. A 5xx to a POST is
+    returned as is, since repeating it may repeat a billed completion or
+    synthesis; read-only POSTs (embeddings, GraphQL queries) pass
+    idempotent=True. Read timeouts are not retried: the provider may still
+    be working on the request.
+
+`get_openai_client()` returns one cached OpenAI client per API key (the SDK
+keeps its own connection pool and retry policy).
+"""
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from decouple import config
+from requests.adapters import HTTPAdapter
+
+try:
+    from openai import OpenAI
+except Exception:
+    OpenAI = None
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_MAXSIZE = config("HTTP_POOL_MAXSIZE", default=20, cast=int)
+HTTP_CONNECT_TIMEOUT = config("HTTP_CONNECT_TIMEOUT", default=5.0, cast=float)
+HTTP_DEFAULT_TIMEOUT = config("HTTP_DEFAULT_TIMEOUT", default=60.0, cast=float)
+HTTP_RETRY_BUDGET = config("HTTP_RETRY_BUDGET", default=2, cast=int)
+HTTP_RETRY_BUDGET_SECONDS = config("HTTP_RETRY_BUDGET_SECONDS", default=10.0, cast=float)
+HTTP_RETRY_BACKOFF = config("HTTP_RETRY_BACKOFF", default=0.5, cast=float)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# A 429 is refused before any work is done, so it is safe to retry for any method
+NON_IDEMPOTENT_RETRY_STATUSES = frozenset({429})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_openai_clients: Dict[str, "OpenAI"] = {}
+
+
+def get_session(url: str) -> requests.Session:
+    """The pooled keep-alive session for the scheme and host of `url`."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            # Retries are handled in request() so they share one budget
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+            session.mount(origin, adapter)
+            _sessions[origin] = session
+        return session
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+    # Full jitter: spreads out retries from concurrent callers hitting the same limit
+    return random.uniform(0, HTTP_RETRY_BACKOFF * 2 ** attempt)
+
+
+def _rewind(files):
+    # A retried upload must resend the file from the start
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
+def request(
+    method: str,
+    url: str,
+    timeout=None,
+    retries: Optional[int] = None,
+    idempotent: Optional[bool] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    requests.request() through the pooled session, with backoff retries.
+    `idempotent` defaults to the method's semantics; only idempotent calls
+    retry 5xx responses.
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+    if timeout is None:
+        timeout = HTTP_DEFAULT_TIMEOUT
+    if not isinstance(timeout, tuple):
+        timeout = (min(HTTP_CONNECT_TIMEOUT, timeout), timeout)
+    retries = HTTP_RETRY_BUDGET if retries is None else retries
+    session = get_session(url)
+    slept = 0.0
+    attempt = 0
+    while True:
+        if attempt:
+            _rewind(kwargs.get("files"))
+        response, error = None, None
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            # Includes connect timeouts and pooled connections the server already closed
+            error = e
+        if error is None and response.status_code not in retry_statuses:
+            return response
+
+        delay = _retry_delay(attempt, response)
+        if attempt >= retries or slept + delay > HTTP_RETRY_BUDGET_SECONDS:
+            if error is not None:
+                raise error
+            return response
+        reason = error or f"status {response.status_code}"
+        logger.info(f"{method} {urlsplit(url).netloc} failed ({reason}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+        time.sleep(delay)
+        slept += delay
+        attempt += 1
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def get_openai_client(api_key: str):
+    """One OpenAI client per key, reused across requests."""
+    if OpenAI is None:
+        raise RuntimeError("openai library not installed")
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key, max_retries=HTTP_RETRY_BUDGET, timeout=HTTP_DEFAULT_TIMEOUT)
+            _openai_clients[api_key] = client
+        return client
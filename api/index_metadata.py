@@ -0,0 +1,163 @@
+"""
+Registry of what the job vector index currently holds.
+
+The embedding model, vector dimension, chunk count and active chunk/job counts
+of job_embeddings are recomputed by the indexing paths and stored in
+vector_index_metadata: synchronously by the outbox worker and
+reindex_job_embeddings, and on a background thread
+(`refresh_index_metadata_async()`) when a request itself changed the index
+(job deletion, inline indexing), so the full-table counts stay off the
+request path.
+Request-time diagnostics read them through `get_index_metadata()`, which keeps
+the row in-process for INDEX_METADATA_TTL_SECONDS, instead of sampling and
+counting the table on every empty result.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from decouple import config
+from django.db import connection
+
+from .embedding_models import JobIndexState, VectorIndexMetadata
+from .rag import embedding_model_name
+from .vector_adapter import from_pg_vector
+
+logger = logging.getLogger(__name__)
+
+INDEX_METADATA_TTL_SECONDS = config("INDEX_METADATA_TTL_SECONDS", default=60, cast=int)
+
+JOB_EMBEDDINGS = "job_embeddings"
+
+_lock = threading.Lock()
+_cached: Optional[dict] = None
+_cached_at = 0.0
+_refreshing = False
+_refresh_again = False
+
+
+def _as_dict(meta: VectorIndexMetadata) -> dict:
+    return {
+        "table": meta.table_name,
+        "embedding_model": meta.embedding_model or None,
+        "dimensions": meta.dimensions,
+        "chunk_count": meta.chunk_count,
+        "active_chunk_count": meta.active_chunk_count,
+        "active_job_count": meta.active_job_count,
+        "refreshed_at": meta.refreshed_at,
+    }
+
+
+def _job_embedding_counts():
+    """(dimensions, chunks, active chunks, active jobs) of job_embeddings."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT COUNT(*),
+                       COUNT(*) FILTER (WHERE j.is_active),
+                       COUNT(DISTINCT e.job_id) FILTER (WHERE j.is_active)
+                FROM job_embeddings e
+                LEFT JOIN jobs j ON j.id = e.job_id
+                """
+            )
+            chunks, active_chunks, active_jobs = c.fetchone()
+            c.execute("SELECT vector_dims(embedding) FROM job_embeddings WHERE embedding IS NOT NULL LIMIT 1")
+            one = c.fetchone()
+        return (int(one[0]) if one and one[0] is not None else None), chunks, active_chunks, active_jobs
+
+    from .supabase_models import JobEmbedding
+
+    active = JobEmbedding.objects.filter(job__is_active=True)
+    sample = JobEmbedding.objects.filter(embedding__isnull=False).values_list("embedding", flat=True).first()
+    vec = from_pg_vector(sample) if sample is not None else None
+    return (
+        len(vec) if vec is not None and len(vec) else None,
+        JobEmbedding.objects.count(),
+        active.count(),
+        active.values("job_id").distinct().count(),
+    )
+
+
+def refresh_index_metadata() -> Optional[dict]:
+    """Recompute and store the job_embeddings metadata; called after index writes."""
+    global _cached, _cached_at
+    try:
+        dims, chunks, active_chunks, active_jobs = _job_embedding_counts()
+        # The model that wrote the most recent chunks; falls back to the configured one
+        model = (
+            JobIndexState.objects.order_by("-indexed_at").values_list("embedding_model", flat=True).first()
+            or embedding_model_name()
+        )
+        meta, _ = VectorIndexMetadata.objects.update_or_create(
+            table_name=JOB_EMBEDDINGS,
+            defaults={
+                "embedding_model": model,
+                "dimensions": dims,
+                "chunk_count": chunks,
+                "active_chunk_count": active_chunks,
+                "active_job_count": active_jobs,
+            },
+        )
+    except Exception as e:
+        logger.warning(f"Could not refresh vector index metadata: {e}")
+        return None
+    data = _as_dict(meta)
+    with _lock:
+        _cached, _cached_at = data, time.monotonic()
+    return data
+
+
+def _refresh_in_background():
+    global _refreshing, _refresh_again
+    try:
+        while True:
+            with _lock:
+                _refresh_again = False
+            refresh_index_metadata()
+            with _lock:
+                # Writes that arrived during the recount need one more
+                if not _refresh_again:
+                    _refreshing = False
+                    return
+    finally:
+        with _lock:
+            _refreshing = False
+        # This thread opened its own DB connection
+        connection.close()
+
+
+def refresh_index_metadata_async():
+    """
+    Drop the cached metadata and recount on a background thread; for request
+    handlers that changed the index. Concurrent calls share one recount.
+    """
+    global _cached, _refreshing, _refresh_again
+    with _lock:
+        _cached = None
+        if _refreshing:
+            _refresh_again = True
+            return
+        _refreshing = True
+    threading.Thread(target=_refresh_in_background, name="index-metadata-refresh", daemon=True).start()
+
+
+def get_index_metadata() -> Optional[dict]:
+    """Job index metadata, served from memory for INDEX_METADATA_TTL_SECONDS."""
+    global _cached, _cached_at
+    with _lock:
+        if _cached is not None and time.monotonic() - _cached_at < INDEX_METADATA_TTL_SECONDS:
+            return _cached
+    try:
+        meta = VectorIndexMetadata.objects.filter(table_name=JOB_EMBEDDINGS).first()
+    except Exception as e:
+        logger.warning(f"Could not read vector index metadata: {e}")
+        return None
+    if meta is None:
+        # Nothing recorded yet (fresh deploy): compute it once
+        return refresh_index_metadata()
+    data = _as_dict(meta)
+    with _lock:
+        _cached, _cached_at = data, time.monotonic()
+    return data
@@ -0,0 +1,187 @@
+"""
+Cache of LLM chat completions keyed by prompt fingerprint.
+
+Several endpoints send the same low-temperature prompt over unchanged input
+again and again (the dashboard CV score on every refresh, recommendations for
+the same CV, the analysis of unchanged coding stats, market research for the
+same role). Their completions are keyed by sha256(model, system prompt, user
+prompt, temperature, response_format) and kept in a bounded in-process LRU
+and the `llm_cache` table (shared by all workers), both for
+LLM_CACHE_TTL_SECONDS.
+
+Caching is opt-in per endpoint: callers pass their endpoint name as
+`cache_as=` to `llm_gateway.chat()` (which calls `cached_completion()`), and
+only names listed in LLM_CACHE_ENDPOINTS are cached. Only completions the
+caller accepts (`validate`) are stored, so a malformed answer is retried on
+the next request instead of being served for a day. Hit/miss counters per
+endpoint are in `stats()`.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from decouple import Csv, config
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = config("LLM_CACHE_ENABLED", default=True, cast=bool)
+LLM_CACHE_MAX_ENTRIES = config("LLM_CACHE_MAX_ENTRIES", default=1000, cast=int)
+LLM_CACHE_TTL_SECONDS = config("LLM_CACHE_TTL_SECONDS", default=86400, cast=int)
+LLM_CACHE_PERSIST = config("LLM_CACHE_PERSIST", default=True, cast=bool)
+LLM_CACHE_ENDPOINTS = set(
+    config(
+        "LLM_CACHE_ENDPOINTS",
+        default="dashboard_cv_score,cv_recommendations,coding_profile_analysis,market_research",
+        cast=Csv(),
+    )
+)
+
+
+def completion_key(model: str, system_prompt: str, user_prompt: str, temperature=None, response_format=None) -> str:
+    fingerprint = json.dumps(
+        [model, system_prompt or "", user_prompt or "", temperature, response_format],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl: int = LLM_CACHE_TTL_SECONDS,
+        persist: bool = LLM_CACHE_PERSIST,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist = persist
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def enabled_for(self, endpoint: str) -> bool:
+        return LLM_CACHE_ENABLED and endpoint in LLM_CACHE_ENDPOINTS
+
+    def _count(self, endpoint: str, outcome: str):
+        # Caller holds the lock
+        counts = self._counts.setdefault(endpoint, {"memory_hits": 0, "db_hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _remember(self, key: str, expires: float, response: str):
+        # Caller holds the lock
+        self._entries[key] = (expires, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, endpoint: str, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(endpoint, "memory_hits")
+                return entry[1]
+
+        row = None
+        if self.persist:
+            try:
+                from .embedding_models import LLMCacheEntry
+                row = (
+                    LLMCacheEntry.objects.filter(key=key, expires_at__gt=timezone.now())
+                    .values_list("response", "expires_at")
+                    .first()
+                )
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+        with self._lock:
+            if row is None:
+                self._count(endpoint, "misses")
+                return None
+            self._remember(key, row[1].timestamp(), row[0])
+            self._count(endpoint, "db_hits")
+            return row[0]
+
+    def put(self, endpoint: str, key: str, model: str, response: str):
+        with self._lock:
+            self._remember(key, time.time() + self.ttl, response)
+        if not self.persist:
+            return
+        try:
+            from .embedding_models import LLMCacheEntry
+            LLMCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    "endpoint": endpoint,
+                    "model": model,
+                    "response": response,
+                    "expires_at": timezone.now() + timedelta(seconds=self.ttl),
+                },
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, counts in self._counts.items():
+                hits = counts["memory_hits"] + counts["db_hits"]
+                lookups = hits + counts["misses"]
+                endpoints[endpoint] = dict(counts, hit_rate=round(hits / lookups, 4) if lookups else None)
+            return {
+                "enabled": LLM_CACHE_ENABLED,
+                "persist": self.persist,
+                "cached_endpoints": sorted(LLM_CACHE_ENDPOINTS),
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "endpoints": endpoints,
+            }
+
+
+_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    return _cache
+
+
+def cached_completion(
+    endpoint: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    call: Callable[[], str],
+    temperature=None,
+    response_format=None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    The completion for this prompt: cached when `endpoint` is opted in,
+    otherwise (or on a miss) whatever `call()` returns. Exceptions from
+    `call()` propagate and nothing is stored.
+    """
+    cache = get_llm_cache()
+    if not cache.enabled_for(endpoint):
+        return call()
+    key = completion_key(model, system_prompt, user_prompt, temperature, response_format)
+    response = cache.get(endpoint, key)
+    if response is not None:
+        return response
+    response = call()
+    if response and (validate is None or validate(response)):
+        cache.put(endpoint, key, model, response)
+    return response
@@ -0,0 +1,478 @@
+"""
+One entry point for chat completions, whatever the provider.
+
+    result = llm_gateway.chat(system=system_prompt, user=user_prompt, temperature=0.2, json_mode=True)
+    data = result.json()            # parsed JSON object, or None
+    for delta in llm_gateway.stream_chat(messages=messages):
+        ...
+
+Every call goes through a provider backend registered under a name
+("fireworks", "groq", "openai"; LLM_DEFAULT_PROVIDER picks the default).
+`register_provider()` adds or replaces one: a backend only implements
+`complete()` and `stream()`. The gateway around it provides:
+
+  - pooled keep-alive connections and retries (api/http_clients.py);
+  - a concurrency limit per provider (LLM_<PROVIDER>_MAX_CONCURRENCY calls
+    in flight per process; callers wait up to LLM_QUEUE_TIMEOUT_SECONDS for
+    a slot), so one busy endpoint cannot exhaust the provider's rate limit;
+  - JSON mode (`json_mode=True` asks for a JSON object, `ChatResult.json()`
+    parses it, tolerating code fences and surrounding prose);
+  - caching of opted-in endpoints (`cache_as=`, see api/llm_cache.py);
+  - latency, error and token counters per provider and model (`stats()`).
+
+Failures of any kind are raised as LLMError; `status_code` and `body` are
+set when the provider answered with an error status, and `transient` tells
+whether the same call may succeed later (timeouts, network errors, 429/5xx)
+or not (unknown provider, missing key, other 4xx).
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from decouple import config
+
+from . import http_clients
+from .llm_cache import cached_completion
+
+logger = logging.getLogger(__name__)
+
+FIREWORKS_API_KEY = config("FIREWORKS_API_KEY", default=None)
+FIREWORKS_BASE_URL = config("FIREWORKS_BASE_URL", default="https://api.fireworks.ai/inference/v1")
+FIREWORKS_CHAT_MODEL = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
+GROQ_API_KEY = config("GROQ_API_KEY", default=None)
+GROQ_BASE_URL = config("GROQ_BASE_URL", default="https://api.groq.com/openai/v1")
+GROQ_CHAT_MODEL = config("GROQ_CHAT_MODEL", default="llama-3.3-70b-versatile")
+OPENAI_API_KEY = config("OPENAI_API_KEY", default=None)
+OPENAI_CHAT_MODEL = config("OPENAI_CHAT_MODEL", default="gpt-4o-mini")
+
+LLM_DEFAULT_PROVIDER = config("LLM_DEFAULT_PROVIDER", default="fireworks")
+LLM_DEFAULT_TIMEOUT = config("LLM_DEFAULT_TIMEOUT", default=60.0, cast=float)
+LLM_QUEUE_TIMEOUT_SECONDS = config("LLM_QUEUE_TIMEOUT_SECONDS", default=30.0, cast=float)
+LLM_DEFAULT_MAX_CONCURRENCY = config("LLM_DEFAULT_MAX_CONCURRENCY", default=8, cast=int)
+LATENCY_WINDOW = 512
+
+JSON_OBJECT = {"type": "json_object"}
+
+
+class LLMError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, body: str = "", transient: Optional[bool] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+        if transient is None:
+            transient = status_code is None or status_code == 429 or status_code >= 500
+        self.transient = transient
+
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+
+
+def parse_json(content: str) -> Optional[Any]:
+    """JSON from a model answer: as is, inside a code fence, or the outermost {...}."""
+    if not content:
+        return None
+    candidates = [content]
+    fence = _FENCE_RE.search(content)
+    if fence:
+        candidates.append(fence.group(1))
+    obj = _OBJECT_RE.search(content)
+    if obj:
+        candidates.append(obj.group(0))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate.strip())
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass
+class ChatResult:
+    text: str
+    provider: str
+    model: str
+    latency_ms: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached: bool = False
+
+    def json(self) -> Optional[Any]:
+        return parse_json(self.text)
+
+
+# ----- providers ---------------------------------------------------------
+
+class ChatProvider:
+    """A chat completion backend. `complete` returns (text, usage dict)."""
+
+    name = ""
+    default_model = ""
+
+    def configured(self) -> bool:
+        return True
+
+    def complete(self, model: str, messages: List[dict], options: dict, timeout: float) -> Tuple[str, dict]:
+        raise NotImplementedError
+
+    def stream(self, model: str, messages: List[dict], options: dict, timeout: float) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class OpenAICompatibleProvider(ChatProvider):
+    """POST {base_url}/chat/completions with a bearer key (Fireworks, Groq)."""
+
+    def __init__(self, name: str, base_url: str, api_key: Optional[str], default_model: str):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.default_model = default_model
+
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _post(self, payload: dict, timeout: float, stream: bool = False) -> requests.Response:
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        try:
+            r = http_clients.post(
+                f"{self.base_url}/chat/completions", headers=headers, json=payload, timeout=timeout, stream=stream
+            )
+        except requests.exceptions.Timeout:
+            raise LLMError(f"Request to {self.name} timed out")
+        except requests.exceptions.RequestException as e:
+            raise LLMError(f"Network error calling {self.name}: {e}")
+        if not r.ok:
+            body = r.text
+            raise LLMError(f"{self.name} error ({r.status_code}): {body[:500]}", status_code=r.status_code, body=body)
+        return r
+
+    def complete(self, model, messages, options, timeout):
+        r = self._post(dict(options, model=model, messages=messages), timeout)
+        try:
+            data = r.json()
+            text = data["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise LLMError(f"Invalid response format from {self.name}", status_code=r.status_code, body=r.text, transient=True)
+        return text, data.get("usage") or {}
+
+    def stream(self, model, messages, options, timeout):
+        r = self._post(dict(options, model=model, messages=messages, stream=True), timeout, stream=True)
+        try:
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if delta:
+                    yield delta
+        finally:
+            r.close()
+
+
+class OpenAIProvider(ChatProvider):
+    """OpenAI through the SDK client shared by the STT/TTS endpoints."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str], default_model: str):
+        self.api_key = api_key
+        self.default_model = default_model
+
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def complete(self, model, messages, options, timeout):
+        try:
+            client = http_clients.get_openai_client(self.api_key)
+            resp = client.chat.completions.create(model=model, messages=messages, timeout=timeout, **options)
+        except Exception as e:
+            raise LLMError(f"openai error: {e}", status_code=getattr(e, "status_code", None))
+        usage = resp.usage
+        return (resp.choices[0].message.content or ""), {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+        }
+
+    def stream(self, model, messages, options, timeout):
+        try:
+            client = http_clients.get_openai_client(self.api_key)
+            chunks = client.chat.completions.create(model=model, messages=messages, timeout=timeout, stream=True, **options)
+        except Exception as e:
+            raise LLMError(f"openai error: {e}", status_code=getattr(e, "status_code", None))
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# ----- gateway -----------------------------------------------------------
+
+class _ProviderState:
+    def __init__(self, provider: ChatProvider):
+        self.provider = provider
+        self.max_concurrency = max(
+            1, config(f"LLM_{provider.name.upper()}_MAX_CONCURRENCY", default=LLM_DEFAULT_MAX_CONCURRENCY, cast=int)
+        )
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.in_flight = 0
+
+
+class _ModelMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.streams = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.latency_ms)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1) if ordered else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "streams": self.streams,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50_ms": pct(50),
+            "latency_p95_ms": pct(95),
+        }
+
+
+class LLMGateway:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: Dict[str, _ProviderState] = {}
+        self._metrics: Dict[Tuple[str, str], _ModelMetrics] = {}
+
+    def register_provider(self, provider: ChatProvider):
+        with self._lock:
+            self._providers[provider.name] = _ProviderState(provider)
+
+    def _state(self, name: Optional[str]) -> _ProviderState:
+        name = name or LLM_DEFAULT_PROVIDER
+        with self._lock:
+            state = self._providers.get(name)
+        if state is None:
+            raise LLMError(f"Unknown LLM provider {name!r}", transient=False)
+        if not state.provider.configured():
+            raise LLMError(f"{name.upper()}_API_KEY is not configured", transient=False)
+        return state
+
+    def _record(self, provider: str, model: str, **changes):
+        with self._lock:
+            metrics = self._metrics.setdefault((provider, model), _ModelMetrics())
+            latency = changes.pop("latency_ms", None)
+            if latency is not None:
+                metrics.latency_ms.append(latency)
+            for field, amount in changes.items():
+                setattr(metrics, field, getattr(metrics, field) + (amount or 0))
+
+    def _acquire(self, state: _ProviderState):
+        if not state.slots.acquire(timeout=LLM_QUEUE_TIMEOUT_SECONDS):
+            raise LLMError(f"{state.provider.name} is at its concurrency limit ({state.max_concurrency} calls)")
+        with self._lock:
+            state.in_flight += 1
+
+    def _release(self, state: _ProviderState):
+        with self._lock:
+            state.in_flight -= 1
+        state.slots.release()
+
+    @staticmethod
+    def _messages(messages, system, user) -> List[dict]:
+        if messages is not None:
+            return list(messages)
+        built = []
+        if system:
+            built.append({"role": "system", "content": system})
+        built.append({"role": "user", "content": user or ""})
+        return built
+
+    @staticmethod
+    def _options(temperature, max_tokens, json_mode, extra) -> dict:
+        options = dict(extra)
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_tokens is not None:
+            options["max_tokens"] = max_tokens
+        if json_mode:
+            options["response_format"] = JSON_OBJECT
+        return options
+
+    def _complete(self, state: _ProviderState, model: str, messages: List[dict], options: dict, timeout: float) -> ChatResult:
+        name = state.provider.name
+        self._acquire(state)
+        started = time.monotonic()
+        try:
+            text, usage = state.provider.complete(model, messages, options, timeout)
+        except LLMError:
+            self._record(name, model, calls=1, errors=1, latency_ms=(time.monotonic() - started) * 1000)
+            raise
+        except Exception as e:
+            self._record(name, model, calls=1, errors=1, latency_ms=(time.monotonic() - started) * 1000)
+            raise LLMError(f"Error calling {name}: {e}")
+        finally:
+            self._release(state)
+        latency = (time.monotonic() - started) * 1000
+        self._record(
+            name,
+            model,
+            calls=1,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            latency_ms=latency,
+        )
+        return ChatResult(
+            text=text.strip(),
+            provider=name,
+            model=model,
+            latency_ms=round(latency, 1),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+
+    def chat(
+        self,
+        messages: Optional[List[dict]] = None,
+        system: Optional[str] = None,
+        user: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        cache_as: Optional[str] = None,
+        validate=None,
+        **extra,
+    ) -> ChatResult:
+        """A complete (non-streaming) chat completion."""
+        state = self._state(provider)
+        model = model or state.provider.default_model
+        messages = self._messages(messages, system, user)
+        options = self._options(temperature, max_tokens, json_mode, extra)
+        timeout = timeout or LLM_DEFAULT_TIMEOUT
+        if not cache_as:
+            return self._complete(state, model, messages, options, timeout)
+
+        # Cached by system prompt and the rest of the conversation
+        system_prompt = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        rest = [m for m in messages if m.get("role") != "system"]
+        user_prompt = (rest[0].get("content") or "") if len(rest) == 1 else json.dumps(rest, sort_keys=True)
+        fresh: Dict[str, ChatResult] = {}
+
+        def call():
+            fresh["result"] = self._complete(state, model, messages, options, timeout)
+            return fresh["result"].text
+
+        text = cached_completion(
+            cache_as,
+            model,
+            system_prompt,
+            user_prompt,
+            call,
+            temperature=temperature,
+            response_format=options.get("response_format"),
+            validate=validate,
+        )
+        if "result" in fresh:
+            return fresh["result"]
+        self._record(state.provider.name, model, cache_hits=1)
+        return ChatResult(text=text, provider=state.provider.name, model=model, cached=True)
+
+    def stream_chat(
+        self,
+        messages: Optional[List[dict]] = None,
+        system: Optional[str] = None,
+        user: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **extra,
+    ) -> Iterator[str]:
+        """Text deltas as the provider produces them; holds a concurrency slot until exhausted or closed."""
+        state = self._state(provider)
+        model = model or state.provider.default_model
+        messages = self._messages(messages, system, user)
+        options = self._options(temperature, max_tokens, False, extra)
+        name = state.provider.name
+        self._acquire(state)
+        started = time.monotonic()
+        failed = False
+        try:
+            for delta in state.provider.stream(model, messages, options, timeout or LLM_DEFAULT_TIMEOUT):
+                yield delta
+        except LLMError:
+            failed = True
+            raise
+        except Exception as e:
+            failed = True
+            raise LLMError(f"Error streaming from {name}: {e}")
+        finally:
+            self._release(state)
+            self._record(
+                name, model, calls=1, streams=1, errors=int(failed), latency_ms=(time.monotonic() - started) * 1000
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "default_provider": LLM_DEFAULT_PROVIDER,
+                "providers": {
+                    name: {
+                        "configured": state.provider.configured(),
+                        "default_model": state.provider.default_model,
+                        "max_concurrency": state.max_concurrency,
+                        "in_flight": state.in_flight,
+                    }
+                    for name, state in self._providers.items()
+                },
+                "models": {f"{provider}/{model}": m.as_dict() for (provider, model), m in self._metrics.items()},
+            }
+
+
+_gateway = LLMGateway()
+_gateway.register_provider(
+    OpenAICompatibleProvider("fireworks", FIREWORKS_BASE_URL, FIREWORKS_API_KEY, FIREWORKS_CHAT_MODEL)
+)
+_gateway.register_provider(OpenAICompatibleProvider("groq", GROQ_BASE_URL, GROQ_API_KEY, GROQ_CHAT_MODEL))
+_gateway.register_provider(OpenAIProvider(OPENAI_API_KEY, OPENAI_CHAT_MODEL))
+
+
+def get_llm_gateway() -> LLMGateway:
+    return _gateway
+
+
+def register_provider(provider: ChatProvider):
+    _gateway.register_provider(provider)
+
+
+def chat(*args, **kwargs) -> ChatResult:
+    return _gateway.chat(*args, **kwargs)
+
+
+def stream_chat(*args, **kwargs) -> Iterator[str]:
+    return _gateway.stream_chat(*args, **kwargs)
+
+
+def stats() -> dict:
+    return _gateway.stats()
@@ -0,0 +1,351 @@
+"""
+In-process NumPy vector index over active job embeddings.
+
+Used by api.rag when VECTOR_SEARCH_BACKEND is "numpy" (or "auto" on a
+non-Postgres database, e.g. USE_SQLITE=True), and as a fallback when a
+pgvector query fails.
+
+Layout: a base float32 matrix of L2-normalized chunk vectors plus the owning
+job id per row, saved as .npy files under VECTOR_INDEX_DIR and memory-mapped
+on load so every worker process shares the same pages. Changes since the
+base was written live in a small in-memory delta and an `alive` mask; once
+the delta or the number of dead rows grows past a threshold the index is
+compacted back to disk.
+
+Top-k is a single matmul plus np.argpartition; the best chunk per job wins.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from decouple import config
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .vector_adapter import from_pg_vector, vector_column
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_DIR = config("VECTOR_INDEX_DIR", default=str(Path(settings.BASE_DIR) / "var" / "vector_index"))
+VECTOR_INDEX_REFRESH_SECONDS = config("VECTOR_INDEX_REFRESH_SECONDS", default=30, cast=int)
+VECTOR_INDEX_COMPACT_ROWS = config("VECTOR_INDEX_COMPACT_ROWS", default=5000, cast=int)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _as_aware(value) -> Optional[datetime]:
+    """created_at as an aware UTC datetime, whatever the driver returned (naive on SQLite, str fallbacks)."""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if timezone.is_naive(value):
+        return timezone.make_aware(value, dt_timezone.utc)
+    return value.astimezone(dt_timezone.utc)
+
+
+def _db_datetime(value: datetime) -> datetime:
+    # With USE_TZ=False the backends store and compare naive datetimes
+    return value if settings.USE_TZ else timezone.make_naive(value, dt_timezone.utc)
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (mat / norms).astype(np.float32, copy=False)
+
+
+class LocalVectorIndex:
+    def __init__(self, name: str = "jobs", directory: str = VECTOR_INDEX_DIR):
+        self.name = name
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._base = np.zeros((0, 0), dtype=np.float32)
+        self._base_ids = np.zeros(0, dtype="<U36")
+        self._base_alive = np.zeros(0, dtype=bool)
+        self._delta: List[np.ndarray] = []
+        self._delta_ids: List[str] = []
+        self._dim: Optional[int] = None
+        self._watermark = _EPOCH
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._dirty = False
+
+    # ----- files -------------------------------------------------------
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self.directory / f"{self.name}.f32.npy"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.directory / f"{self.name}.ids.npy"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / f"{self.name}.meta.json"
+
+    def exists_on_disk(self) -> bool:
+        return self._matrix_path.exists() and self._ids_path.exists() and self._meta_path.exists()
+
+    def _load_from_disk(self) -> bool:
+        if not self.exists_on_disk():
+            return False
+        try:
+            meta = json.loads(self._meta_path.read_text())
+            self._base = np.load(self._matrix_path, mmap_mode="r")
+            self._base_ids = np.load(self._ids_path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"Local vector index at {self.directory} is unreadable, rebuilding: {e}")
+            return False
+        self._base_alive = np.ones(len(self._base_ids), dtype=bool)
+        self._delta, self._delta_ids = [], []
+        self._dim = meta.get("dim")
+        self._watermark = _as_aware(meta.get("watermark")) or _EPOCH
+        return True
+
+    def _save(self, matrix: np.ndarray, ids: np.ndarray):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to temp files and rename so other processes never see a torn index
+        suffix = f".{os.getpid()}.tmp"
+        for path, arr in ((self._matrix_path, matrix), (self._ids_path, ids)):
+            tmp = path.with_name(path.name + suffix)
+            with open(tmp, "wb") as fh:
+                np.save(fh, arr)
+            os.replace(tmp, path)
+        tmp_meta = self._meta_path.with_name(self._meta_path.name + suffix)
+        tmp_meta.write_text(json.dumps({
+            "dim": self._dim,
+            "rows": int(len(ids)),
+            "watermark": self._watermark.isoformat(),
+            "built_at": time.time(),
+        }))
+        os.replace(tmp_meta, self._meta_path)
+
+    # ----- loading from the database ------------------------------------
+
+    def _fetch_rows(self, job_ids: Optional[Iterable[str]] = None):
+        """Yield (job_id, vector, created_at) for active jobs' embedding chunks."""
+        if connection.vendor == "postgresql":
+            sql = (
+                f"SELECT e.job_id, {vector_column('e.embedding')}, e.created_at "
+                "FROM job_embeddings e JOIN jobs j ON j.id = e.job_id "
+                "WHERE j.is_active = TRUE AND e.embedding IS NOT NULL"
+            )
+            params: list = []
+            if job_ids is not None:
+                sql += " AND e.job_id = ANY(%s::uuid[])"
+                params.append(list(job_ids))
+            with connection.cursor() as c:
+                c.execute(sql, params)
+                for job_id, emb, created_at in c.fetchall():
+                    yield str(job_id), from_pg_vector(emb), created_at
+            return
+
+        from .supabase_models import JobEmbedding
+        qs = JobEmbedding.objects.filter(job__is_active=True, embedding__isnull=False)
+        if job_ids is not None:
+            qs = qs.filter(job_id__in=list(job_ids))
+        for job_id, emb, created_at in qs.values_list("job_id", "embedding", "created_at").iterator():
+            yield str(job_id), from_pg_vector(emb), created_at
+
+    def _advance_watermark(self, created_at):
+        stamp = _as_aware(created_at)
+        if stamp is not None and stamp > self._watermark:
+            self._watermark = stamp
+
+    def _changed_since(self, watermark: datetime) -> Set[str]:
+        """Job ids with embedding rows written after `watermark`; advances the watermark."""
+        from .supabase_models import JobEmbedding
+        from django.db.models import Max
+        rows = (
+            JobEmbedding.objects.filter(created_at__gt=_db_datetime(watermark))
+            .values("job_id")
+            .annotate(latest=Max("created_at"))
+        )
+        changed = set()
+        for row in rows:
+            changed.add(str(row["job_id"]))
+            self._advance_watermark(row["latest"])
+        return changed
+
+    def _jobs_with_rows(self) -> Set[str]:
+        from .supabase_models import JobEmbedding
+        return {str(j) for j in JobEmbedding.objects.values_list("job_id", flat=True).distinct()}
+
+    def _collect(self, rows) -> Tuple[List[np.ndarray], List[str]]:
+        vecs, ids = [], []
+        for job_id, vec, created_at in rows:
+            if vec is None or not len(vec):
+                continue
+            if self._dim is None:
+                self._dim = int(len(vec))
+            if len(vec) != self._dim:
+                continue
+            vecs.append(vec)
+            ids.append(job_id)
+            self._advance_watermark(created_at)
+        return vecs, ids
+
+    def rebuild(self):
+        """Load every active job's chunk vectors and rewrite the on-disk index."""
+        with self._lock:
+            self._dim = None
+            self._watermark = _EPOCH
+            vecs, ids = self._collect(self._fetch_rows())
+            matrix = _normalize(np.vstack(vecs)) if vecs else np.zeros((0, self._dim or 0), dtype=np.float32)
+            id_arr = np.array(ids, dtype="<U36")
+            self._save(matrix, id_arr)
+            self._load_from_disk()
+            self._loaded = True
+            self._dirty = False
+            self._last_refresh = time.monotonic()
+            logger.info(f"Local vector index rebuilt: {len(id_arr)} chunks, dim={self._dim}")
+
+    def _indexed_job_ids(self) -> Set[str]:
+        ids = set(self._base_ids[self._base_alive].tolist())
+        ids.update(self._delta_ids)
+        return ids
+
+    def _drop_jobs(self, job_ids: Set[str]):
+        if not job_ids:
+            return
+        if len(self._base_ids):
+            self._base_alive &= ~np.isin(self._base_ids, list(job_ids))
+        keep = [i for i, jid in enumerate(self._delta_ids) if jid not in job_ids]
+        self._delta = [self._delta[i] for i in keep]
+        self._delta_ids = [self._delta_ids[i] for i in keep]
+
+    def refresh(self, force: bool = False):
+        """Apply job activations/deactivations and new embedding rows since the last refresh."""
+        with self._lock:
+            if not self._loaded:
+                if not self._load_from_disk():
+                    self.rebuild()
+                    return
+                self._loaded = True
+                force = True
+            if not force and not self._dirty and time.monotonic() - self._last_refresh < VECTOR_INDEX_REFRESH_SECONDS:
+                return
+
+            from .supabase_models import Job
+            active = {str(j) for j in Job.objects.filter(is_active=True).values_list("id", flat=True)}
+            changed = self._changed_since(self._watermark)
+            indexed = self._indexed_job_ids()
+
+            # Re-embedded jobs get all their chunks reloaded; deactivated jobs and jobs
+            # whose chunks were all deleted (no newer row to notice) disappear
+            self._drop_jobs((indexed - active) | (indexed - self._jobs_with_rows()) | changed)
+            to_load = (changed | (active - indexed)) & active
+            if to_load:
+                new_vecs, new_ids = self._collect(self._fetch_rows(job_ids=to_load))
+                if new_vecs:
+                    self._delta.append(_normalize(np.vstack(new_vecs)))
+                    self._delta_ids.extend(new_ids)
+
+            self._dirty = False
+            self._last_refresh = time.monotonic()
+            dead = int(len(self._base_alive) - self._base_alive.sum())
+            if len(self._delta_ids) + dead >= VECTOR_INDEX_COMPACT_ROWS:
+                self._compact()
+
+    def _compact(self):
+        parts = [np.asarray(self._base)[self._base_alive]] if len(self._base_ids) else []
+        parts += self._delta
+        ids = list(np.asarray(self._base_ids)[self._base_alive]) + self._delta_ids
+        matrix = np.vstack(parts) if parts else np.zeros((0, self._dim or 0), dtype=np.float32)
+        self._save(np.ascontiguousarray(matrix, dtype=np.float32), np.array(ids, dtype="<U36"))
+        self._load_from_disk()
+
+    def mark_dirty(self):
+        """Force the next search to refresh (call after a job write)."""
+        self._dirty = True
+
+    # ----- search ------------------------------------------------------
+
+    def _scores(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best score over all query vectors for every live chunk row."""
+        scores, ids = [], []
+        if len(self._base_ids):
+            base_scores = (queries @ np.asarray(self._base).T).max(axis=0)
+            base_scores[~self._base_alive] = -np.inf
+            scores.append(base_scores)
+            ids.append(np.asarray(self._base_ids))
+        for block in self._delta:
+            scores.append((queries @ block.T).max(axis=0))
+        if self._delta_ids:
+            ids.append(np.array(self._delta_ids, dtype="<U36"))
+        if not scores:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype="<U36")
+        return np.concatenate(scores), np.concatenate(ids)
+
+    def search(
+        self,
+        embeddings: List[List[float]],
+        top_n: int = 10,
+        similarity_threshold: float = 0.0,
+        allowed_job_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return [(job_id, score)] ordered by score, best chunk per job (optionally only allowed jobs)."""
+        self.refresh()
+        with self._lock:
+            if not self._dim:
+                return []
+            queries = [np.asarray(e, dtype=np.float32) for e in embeddings if e is not None and len(e) == self._dim]
+            if not queries:
+                return []
+            scores, ids = self._scores(_normalize(np.vstack(queries)))
+
+        if allowed_job_ids is not None and len(scores):
+            scores[~np.isin(ids, list(allowed_job_ids))] = -np.inf
+
+        if not len(scores):
+            return []
+        # Over-fetch chunk rows so that, after keeping one row per job, top_n jobs remain
+        k = min(len(scores), max(top_n * 8, 100))
+        cand = np.argpartition(-scores, k - 1)[:k]
+        cand = cand[np.argsort(-scores[cand])]
+
+        results: Dict[str, float] = {}
+        for idx in cand:
+            score = float(scores[idx])
+            if score == -np.inf or score < similarity_threshold:
+                break
+            job_id = str(ids[idx])
+            if job_id not in results:
+                results[job_id] = score
+                if len(results) >= top_n:
+                    break
+        return list(results.items())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "dim": self._dim,
+                "base_rows": int(len(self._base_ids)),
+                "dead_rows": int(len(self._base_alive) - self._base_alive.sum()),
+                "delta_rows": len(self._delta_ids),
+                "watermark": self._watermark.isoformat(),
+                "path": str(self._matrix_path),
+            }
+
+
+_index: Optional[LocalVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_local_index() -> LocalVectorIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LocalVectorIndex()
+        return _index
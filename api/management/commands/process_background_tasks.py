@@ -0,0 +1,51 @@
+"""
+Run calls queued with "async": true by the slow LLM endpoints (api/task_queue.py).
+
+Usage:
+    python manage.py process_background_tasks                    # drain once and exit
+    python manage.py process_background_tasks --loop             # keep polling (run as a worker)
+    python manage.py process_background_tasks --loop --concurrency 4
+    python manage.py process_background_tasks --purge-days 7     # also delete old finished tasks
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.task_models import BackgroundTask
+from api.task_queue import drain, purge
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks for the async LLM endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=4, help="Tasks claimed per batch")
+        parser.add_argument("--concurrency", type=int, default=1, help="Tasks run in parallel per process")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new tasks")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds between polls when idle (--loop)")
+        parser.add_argument("--purge-days", type=int, default=None, help="Delete finished tasks older than this")
+
+    def handle(self, *args, **options):
+        if options["purge_days"] is not None:
+            deleted = purge(max(0, options["purge_days"]))
+            self.stdout.write(f"Purged {deleted} finished tasks")
+
+        batch_size = max(1, options["batch_size"])
+        concurrency = max(1, options["concurrency"])
+        while True:
+            started = time.monotonic()
+            counts = drain(batch_size, concurrency)
+            processed = counts["done"] + counts["failed"]
+            if processed:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f"Ran {processed} tasks ({counts['done']} done, {counts['failed']} failed or retrying) "
+                    f"in {elapsed:.1f}s"
+                )
+            if not options["loop"]:
+                break
+            if not processed:
+                time.sleep(options["sleep"])
+
+        pending = BackgroundTask.objects.filter(status=BackgroundTask.STATUS_PENDING).count()
+        self.stdout.write(f"Queue drained; {pending} tasks waiting on retry backoff")
@@ -0,0 +1,55 @@
+"""
+Drain the embedding outbox filled by JobViewSet.create and CVUploadView.
+
+Usage:
+    python manage.py process_embedding_outbox            # drain once and exit
+    python manage.py process_embedding_outbox --loop     # keep polling (run as a worker)
+    python manage.py process_embedding_outbox --retry-failed
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.embedding_models import EmbeddingOutboxItem
+from api.embedding_outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Embed queued jobs and CVs from the embedding outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20, help="Items claimed per batch")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new items")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds between polls when idle (--loop)")
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Re-queue items that exhausted their attempts before draining",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            requeued = EmbeddingOutboxItem.objects.filter(status=EmbeddingOutboxItem.STATUS_FAILED).update(
+                status=EmbeddingOutboxItem.STATUS_PENDING, attempts=0, available_at=timezone.now()
+            )
+            self.stdout.write(f"Re-queued {requeued} failed items")
+
+        batch_size = max(1, options["batch_size"])
+        while True:
+            started = time.monotonic()
+            counts = drain(batch_size)
+            processed = counts["done"] + counts["failed"]
+            if processed:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f"Processed {processed} items ({counts['done']} done, {counts['failed']} failed) "
+                    f"in {elapsed:.1f}s"
+                )
+            if not options["loop"]:
+                break
+            if not processed:
+                time.sleep(options["sleep"])
+
+        pending = EmbeddingOutboxItem.objects.filter(status=EmbeddingOutboxItem.STATUS_PENDING).count()
+        self.stdout.write(f"Outbox drained; {pending} items waiting on retry backoff")
@@ -1,15 +1,62 @@
+"""
+Incrementally (re)index job embeddings into job_embeddings.
+
+Each job's indexed text hash and embedding model are kept in job_index_state;
+jobs whose text and model are unchanged are skipped, changed jobs have their
+old chunks replaced in bulk, and deactivated jobs have their chunks removed. Chunks
+are embedded on a bounded thread pool while the main thread writes results.
+Progress is checkpointed after every page of jobs so an interrupted run can
+continue with --resume.
+
+Usage:
+    python manage.py reindex_job_embeddings
+    python manage.py reindex_job_embeddings --workers 8 --page-size 200
+    python manage.py reindex_job_embeddings --resume
+    python manage.py reindex_job_embeddings --full
+    python manage.py reindex_job_embeddings --summaries-only
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from decouple import config
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, connections
+
+from api.embedding_models import JobIndexState
+from api.index_metadata import refresh_index_metadata
+from api.match_table import forget_jobs, refresh_job_matches
+from api.rag import (
+    chunk_text,
+    content_hash,
+    embed_texts,
+    embedding_model_name,
+    job_index_text,
+    record_job_index_state,
+    refresh_job_summaries,
+)
+from api.search_cache import bump_job_index_version
 from api.supabase_models import Job
-from api.rag import embed_text, chunk_text
-from decouple import config
-import uuid
+from api.vector_writer import EmbeddingWriter
 
 EMB_DIM = config("FIREWORKS_EMBEDDING_DIM", default=None, cast=int)
+DEFAULT_CHECKPOINT = Path(settings.BASE_DIR) / "var" / "reindex_job_embeddings.checkpoint.json"
+
+
+def _embed_job(job_id: str, text: str):
+    try:
+        chunks = chunk_text(text)
+        embeddings, embed_errors = embed_texts(chunks)
+        return job_id, text, chunks, embeddings, embed_errors
+    finally:
+        # Pool threads open their own DB connections (embedding cache lookups)
+        connections.close_all()
 
 
 class Command(BaseCommand):
-    help = "Re-index job embeddings into job_embeddings table."
+    help = "Incrementally re-index job embeddings into job_embeddings table."
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -17,67 +64,201 @@ class Command(BaseCommand):
             action="store_true",
             help="Only generate embeddings for jobs that do not have embeddings yet",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-embed every active job even if its text and model are unchanged",
+        )
+        parser.add_argument(
+            "--summaries-only",
+            action="store_true",
+            help="Only recompute job_summary_embeddings from the existing chunks",
+        )
         parser.add_argument(
             "--limit",
             type=int,
             default=0,
             help="Limit number of jobs to process (0 = no limit)",
         )
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent embedding requests")
+        parser.add_argument("--page-size", type=int, default=100, help="Jobs per page (and per checkpoint)")
+        parser.add_argument("--resume", action="store_true", help="Continue after the last checkpointed job")
+        parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT), help="Checkpoint file path")
 
     def handle(self, *args, **options):
+        if options["summaries_only"]:
+            refresh_job_summaries()
+            self.stdout.write("Job summary embeddings refreshed.")
+            return
+
         only_missing = options["only_missing"]
+        full = options["full"]
         limit = options["limit"]
+        page_size = max(1, options["page_size"])
+        checkpoint = Path(options["checkpoint"])
+        model_name = embedding_model_name()
 
-        # determine job queryset
-        qs = Job.objects.all()
+        cursor_id = None
+        if options["resume"] and checkpoint.exists():
+            state = json.loads(checkpoint.read_text())
+            if state.get("embedding_model") == model_name:
+                cursor_id = state.get("last_job_id")
+                self.stdout.write(f"Resuming after job {cursor_id}")
+            else:
+                self.stdout.write(self.style.WARNING("Checkpoint was written for another embedding model; starting over"))
 
-        if only_missing:
-            # find job ids that already have embeddings
-            with connection.cursor() as c:
-                c.execute("SELECT DISTINCT job_id FROM job_embeddings")
-                rows = c.fetchall()
-            existing_ids = {str(r[0]) for r in rows}
-            qs = qs.exclude(id__in=existing_ids)
-
-        if limit and limit > 0:
-            qs = qs[:limit]
+        removed = self._remove_inactive()
+        if removed:
+            self.stdout.write(f"Removed chunks for {removed} inactive jobs")
 
-        total = qs.count()
-        self.stdout.write(f"Processing {total} jobs (only_missing={only_missing}, limit={limit})")
-
-        processed = 0
-        inserted = 0
+        stats = {"seen": 0, "indexed": 0, "skipped": 0, "chunks": 0}
         errors = []
+        page_failed = False
+        started = time.monotonic()
 
-        for job in qs:
-            processed += 1
-            title = job.title
-            description = getattr(job, "description", "") or ""
-            requirements = getattr(job, "requirements", "") or ""
-            text = f"{title}\n{description}\n{requirements}".strip()
-            if not text:
-                continue
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            while True:
+                qs = Job.objects.filter(is_active=True).order_by("id")
+                if cursor_id:
+                    qs = qs.filter(id__gt=cursor_id)
+                page = list(qs.values("id", "title", "description", "requirements")[:page_size])
+                if not page:
+                    break
+                if limit:
+                    page = page[: max(limit - stats["seen"], 0)]
+                stats["seen"] += len(page)
 
-            chunks = chunk_text(text)
-            for i, chunk in enumerate(chunks or []):
-                try:
-                    emb = embed_text(chunk)
-                    if EMB_DIM and len(emb) != EMB_DIM:
-                        errors.append(f"job {job.id} chunk {i}: unexpected dim {len(emb)}")
+                todo = self._jobs_to_index(page, only_missing, full, model_name)
+                stats["skipped"] += len(page) - len(todo)
+
+                futures = [pool.submit(_embed_job, job_id, text) for job_id, text in todo.items()]
+                writer = EmbeddingWriter("job_embeddings")
+                written = {}
+                for fut in as_completed(futures):
+                    try:
+                        job_id, text, chunks, embeddings, embed_errors = fut.result()
+                    except Exception as e:
+                        errors.append(f"embedding worker: {e}")
                         continue
+                    job_errors = [f"job {job_id} chunk {i}: {msg}" for i, msg in embed_errors.items()]
+                    vectors = []
+                    for i, emb in enumerate(embeddings):
+                        if emb is None:
+                            continue
+                        if EMB_DIM and len(emb) != EMB_DIM:
+                            job_errors.append(f"job {job_id} chunk {i}: unexpected dim {len(emb)}")
+                            continue
+                        vectors.append(emb)
+                    if text.strip() and not vectors and not job_errors:
+                        job_errors.append(f"job {job_id}: embedding produced no vectors")
+                    if job_errors:
+                        # Keep the stored chunks; the job is not recorded, so the next run retries it
+                        errors.extend(job_errors)
+                        continue
+                    writer.replace(job_id, vectors)
+                    written[job_id] = (text, len(vectors))
 
-                    emb_literal = "[" + ",".join(map(str, emb)) + "]"
-                    with connection.cursor() as c:
-                        c.execute(
-                            "INSERT INTO job_embeddings (id, job_id, created_at, embedding) VALUES (%s, %s, NOW(), %s::vector)",
-                            [str(uuid.uuid4()), str(job.id), emb_literal],
-                        )
-                    inserted += 1
+                # One transaction per page: old chunks deleted, new ones bulk-inserted
+                try:
+                    stats["chunks"] += writer.flush()
+                    stats["indexed"] += len(written)
+                    refresh_job_summaries(list(written))
+                    for job_id, (text, chunk_count) in written.items():
+                        record_job_index_state(job_id, text, chunk_count)
+                    for job_id in written:
+                        refresh_job_matches(job_id)
+                    if written:
+                        bump_job_index_version()
                 except Exception as e:
-                    errors.append(f"job {job.id} chunk {i}: {e}")
+                    # Stop before the checkpoint moves past this page, so --resume retries it
+                    errors.append(f"page after {cursor_id}: {e}")
+                    page_failed = True
+                    break
 
-        self.stdout.write(f"Done. processed={processed}, inserted_chunks={inserted}, errors={len(errors)}")
+                cursor_id = str(page[-1]["id"])
+                self._write_checkpoint(checkpoint, cursor_id, model_name)
+                self._report(stats, started)
+                if limit and stats["seen"] >= limit:
+                    break
+
+        if not limit and not page_failed and checkpoint.exists():
+            checkpoint.unlink()
+        refresh_index_metadata()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"Done. seen={stats['seen']}, indexed={stats['indexed']}, skipped={stats['skipped']}, "
+            f"inserted_chunks={stats['chunks']}, errors={len(errors)}, "
+            f"{stats['indexed'] / elapsed:.2f} jobs/s, {stats['chunks'] / elapsed:.2f} chunks/s"
+        )
         if errors:
             self.stdout.write("Errors (first 20):")
             for e in errors[:20]:
                 self.stdout.write(str(e))
+        if page_failed:
+            self.stdout.write(self.style.WARNING("Stopped at a page that failed to write; rerun with --resume to retry it"))
+
+    def _jobs_to_index(self, page, only_missing, full, model_name):
+        """Map job_id -> text for the jobs on this page that need (re-)embedding."""
+        ids = [str(j["id"]) for j in page]
+        states = {str(s.job_id): s for s in JobIndexState.objects.filter(job_id__in=ids)}
+        with_chunks = set()
+        if only_missing:
+            with connection.cursor() as c:
+                c.execute("SELECT DISTINCT job_id FROM job_embeddings WHERE job_id = ANY(%s::uuid[])", [ids])
+                with_chunks = {str(r[0]) for r in c.fetchall()}
+
+        todo = {}
+        for job in page:
+            job_id = str(job["id"])
+            text = job_index_text(job["title"], job["description"], job["requirements"])
+            if not text:
+                continue
+            if only_missing and job_id in with_chunks:
+                continue
+            state = states.get(job_id)
+            if (
+                not full
+                and state is not None
+                and state.content_hash == content_hash(text)
+                and state.embedding_model == model_name
+            ):
+                continue
+            todo[job_id] = text
+        return todo
+
+    def _remove_inactive(self) -> int:
+        """Drop chunks, summaries, index state and CV matches of jobs that are no longer active."""
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT DISTINCT e.job_id
+                FROM job_embeddings e
+                JOIN jobs j ON j.id = e.job_id
+                WHERE j.is_active = FALSE
+                """
+            )
+            inactive = [str(r[0]) for r in c.fetchall()]
+        if not inactive:
+            return 0
+        with EmbeddingWriter("job_embeddings") as writer:
+            for job_id in inactive:
+                writer.replace(job_id, [])
+        JobIndexState.objects.filter(job_id__in=inactive).delete()
+        forget_jobs(inactive)
+        refresh_job_summaries(inactive)
+        bump_job_index_version()
+        return len(inactive)
+
+    def _write_checkpoint(self, path: Path, last_job_id: str, model_name: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"last_job_id": last_job_id, "embedding_model": model_name, "written_at": time.time()}))
+        tmp.replace(path)
+
+    def _report(self, stats, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"  {stats['seen']} seen, {stats['indexed']} indexed, {stats['skipped']} skipped | "
+            f"{stats['indexed'] / elapsed:.2f} jobs/s, {stats['chunks'] / elapsed:.2f} chunks/s"
+        )
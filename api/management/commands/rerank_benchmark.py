@@ -0,0 +1,80 @@
+"""
+Measure the latency the skill-overlap rerank stage (api/skill_rerank.py) adds
+on top of the vector search.
+
+Candidates are sampled from active jobs with random cosine scores, so only the
+rerank itself is timed; the CV text is a stored CV (or --text).
+
+Usage:
+    python manage.py rerank_benchmark
+    python manage.py rerank_benchmark --candidates 200 --iterations 500
+    python manage.py rerank_benchmark --text "Python, Django, PostgreSQL, Docker"
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.skill_rerank import RERANK_CANDIDATES, get_skill_index, rerank_jobs
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the added latency of the skill-overlap rerank stage."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=RERANK_CANDIDATES, help="Candidates per rerank")
+        parser.add_argument("--iterations", type=int, default=200, help="Timed reranks")
+        parser.add_argument("--top-n", type=int, default=10, help="Results kept after reranking")
+        parser.add_argument("--text", default="", help="CV text to extract skills from (default: a stored CV)")
+
+    def handle(self, *args, **options):
+        from api.supabase_models import CV, Job
+
+        index = get_skill_index()
+        started = time.perf_counter()
+        index.refresh()
+        build_ms = (time.perf_counter() - started) * 1000
+        stats = index.stats()
+        self.stdout.write(
+            f"Index build: {build_ms:.1f}ms ({stats['jobs']} jobs, {stats['skills']} skills, "
+            f"{stats['bitset_bytes']} bytes of bitsets)"
+        )
+
+        text = options["text"] or (
+            CV.objects.exclude(parsed_text__isnull=True).exclude(parsed_text="")
+            .order_by("-created_at").values_list("parsed_text", flat=True).first()
+            or ""
+        )
+        if not text:
+            raise CommandError("No stored CV text; pass --text")
+        started = time.perf_counter()
+        skills = index.text_skills(text)
+        self.stdout.write(f"CV skill extraction (uncached): {(time.perf_counter() - started) * 1000:.2f}ms, "
+                          f"{len(skills)} skills found")
+
+        job_ids = list(Job.objects.filter(is_active=True).values_list("id", flat=True)[: options["candidates"]])
+        if not job_ids:
+            raise CommandError("No active jobs to rerank")
+        rng = random.Random(0)
+        rows = [(job_id, "", "", "", None, rng.uniform(0.3, 0.9)) for job_id in job_ids]
+
+        latency = []
+        for _ in range(max(1, options["iterations"])):
+            rng.shuffle(rows)
+            started = time.perf_counter()
+            rerank_jobs(rows, text, top_n=options["top_n"])
+            latency.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(
+            f"Rerank of {len(rows)} candidates: p50={_percentile(latency, 50):.2f}ms "
+            f"p95={_percentile(latency, 95):.2f}ms mean={statistics.mean(latency):.2f}ms "
+            f"max={max(latency):.2f}ms"
+        )
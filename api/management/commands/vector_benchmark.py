@@ -0,0 +1,120 @@
+"""
+Compare compact (quantized) vector search against the current full-precision
+search_similar_jobs: recall@k and latency per configuration.
+
+Query vectors are sampled from stored CV chunks (falling back to job chunks).
+The baseline for recall is search_similar_jobs with quantization off.
+
+Usage:
+    python manage.py vector_benchmark
+    python manage.py vector_benchmark --queries 200 --k 10 --ef-search 100
+    python manage.py vector_benchmark --configs halfvec,halfvec-norescore,binary
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.rag import search_similar_jobs
+from api.vector_adapter import from_pg_vector, vector_column
+
+# name -> (quantization, rescore)
+CONFIGS = {
+    "halfvec": ("halfvec", True),
+    "halfvec-norescore": ("halfvec", False),
+    "binary": ("binary", True),
+}
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = "Benchmark recall@k and latency of quantized vector search against full precision."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=50, help="Number of sampled query vectors")
+        parser.add_argument("--k", type=int, default=10, help="Result depth for recall@k")
+        parser.add_argument("--ef-search", type=int, default=0, help="hnsw.ef_search for every run")
+        parser.add_argument("--probes", type=int, default=0, help="ivfflat.probes for every run")
+        parser.add_argument(
+            "--configs",
+            default=",".join(CONFIGS),
+            help=f"Comma-separated subset of: {', '.join(CONFIGS)}",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The quantized search paths require PostgreSQL with pgvector")
+        names = [n.strip() for n in options["configs"].split(",") if n.strip()]
+        unknown = [n for n in names if n not in CONFIGS]
+        if unknown:
+            raise CommandError(f"Unknown config(s): {', '.join(unknown)}")
+
+        queries = self._sample_queries(options["queries"])
+        if not queries:
+            raise CommandError("No stored vectors to sample queries from")
+        k = options["k"]
+        knobs = {"ef_search": options["ef_search"], "probes": options["probes"]}
+        self.stdout.write(f"{len(queries)} queries, k={k}")
+
+        baseline, base_latency = self._run(queries, k, quantization="none", rescore=None, **knobs)
+        self._report("full precision", base_latency, None)
+
+        for name in names:
+            quantization, rescore = CONFIGS[name]
+            try:
+                results, latency = self._run(queries, k, quantization=quantization, rescore=rescore, **knobs)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{name}: {e}"))
+                continue
+            recalls = [
+                len(set(got) & set(expected)) / len(expected)
+                for got, expected in zip(results, baseline)
+                if expected
+            ]
+            self._report(name, latency, statistics.mean(recalls) if recalls else None)
+
+    def _sample_queries(self, n):
+        for table in ("cv_embeddings", "job_embeddings"):
+            with connection.cursor() as c:
+                c.execute(
+                    f"SELECT {vector_column('embedding')} FROM {table} "
+                    "WHERE embedding IS NOT NULL ORDER BY random() LIMIT %s",
+                    [n],
+                )
+                rows = [from_pg_vector(r[0]) for r in c.fetchall()]
+            if rows:
+                return [r.tolist() for r in rows]
+        return []
+
+    def _run(self, queries, k, quantization, rescore, ef_search, probes):
+        results, latency = [], []
+        for vec in queries:
+            started = time.perf_counter()
+            rows = search_similar_jobs(
+                vec,
+                top_n=k,
+                similarity_threshold=-1.0,
+                ef_search=ef_search or None,
+                probes=probes or None,
+                mode="chunks",
+                quantization=quantization,
+                rescore=rescore,
+            )
+            latency.append((time.perf_counter() - started) * 1000)
+            results.append([str(r[0]) for r in rows[:k]])
+        return results, latency
+
+    def _report(self, name, latency, recall):
+        recall_text = "baseline" if recall is None else f"recall@k={recall:.3f}"
+        self.stdout.write(
+            f"  {name:<20} {recall_text:<16} "
+            f"p50={_percentile(latency, 50):.1f}ms p95={_percentile(latency, 95):.1f}ms "
+            f"mean={statistics.mean(latency):.1f}ms"
+        )
@@ -0,0 +1,262 @@
+"""
+Create, rebuild and inspect pgvector ANN indexes on job_embeddings, cv_embeddings
+and job_summary_embeddings.
+
+Usage:
+    python manage.py vector_index inspect
+    python manage.py vector_index create --type hnsw --m 16 --ef-construction 64
+    python manage.py vector_index create --type ivfflat --lists 1000 --table cv_embeddings
+    python manage.py vector_index rebuild --type hnsw --concurrently   # old index serves until the new one is built
+    python manage.py vector_index drop --table all
+    python manage.py vector_index explain --ef-search 100
+    python manage.py vector_index create --type hnsw --quantization halfvec
+
+Searches pick up per-query recall settings from VECTOR_EF_SEARCH /
+VECTOR_IVFFLAT_PROBES (see api.rag.apply_ann_settings).
+
+--quantization builds the index over a compact expression of the full-precision
+column (halfvec: half the index size; binary: 1/32, Hamming distance) for use
+with VECTOR_QUANTIZATION. Requires pgvector >= 0.7.
+"""
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.rag import QUANTIZATIONS, apply_ann_settings, dimensioned_expression, quantized_expression
+
+TABLES = ["job_embeddings", "cv_embeddings", "job_summary_embeddings"]
+INDEX_TYPES = ["hnsw", "ivfflat"]
+
+
+OPCLASSES = {
+    "none": "vector_cosine_ops",
+    "halfvec": "halfvec_cosine_ops",
+    "binary": "bit_hamming_ops",
+}
+
+
+def index_name(table: str, index_type: str, quantization: str = "none") -> str:
+    if quantization == "none":
+        return f"{table}_embedding_{index_type}_idx"
+    return f"{table}_embedding_{quantization}_{index_type}_idx"
+
+
+class Command(BaseCommand):
+    help = "Manage ANN (HNSW / IVFFlat) indexes on the embedding tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["create", "rebuild", "drop", "inspect", "explain"])
+        parser.add_argument(
+            "--table",
+            choices=TABLES + ["all"],
+            default="job_embeddings",
+            help="Embedding table to operate on",
+        )
+        parser.add_argument("--type", dest="index_type", choices=INDEX_TYPES, default="hnsw")
+        parser.add_argument(
+            "--quantization",
+            choices=QUANTIZATIONS,
+            default="none",
+            help="create/explain: index a compact halfvec or binary expression of the column",
+        )
+        parser.add_argument("--m", type=int, default=16, help="HNSW: max connections per layer")
+        parser.add_argument("--ef-construction", type=int, default=64, help="HNSW: build-time candidate list size")
+        parser.add_argument(
+            "--lists",
+            type=int,
+            default=0,
+            help="IVFFlat: number of lists (0 = rows/1000, or sqrt(rows) above 1M rows)",
+        )
+        parser.add_argument("--concurrently", action="store_true", help="Build without blocking writes")
+        parser.add_argument(
+            "--maintenance-work-mem",
+            default="",
+            help="maintenance_work_mem for the build, e.g. 2GB (HNSW builds are much faster when the graph fits)",
+        )
+        parser.add_argument("--ef-search", type=int, default=0, help="explain: hnsw.ef_search for the sample query")
+        parser.add_argument("--probes", type=int, default=0, help="explain: ivfflat.probes for the sample query")
+        parser.add_argument("--top-n", type=int, default=10, help="explain: LIMIT of the sample query")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("ANN indexes require PostgreSQL with the pgvector extension")
+
+        tables = TABLES if options["table"] == "all" else [options["table"]]
+        action = options["action"]
+        for table in tables:
+            if action == "inspect":
+                self._inspect(table)
+            elif action == "create":
+                self._create(table, options)
+            elif action == "rebuild":
+                self._rebuild(table, options)
+            elif action == "drop":
+                self._drop(table, options["concurrently"])
+            elif action == "explain":
+                self._explain(table, options)
+
+    def _existing_indexes(self, table: str):
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT i.indexname, i.indexdef,
+                       pg_relation_size((quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass) AS size_bytes,
+                       COALESCE(s.idx_scan, 0)
+                FROM pg_indexes i
+                LEFT JOIN pg_stat_user_indexes s ON s.indexrelname = i.indexname
+                WHERE i.tablename = %s
+                  AND (i.indexdef ILIKE '%%USING hnsw%%' OR i.indexdef ILIKE '%%USING ivfflat%%')
+                ORDER BY i.indexname
+                """,
+                [table],
+            )
+            return c.fetchall()
+
+    def _row_count(self, table: str) -> int:
+        with connection.cursor() as c:
+            # Planner estimate: avoids a full COUNT(*) on large tables
+            c.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = c.fetchone()
+            estimate = int(row[0]) if row and row[0] is not None else -1
+            if estimate < 0:
+                c.execute(f"SELECT COUNT(*) FROM {table}")
+                estimate = c.fetchone()[0]
+        return estimate
+
+    def _inspect(self, table: str):
+        rows = self._row_count(table)
+        dims = self._dims(table)
+        with connection.cursor() as c:
+            c.execute("SELECT current_setting('hnsw.ef_search', true), current_setting('ivfflat.probes', true)")
+            ef_search, probes = c.fetchone()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(table))
+        self.stdout.write(f"  rows (estimate): {rows}")
+        self.stdout.write(f"  embedding dims:  {dims}")
+        self.stdout.write(f"  hnsw.ef_search={ef_search}  ivfflat.probes={probes}")
+        indexes = self._existing_indexes(table)
+        if not indexes:
+            self.stdout.write(self.style.WARNING("  no ANN index: similarity search will sequential-scan"))
+            return
+        for name, definition, size_bytes, scans in indexes:
+            self.stdout.write(f"  {name}: {size_bytes / (1024 * 1024):.1f} MB, {scans} scans")
+            self.stdout.write(f"    {definition}")
+
+    def _dims(self, table: str):
+        with connection.cursor() as c:
+            c.execute(f"SELECT vector_dims(embedding) FROM {table} WHERE embedding IS NOT NULL LIMIT 1")
+            one = c.fetchone()
+        return one[0] if one else None
+
+    def _declared_dims(self, table: str):
+        """Dimension of the embedding column's type, or None for a plain `vector`."""
+        with connection.cursor() as c:
+            c.execute(
+                "SELECT atttypmod FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'embedding'",
+                [table],
+            )
+            one = c.fetchone()
+        return one[0] if one and one[0] > 0 else None
+
+    def _index_expression(self, table: str, quantization: str) -> str:
+        if quantization == "none" and self._declared_dims(table):
+            return "embedding"
+        dims = self._dims(table)
+        if not dims:
+            raise CommandError(f"{table} is empty; indexing it needs the vector dimension")
+        if quantization == "none":
+            # pgvector refuses ANN indexes on a column without a dimension
+            return dimensioned_expression("embedding", dims)
+        column, _ = quantized_expression("embedding", quantization, dims)
+        return column
+
+    def _create(self, table: str, options, name: str = ""):
+        index_type = options["index_type"]
+        quantization = options["quantization"]
+        name = name or index_name(table, index_type, quantization)
+        column = self._index_expression(table, quantization)
+        if index_type == "hnsw":
+            with_clause = f"m = {int(options['m'])}, ef_construction = {int(options['ef_construction'])}"
+        else:
+            lists = options["lists"]
+            if not lists:
+                rows = max(self._row_count(table), 1)
+                lists = int(math.sqrt(rows)) if rows > 1_000_000 else max(rows // 1000, 1)
+            with_clause = f"lists = {int(lists)}"
+
+        concurrently = "CONCURRENTLY " if options["concurrently"] else ""
+        sql = (
+            f"CREATE INDEX {concurrently}IF NOT EXISTS {name} "
+            f"ON {table} USING {index_type} ({column} {OPCLASSES[quantization]}) WITH ({with_clause})"
+        )
+        self.stdout.write(f"{sql} ...")
+        with connection.cursor() as c:
+            if options["maintenance_work_mem"]:
+                c.execute("SELECT set_config('maintenance_work_mem', %s, false)", [options["maintenance_work_mem"]])
+            c.execute(sql)
+            c.execute(f"ANALYZE {table}")
+        self.stdout.write(self.style.SUCCESS(f"Created {name}"))
+
+    def _rebuild(self, table: str, options):
+        """
+        Build the new index under a temporary name first, so searches keep
+        using the old one for the whole build (and still have it if the build
+        fails), then swap it in.
+        """
+        concurrently = options["concurrently"]
+        name = index_name(table, options["index_type"], options["quantization"])
+        temp = f"{name}_rebuild"
+        with connection.cursor() as c:
+            # Left behind (possibly INVALID) by an interrupted rebuild
+            c.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {temp}")
+        self._create(table, options, name=temp)
+        # Only the index being replaced: other types and quantized indexes serve other searches
+        with connection.cursor() as c:
+            c.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}")
+            c.execute(f"ALTER INDEX {temp} RENAME TO {name}")
+        self.stdout.write(self.style.SUCCESS(f"Renamed {temp} to {name}"))
+
+    def _drop(self, table: str, concurrently: bool):
+        for name, _, _, _ in self._existing_indexes(table):
+            with connection.cursor() as c:
+                c.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}")
+            self.stdout.write(self.style.SUCCESS(f"Dropped {name}"))
+
+    def _explain(self, table: str, options):
+        owner = "cv_id" if table == "cv_embeddings" else "job_id"
+        with transaction.atomic(), connection.cursor() as c:
+            # Use a stored vector as the probe so the plan reflects real data
+            c.execute(f"SELECT embedding FROM {table} WHERE embedding IS NOT NULL LIMIT 1")
+            probe = c.fetchone()
+            if not probe:
+                raise CommandError(f"{table} is empty; nothing to explain")
+            apply_ann_settings(c, options["ef_search"], options["probes"])
+            order_by = "e.embedding <=> %s::vector"
+            if options["quantization"] == "none" and not self._declared_dims(table):
+                order_by = f"{dimensioned_expression('e.embedding', self._dims(table))} <=> %s::vector"
+            elif options["quantization"] != "none":
+                dims = self._dims(table)
+                expr, op = quantized_expression("e.embedding", options["quantization"], dims)
+                query_expr, _ = quantized_expression("%s::vector", options["quantization"], dims)
+                order_by = f"{expr} {op} {query_expr}"
+            c.execute(
+                f"""
+                EXPLAIN (ANALYZE, BUFFERS)
+                SELECT e.{owner}, (1 - (e.embedding <=> %s::vector)) AS score
+                FROM {table} e
+                ORDER BY {order_by}
+                LIMIT %s
+                """,
+                [probe[0], probe[0], options["top_n"]],
+            )
+            plan = [row[0] for row in c.fetchall()]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{table}: EXPLAIN ANALYZE (top {options['top_n']})"))
+        for line in plan:
+            self.stdout.write(f"  {line}")
+        uses_index = any("Index Scan" in line for line in plan)
+        if uses_index:
+            self.stdout.write(self.style.SUCCESS("  ANN index used"))
+        else:
+            self.stdout.write(self.style.WARNING("  ANN index NOT used (sequential scan)"))
@@ -0,0 +1,187 @@
+"""
+Materialized CV -> job matches (cv_job_matches).
+
+Each CV listed in cv_match_state has its top MATCH_TABLE_TOP_K jobs stored with
+their scores, so the dashboard and CVMatchView (mode="materialized", or
+MATCH_READ_MODE=materialized) read one indexed range instead of ranking every
+job on every request.
+
+Refresh is incremental:
+  - refresh_cv_matches(cv_id): after a CV is (re-)embedded, rank all active
+    jobs for that CV only.
+  - refresh_job_matches(job_id): after a job is embedded, updated or
+    deactivated, score that job against every materialized CV's chunk vectors,
+    insert it where it makes a CV's top-K and trim each CV back to K. A CV
+    whose match drops out can hold fewer than K rows until its next refresh.
+
+Rows carry an index_version derived from the embedding model; a CV whose rows
+were built with another version is re-ranked on its next read.
+"""
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from decouple import config
+from django.db import connection, transaction
+
+from .cv_vectors import get_cv_vectors
+from .embedding_models import CVJobMatch, CVMatchState
+from .rag import embedding_model_name, search_similar_jobs_multi
+from .vector_adapter import from_pg_vector
+
+MATCH_TABLE_TOP_K = config("MATCH_TABLE_TOP_K", default=100, cast=int)
+MATCH_TABLE_MIN_SCORE = config("MATCH_TABLE_MIN_SCORE", default=0.0, cast=float)
+# Default read mode of CVMatchView / DashboardView: "live" or "materialized"
+MATCH_READ_MODE = config("MATCH_READ_MODE", default="live")
+# Bump when the scoring itself changes so existing rows are rebuilt lazily
+MATCH_TABLE_SCHEMA = 1
+
+
+def match_index_version() -> int:
+    return zlib.crc32(f"{embedding_model_name()}#{MATCH_TABLE_SCHEMA}".encode("utf-8")) & 0x7FFFFFFF
+
+
+def refresh_cv_matches(cv_id, vectors: Optional[List[List[float]]] = None) -> int:
+    """Re-rank all active jobs for one CV; returns the number of stored matches."""
+    if vectors is None:
+        vectors = get_cv_vectors(cv_id)
+    rows = search_similar_jobs_multi(vectors, top_n=MATCH_TABLE_TOP_K, similarity_threshold=MATCH_TABLE_MIN_SCORE) if vectors else []
+    version = match_index_version()
+    with transaction.atomic():
+        CVJobMatch.objects.filter(cv_id=cv_id).delete()
+        CVJobMatch.objects.bulk_create([
+            CVJobMatch(cv_id=cv_id, job_id=row[0], score=float(row[5]), index_version=version)
+            for row in rows
+            if row and row[5] is not None
+        ])
+        CVMatchState.objects.update_or_create(cv_id=cv_id, defaults={"index_version": version})
+    return len(rows)
+
+
+def forget_cv(cv_id):
+    with transaction.atomic():
+        CVJobMatch.objects.filter(cv_id=cv_id).delete()
+        CVMatchState.objects.filter(cv_id=cv_id).delete()
+
+
+def forget_jobs(job_ids: List[str]):
+    """Drop deleted/deactivated jobs from every CV's matches."""
+    if job_ids:
+        CVJobMatch.objects.filter(job_id__in=[str(j) for j in job_ids]).delete()
+
+
+def refresh_job_matches(job_id):
+    """Rescore a single job against every materialized CV."""
+    from .supabase_models import Job
+
+    if not Job.objects.filter(id=job_id, is_active=True).exists():
+        forget_jobs([job_id])
+        return
+    version = match_index_version()
+    if connection.vendor == "postgresql":
+        _refresh_job_matches_pg(str(job_id), version)
+    else:
+        _refresh_job_matches_local(str(job_id), version)
+
+
+def _refresh_job_matches_pg(job_id: str, version: int):
+    with transaction.atomic(), connection.cursor() as c:
+        c.execute("DELETE FROM cv_job_matches WHERE job_id = %s", [job_id])
+        # Best (CV chunk, job chunk) pair per CV; the job side is only a few chunks
+        c.execute(
+            """
+            INSERT INTO cv_job_matches (cv_id, job_id, score, index_version, updated_at)
+            SELECT cv_id, %s, score, %s, NOW()
+            FROM (
+                SELECT ce.cv_id, MAX(1 - (ce.embedding <=> je.embedding)) AS score
+                FROM cv_embeddings ce
+                JOIN cv_match_state s ON s.cv_id = ce.cv_id AND s.index_version = %s
+                CROSS JOIN job_embeddings je
+                WHERE je.job_id = %s
+                GROUP BY ce.cv_id
+            ) scores
+            WHERE score >= %s
+            """,
+            [job_id, version, version, job_id, MATCH_TABLE_MIN_SCORE],
+        )
+        # Trim only the CVs this job touched back to their top K
+        c.execute(
+            """
+            DELETE FROM cv_job_matches m
+            USING (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY cv_id ORDER BY score DESC) AS rn
+                FROM cv_job_matches
+                WHERE cv_id IN (SELECT cv_id FROM cv_job_matches WHERE job_id = %s)
+            ) ranked
+            WHERE m.id = ranked.id AND ranked.rn > %s
+            """,
+            [job_id, MATCH_TABLE_TOP_K],
+        )
+
+
+def _refresh_job_matches_local(job_id: str, version: int):
+    from .supabase_models import CVEmbedding, JobEmbedding
+
+    job_vecs = [from_pg_vector(e) for e in JobEmbedding.objects.filter(job_id=job_id).values_list("embedding", flat=True)]
+    job_vecs = [v for v in job_vecs if v is not None and len(v)]
+    cv_ids = list(CVMatchState.objects.filter(index_version=version).values_list("cv_id", flat=True))
+    if not job_vecs or not cv_ids:
+        forget_jobs([job_id])
+        return
+    job_mat = np.vstack(job_vecs)
+    job_mat /= np.maximum(np.linalg.norm(job_mat, axis=1, keepdims=True), 1e-12)
+
+    scores: Dict[str, float] = {}
+    for cv_id, emb in CVEmbedding.objects.filter(cv_id__in=cv_ids).values_list("cv_id", "embedding"):
+        vec = from_pg_vector(emb)
+        if vec is None or len(vec) != job_mat.shape[1]:
+            continue
+        norm = np.linalg.norm(vec)
+        score = float((job_mat @ (vec / norm)).max()) if norm else 0.0
+        key = str(cv_id)
+        scores[key] = max(score, scores.get(key, -1.0))
+
+    with transaction.atomic():
+        CVJobMatch.objects.filter(job_id=job_id).delete()
+        for cv_id, score in scores.items():
+            if score < MATCH_TABLE_MIN_SCORE:
+                continue
+            kept = list(CVJobMatch.objects.filter(cv_id=cv_id).order_by("-score").values_list("score", flat=True)[:MATCH_TABLE_TOP_K])
+            if len(kept) >= MATCH_TABLE_TOP_K and score <= kept[-1]:
+                continue
+            CVJobMatch.objects.create(cv_id=cv_id, job_id=job_id, score=score, index_version=version)
+            overflow = CVJobMatch.objects.filter(cv_id=cv_id).order_by("-score").values_list("id", flat=True)[MATCH_TABLE_TOP_K:]
+            CVJobMatch.objects.filter(id__in=list(overflow)).delete()
+
+
+def get_cv_matches(cv_id, top_n: int = 10, similarity_threshold: float = 0.0) -> List[Tuple]:
+    """
+    Materialized matches for a CV as (id, title, description, requirements,
+    company_id, score) rows, the same shape as search_similar_jobs. Builds the
+    CV's rows first if they are missing or from another index version.
+    """
+    from .supabase_models import Job
+
+    state = CVMatchState.objects.filter(cv_id=cv_id).first()
+    if state is None or state.index_version != match_index_version():
+        refresh_cv_matches(cv_id)
+
+    matches = list(
+        CVJobMatch.objects.filter(cv_id=cv_id, score__gte=similarity_threshold)
+        .order_by("-score")
+        .values_list("job_id", "score")[:top_n]
+    )
+    if not matches:
+        return []
+    jobs = {
+        str(j["id"]): j
+        for j in Job.objects.filter(id__in=[m[0] for m in matches], is_active=True).values(
+            "id", "title", "description", "requirements", "company_id"
+        )
+    }
+    rows = []
+    for job_id, score in matches:
+        job = jobs.get(str(job_id))
+        if job:
+            rows.append((job["id"], job["title"], job["description"], job["requirements"], job["company_id"], score))
+    return rows
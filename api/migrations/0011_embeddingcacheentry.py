@@ -0,0 +1,30 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_employee_employeegoal_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmbeddingCacheEntry",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("provider", models.CharField(max_length=50)),
+                ("model", models.CharField(max_length=255)),
+                ("dimensions", models.IntegerField(blank=True, null=True)),
+                ("embedding", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "embedding_cache",
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+def create_job_summary_table(apps, schema_editor):
+    # job_embeddings lives outside Django's control (pgvector column), so the
+    # summary table is created by hand to match it.
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_summary_embeddings (
+                job_id uuid PRIMARY KEY REFERENCES jobs (id) ON DELETE CASCADE,
+                embedding vector,
+                chunk_count integer NOT NULL DEFAULT 0,
+                updated_at timestamptz NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        # Stage-2 refinement reads chunk rows by job id
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS job_embeddings_job_id_idx ON job_embeddings (job_id)"
+        )
+    else:
+        schema_editor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_summary_embeddings (
+                job_id char(32) PRIMARY KEY,
+                embedding text,
+                chunk_count integer NOT NULL DEFAULT 0,
+                updated_at datetime NOT NULL
+            )
+            """
+        )
+
+
+def drop_job_summary_table(apps, schema_editor):
+    schema_editor.execute("DROP TABLE IF EXISTS job_summary_embeddings")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_embeddingcacheentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSummaryEmbedding",
+            fields=[
+                ("job_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("embedding", models.JSONField(blank=True, null=True)),
+                ("chunk_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "job_summary_embeddings",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_job_summary_table, drop_job_summary_table),
+    ]
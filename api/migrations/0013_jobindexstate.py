@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_jobsummaryembedding"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobIndexState",
+            fields=[
+                ("job_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("embedding_model", models.CharField(max_length=255)),
+                ("dimensions", models.IntegerField(blank=True, null=True)),
+                ("chunk_count", models.IntegerField(default=0)),
+                ("indexed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "job_index_state",
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_jobindexstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmbeddingOutboxItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("job", "Job"), ("cv", "CV")], max_length=10)),
+                ("owner_id", models.UUIDField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("warnings", models.JSONField(blank=True, default=list)),
+                ("available_at", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "embedding_outbox",
+                "unique_together": {("kind", "owner_id")},
+                "indexes": [models.Index(fields=["status", "available_at"], name="embedding_outbox_ready_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_embeddingoutboxitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CVIndexState",
+            fields=[
+                ("cv_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("embedding_model", models.CharField(max_length=255)),
+                ("dimensions", models.IntegerField(blank=True, null=True)),
+                ("chunk_count", models.IntegerField(default=0)),
+                ("indexed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "cv_index_state",
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_cvindexstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CVJobMatch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("cv_id", models.UUIDField()),
+                ("job_id", models.UUIDField()),
+                ("score", models.FloatField()),
+                ("index_version", models.IntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "cv_job_matches",
+                "unique_together": {("cv_id", "job_id")},
+                "indexes": [
+                    models.Index(fields=["cv_id", "-score"], name="cv_job_matches_cv_score_idx"),
+                    models.Index(fields=["job_id"], name="cv_job_matches_job_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CVMatchState",
+            fields=[
+                ("cv_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("index_version", models.IntegerField()),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "cv_match_state",
+            },
+        ),
+    ]
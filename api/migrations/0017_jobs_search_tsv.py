@@ -0,0 +1,40 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:50
+
+from django.db import migrations
+
+
+def add_jobs_search_tsv(apps, schema_editor):
+    # jobs is not managed by Django; keyword filters in api.rag match against
+    # this generated column so they can run inside the vector query.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        """
+        ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector(
+                'simple',
+                coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(requirements, '')
+            )
+        ) STORED
+        """
+    )
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS jobs_search_tsv_idx ON jobs USING GIN (search_tsv)")
+
+
+def drop_jobs_search_tsv(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS jobs_search_tsv_idx")
+    schema_editor.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_tsv")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_cvjobmatch_cvmatchstate"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_jobs_search_tsv, drop_jobs_search_tsv),
+    ]
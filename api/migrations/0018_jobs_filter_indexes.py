@@ -0,0 +1,36 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:20
+
+from django.db import migrations
+
+# Partial indexes over active jobs for the structured search filters in api.rag
+JOB_FILTER_INDEXES = [
+    ("jobs_active_company_posted_idx", "(company_id, posted_at DESC)"),
+    ("jobs_active_employment_type_idx", "(lower(employment_type))"),
+    ("jobs_active_salary_range_idx", "(lower(salary_range))"),
+    ("jobs_active_posted_at_idx", "(posted_at DESC)"),
+]
+
+
+def create_job_filter_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, columns in JOB_FILTER_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON jobs {columns} WHERE is_active")
+
+
+def drop_job_filter_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in JOB_FILTER_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_jobs_search_tsv"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_job_filter_indexes, drop_job_filter_indexes),
+    ]
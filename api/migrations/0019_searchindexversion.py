@@ -0,0 +1,24 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_jobs_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexVersion",
+            fields=[
+                ("name", models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ("version", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "search_index_version",
+            },
+        ),
+    ]
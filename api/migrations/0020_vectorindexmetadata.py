@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_searchindexversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VectorIndexMetadata",
+            fields=[
+                ("table_name", models.CharField(max_length=63, primary_key=True, serialize=False)),
+                ("embedding_model", models.CharField(blank=True, default="", max_length=255)),
+                ("dimensions", models.IntegerField(blank=True, null=True)),
+                ("chunk_count", models.BigIntegerField(default=0)),
+                ("active_chunk_count", models.BigIntegerField(default=0)),
+                ("active_job_count", models.BigIntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "vector_index_metadata",
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0021_backgroundtask"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMCacheEntry",
+            fields=[
+                ("key", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("endpoint", models.CharField(max_length=100)),
+                ("model", models.CharField(max_length=255)),
+                ("response", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now=True)),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "llm_cache",
+                "indexes": [models.Index(fields=["expires_at"], name="llm_cache_expires_idx")],
+            },
+        ),
+    ]
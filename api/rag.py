@@ -10,7 +10,7 @@ try:
 except Exception:
     OpenAI = None
 
-import requests
+from . import http_clients
 
 EMBEDDING_PROVIDER = config("EMBEDDING_PROVIDER", default="openai")  # openai | fireworks
 
@@ -28,7 +28,7 @@ try:
 except Exception:
     OpenAI = None
 
-import requests
+from . import http_clients
 
 EMBEDDING_PROVIDER = config("EMBEDDING_PROVIDER", default="openai")  # openai | fireworks
 
@@ -38,16 +38,27 @@ CHAT_MODEL = config("OPENAI_CHAT_MODEL", default="gpt-4o-mini")
 OPENAI_API_KEY = config("OPENAI_API_KEY", default=None)
 
 import os
-from typing import List, Tuple
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
 from decouple import config
-from django.db import connection
+from django.db import DatabaseError, connection, transaction
 
 try:
     from openai import OpenAI
 except Exception:
     OpenAI = None
 
-import requests
+from . import http_clients
+
+from .embedding_cache import EMBEDDING_CACHE_ENABLED, cache_key, get_embedding_cache
+from .embedding_dispatcher import EMBEDDING_DISPATCH_ENABLED, get_embedding_dispatcher
+from . import llm_gateway
+from .local_vector_index import get_local_index
+from .vector_adapter import to_pg_vector, to_pg_vectors
+
+logger = logging.getLogger(__name__)
 
 EMBEDDING_PROVIDER = config("EMBEDDING_PROVIDER", default="openai")  # openai | fireworks
 
@@ -63,6 +74,37 @@ FIREWORKS_EMBEDDING_MODEL = config("FIREWORKS_EMBEDDING_MODEL", default="nomic-a
 FIREWORKS_EMBEDDING_DIM = config("FIREWORKS_EMBEDDING_DIM", default=None, cast=int)
 FIREWORKS_BASE_URL = config("FIREWORKS_BASE_URL", default="https://api.fireworks.ai/inference/v1")
 
+# ANN search knobs (0 = leave the server default). See manage.py vector_index.
+VECTOR_EF_SEARCH = config("VECTOR_EF_SEARCH", default=0, cast=int)
+VECTOR_IVFFLAT_PROBES = config("VECTOR_IVFFLAT_PROBES", default=0, cast=int)
+# Iterative index scans for filtered searches (pgvector >= 0.8): off | relaxed_order | strict_order
+VECTOR_ITERATIVE_SCAN = config("VECTOR_ITERATIVE_SCAN", default="relaxed_order")
+VECTOR_MAX_SCAN_TUPLES = config("VECTOR_MAX_SCAN_TUPLES", default=0, cast=int)
+
+# Vector search backend: pgvector | numpy | auto (numpy when the DB is not Postgres)
+VECTOR_SEARCH_BACKEND = config("VECTOR_SEARCH_BACKEND", default="auto")
+# Serve from the on-disk NumPy index if a pgvector query fails
+VECTOR_SEARCH_FALLBACK = config("VECTOR_SEARCH_FALLBACK", default=True, cast=bool)
+
+# pgvector search mode: chunks (ANN over every chunk) | summary (ANN over one
+# pooled vector per job, then exact refinement over the shortlisted jobs' chunks)
+VECTOR_SEARCH_MODE = config("VECTOR_SEARCH_MODE", default="chunks")
+VECTOR_SUMMARY_SHORTLIST = config("VECTOR_SUMMARY_SHORTLIST", default=4, cast=int)  # x top_n
+
+# Compact ANN candidate search over an expression index on the chunk vectors:
+# none | halfvec (16-bit floats) | binary (1 bit per dimension, always rescored).
+# Create the matching index with `manage.py vector_index create --quantization ...`.
+VECTOR_QUANTIZATION = config("VECTOR_QUANTIZATION", default="none")
+# Re-rank the compact candidates with exact full-precision cosine distance
+VECTOR_RESCORE = config("VECTOR_RESCORE", default=True, cast=bool)
+VECTOR_RESCORE_FACTOR = config("VECTOR_RESCORE_FACTOR", default=4, cast=int)  # candidates x top_n
+QUANTIZATIONS = ("none", "halfvec", "binary")
+
+# Max inputs per embeddings request (0 = use the provider default below)
+EMBEDDING_BATCH_SIZE = config("EMBEDDING_BATCH_SIZE", default=0, cast=int)
+OPENAI_EMBEDDING_BATCH_SIZE = 2048
+FIREWORKS_EMBEDDING_BATCH_SIZE = 256
+
 
 def chunk_text(text: str, chunk_chars: int = 1200, overlap: int = 100) -> List[str]:
     text = (text or "").strip()
@@ -85,7 +127,8 @@ def get_openai_client():
         raise RuntimeError("openai library not installed")
     if not OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY is not set")
-    return OpenAI(api_key=OPENAI_API_KEY)
+    # Cached per key: the client's connection pool is reused across calls
+    return http_clients.get_openai_client(OPENAI_API_KEY)
 
 
 def embed_text_openai(text: str) -> List[float]:
@@ -112,7 +155,7 @@ def embed_text_fireworks(text: str) -> List[float]:
     # explicit `dimensions` field, retry once without it (some models do
     # not expect or accept the dimensions parameter).
     try:
-        r = requests.post(url, json=payload, headers=headers, timeout=30)
+        r = http_clients.post(url, json=payload, headers=headers, timeout=30, idempotent=True)
     except Exception as e:
         raise RuntimeError(f"Fireworks request failed: {e}")
 
@@ -120,7 +163,7 @@ def embed_text_fireworks(text: str) -> List[float]:
         # Retry without dimensions
         try:
             payload2 = {"input": text, "model": FIREWORKS_EMBEDDING_MODEL}
-            r2 = requests.post(url, json=payload2, headers=headers, timeout=30)
+            r2 = http_clients.post(url, json=payload2, headers=headers, timeout=30, idempotent=True)
         except Exception as e:
             raise RuntimeError(f"Fireworks request failed on retry: {e}")
         if not r2.ok:
@@ -165,8 +208,8 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
     if not embedding:
         return []
 
-    # Convert embedding list to a pgvector literal string (e.g. [0.1,0.2,...])
-    emb_literal = "[" + ",".join(map(str, embedding)) + "]"
+    # float32 vector parameter, rendered by api/vector_adapter.py
+    query_vec = to_pg_vector(embedding)
 
     with connection.cursor() as cursor:
         cursor.execute(
@@ -179,7 +222,7 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
             ORDER BY (e.embedding <=> %s::vector) NULLS LAST
             LIMIT %s
             """,
-            [emb_literal, emb_literal, top_n],
+            [query_vec, query_vec, top_n],
         )
         rows = cursor.fetchall()
 
@@ -201,7 +244,7 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
                 ORDER BY (e.embedding <=> %s::vector) NULLS LAST
                 LIMIT %s
                 """,
-                [emb_literal, emb_literal, max(top_n, 10)],
+                [query_vec, query_vec, max(top_n, 10)],
             )
             fallback_rows = cursor.fetchall()
         return fallback_rows or []
@@ -212,7 +255,6 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
 def generate_answer(query: str, jobs: List[Tuple]) -> str:
     if not OPENAI_API_KEY or OpenAI is None:
         return "Summary disabled: chat model not configured. Returning results without summary."
-    client = get_openai_client()
     context_lines = []
     for idx, (job_id, title, description, requirements, company_id, _, score) in enumerate(jobs, start=1):
         context_lines.append(f"[{idx}] {title} (score={score:.3f})\nDesc: {description}\nReq: {requirements}\n")
@@ -226,26 +268,401 @@ def generate_answer(query: str, jobs: List[Tuple]) -> str:
         {"role": "system", "content": prompt},
         {"role": "user", "content": f"User query:\n{query}\n\nMatched jobs:\n{context}"},
     ]
-    resp = client.chat.completions.create(model=CHAT_MODEL, messages=messages, temperature=0.2)
-    return resp.choices[0].message.content.strip()
+    return llm_gateway.chat(messages=messages, provider="openai", model=CHAT_MODEL, temperature=0.2).text
     headers = {
         "Authorization": f"Bearer {FIREWORKS_API_KEY}",
         "Content-Type": "application/json",
     }
-    r = requests.post(url, json=payload, headers=headers, timeout=30)
+    r = http_clients.post(url, json=payload, headers=headers, timeout=30, idempotent=True)
     r.raise_for_status()
     data = r.json()
     # Fireworks returns { data: [{ embedding: [...] }] }
     return data["data"][0]["embedding"]
 
 
+def embedding_identity() -> Tuple[str, str, Optional[int]]:
+    """(provider, model, dimensions) that produced vectors with the current config."""
+    if EMBEDDING_PROVIDER.lower() == "fireworks":
+        return "fireworks", FIREWORKS_EMBEDDING_MODEL, FIREWORKS_EMBEDDING_DIM
+    return "openai", EMBEDDING_MODEL, None
+
+
+def embedding_model_name() -> str:
+    provider, model, _ = embedding_identity()
+    return f"{provider}/{model}"
+
+
+def job_index_text(title, description, requirements) -> str:
+    """The text that gets chunked and embedded for a job."""
+    return f"{title}\n{description or ''}\n{requirements or ''}".strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def record_job_index_state(job_id, text: str, chunk_count: int):
+    """Remember what was embedded for a job so reindexing can skip it while unchanged."""
+    from .embedding_models import JobIndexState
+
+    _, _, dims = embedding_identity()
+    JobIndexState.objects.update_or_create(
+        job_id=job_id,
+        defaults={
+            "content_hash": content_hash(text),
+            "embedding_model": embedding_model_name(),
+            "dimensions": dims,
+            "chunk_count": chunk_count,
+        },
+    )
+
+
 def embed_text(text: str) -> List[float]:
+    if EMBEDDING_CACHE_ENABLED:
+        provider, model, dims = embedding_identity()
+        key = cache_key(provider, model, dims, text)
+        cache = get_embedding_cache()
+        hit = cache.get_many([key]).get(key)
+        if hit is not None:
+            return hit
+    if EMBEDDING_DISPATCH_ENABLED:
+        # Coalesced with concurrent callers' texts into one batched provider call
+        emb = get_embedding_dispatcher().embed(text)
+    elif EMBEDDING_PROVIDER.lower() == "fireworks":
+        emb = embed_text_fireworks(text)
+    else:
+        emb = embed_text_openai(text)
+    if EMBEDDING_CACHE_ENABLED:
+        cache.put_many({key: emb}, provider, model, dims)
+    return emb
+
+
+def embed_texts_openai(texts: List[str]) -> List[List[float]]:
+    client = get_openai_client()
+    resp = client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    # The API returns one item per input tagged with its index
+    return [item.embedding for item in sorted(resp.data, key=lambda d: d.index)]
+
+
+def embed_texts_fireworks(texts: List[str]) -> List[List[float]]:
+    if not FIREWORKS_API_KEY:
+        raise RuntimeError("FIREWORKS_API_KEY is not set")
+    url = f"{FIREWORKS_BASE_URL}/embeddings"
+    payload = {
+        "input": texts,
+        "model": FIREWORKS_EMBEDDING_MODEL,
+    }
+    if FIREWORKS_EMBEDDING_DIM:
+        payload["dimensions"] = FIREWORKS_EMBEDDING_DIM
+    headers = {
+        "Authorization": f"Bearer {FIREWORKS_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    try:
+        r = http_clients.post(url, json=payload, headers=headers, timeout=60, idempotent=True)
+        if not r.ok and FIREWORKS_EMBEDDING_DIM and r.status_code >= 500:
+            # Same fallback as embed_text_fireworks: retry once without dimensions
+            payload.pop("dimensions", None)
+            r = http_clients.post(url, json=payload, headers=headers, timeout=60, idempotent=True)
+    except Exception as e:
+        raise RuntimeError(f"Fireworks request failed: {e}")
+
+    if not r.ok:
+        try:
+            body = r.text
+        except Exception:
+            body = "<unreadable response body>"
+        raise RuntimeError(f"Fireworks embedding error: status={r.status_code}, body={body}")
+
+    data = r.json()
+    try:
+        items = sorted(data["data"], key=lambda d: d.get("index", 0))
+        embeddings = [item["embedding"] for item in items]
+    except Exception as e:
+        raise RuntimeError(f"Unexpected Fireworks response shape: {e} - {data}")
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Fireworks returned {len(embeddings)} embeddings for {len(texts)} inputs")
+    return embeddings
+
+
+def embed_texts(texts: List[str]) -> Tuple[List[Optional[List[float]]], Dict[int, str]]:
+    """
+    Embed many texts with as few provider round-trips as possible.
+
+    Inputs are sent in provider-sized batches. If a whole batch fails, its
+    inputs are retried one by one so a single bad chunk does not sink the
+    rest. Texts already in the embedding cache are not re-sent.
+
+    Returns:
+        (embeddings, errors) where embeddings[i] is the vector for texts[i]
+        (None if it failed) and errors maps the failed index to a message.
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return _embed_texts_uncached(texts)
+
+    provider, model, dims = embedding_identity()
+    keys = [cache_key(provider, model, dims, t) for t in texts]
+    cache = get_embedding_cache()
+    cached = cache.get_many(keys)
+
+    # Only send each distinct uncached text to the provider once
+    pending: Dict[str, int] = {}
+    for i, key in enumerate(keys):
+        if key not in cached and key not in pending:
+            pending[key] = i
+    fresh, fresh_errors = _embed_texts_uncached([texts[i] for i in pending.values()])
+    cache.put_many(
+        {key: emb for key, emb in zip(pending, fresh) if emb is not None},
+        provider, model, dims,
+    )
+
+    pending_pos = {key: pos for pos, key in enumerate(pending)}
+    embeddings: List[Optional[List[float]]] = []
+    errors: Dict[int, str] = {}
+    for i, key in enumerate(keys):
+        if key in cached:
+            embeddings.append(cached[key])
+            continue
+        pos = pending_pos[key]
+        embeddings.append(fresh[pos])
+        if fresh[pos] is None:
+            errors[i] = fresh_errors.get(pos, "embedding failed")
+    return embeddings, errors
+
+
+def _embed_texts_uncached(texts: List[str]) -> Tuple[List[Optional[List[float]]], Dict[int, str]]:
     if EMBEDDING_PROVIDER.lower() == "fireworks":
-        return embed_text_fireworks(text)
-    return embed_text_openai(text)
+        embed_batch, embed_one = embed_texts_fireworks, embed_text_fireworks
+        batch_size = EMBEDDING_BATCH_SIZE or FIREWORKS_EMBEDDING_BATCH_SIZE
+    else:
+        embed_batch, embed_one = embed_texts_openai, embed_text_openai
+        batch_size = EMBEDDING_BATCH_SIZE or OPENAI_EMBEDDING_BATCH_SIZE
+
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+    errors: Dict[int, str] = {}
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        try:
+            for offset, emb in enumerate(embed_batch(batch)):
+                embeddings[start + offset] = emb
+            continue
+        except Exception as e:
+            if len(batch) == 1:
+                errors[start] = str(e)
+                continue
+        for offset, text in enumerate(batch):
+            try:
+                embeddings[start + offset] = embed_one(text)
+            except Exception as e:
+                errors[start + offset] = str(e)
+    return embeddings, errors
+
+
+def apply_ann_settings(
+    cursor, ef_search: Optional[int] = None, probes: Optional[int] = None, filtered: bool = False
+):
+    """
+    Set hnsw.ef_search / ivfflat.probes for the current transaction only.
+
+    Must be called inside transaction.atomic() so the settings are scoped to
+    the query that follows (set_config(..., true) is SET LOCAL).
+
+    For filtered queries VECTOR_ITERATIVE_SCAN (pgvector >= 0.8) lets the
+    index keep scanning until enough rows pass the WHERE clause, instead of
+    filtering a fixed ef_search/probes candidate set down to fewer than top_n.
+    """
+    ef_search = ef_search or VECTOR_EF_SEARCH
+    probes = probes or VECTOR_IVFFLAT_PROBES
+    if ef_search:
+        cursor.execute("SELECT set_config('hnsw.ef_search', %s, true)", [str(int(ef_search))])
+    if probes:
+        cursor.execute("SELECT set_config('ivfflat.probes', %s, true)", [str(int(probes))])
+    if filtered and VECTOR_ITERATIVE_SCAN != "off":
+        try:
+            # Savepoint: older pgvector rejects the unknown settings
+            with transaction.atomic():
+                cursor.execute("SELECT set_config('hnsw.iterative_scan', %s, true)", [VECTOR_ITERATIVE_SCAN])
+                # IVFFlat only supports relaxed ordering
+                cursor.execute("SELECT set_config('ivfflat.iterative_scan', 'relaxed_order', true)")
+                if VECTOR_MAX_SCAN_TUPLES:
+                    cursor.execute("SELECT set_config('hnsw.max_scan_tuples', %s, true)", [str(VECTOR_MAX_SCAN_TUPLES)])
+        except DatabaseError:
+            logger.debug("pgvector iterative scan is not available", exc_info=True)
+
+
+def _keyword_list(value) -> List[str]:
+    items = value if isinstance(value, (list, tuple)) else [value]
+    return [str(k).strip() for k in items if k is not None and str(k).strip()]
+
+
+# Structured job filters accepted by the search functions (all optional):
+#   company_id        int or list of ints
+#   employment_type   str or list (case-insensitive exact match)
+#   salary_range      str or list (case-insensitive exact match)
+#   posted_after / posted_before   datetime (or ISO string)
+JOB_FILTER_KEYS = ("company_id", "employment_type", "salary_range", "posted_after", "posted_before")
+
+
+def _as_list(value) -> list:
+    if value is None or value == "":
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def job_filter_sql(criteria: Optional[dict] = None, alias: str = "j") -> Tuple[str, list]:
+    """
+    " AND ..." SQL fragment (plus params) applied to the `alias` jobs row inside
+    the vector query, so ANN candidates are filtered before the LIMIT.
+
+    Keywords: a job must match any must_contain keyword and none of
+    must_not_contain, against the GIN-indexed jobs.search_tsv column. The
+    'simple' config matches whole tokens without stemming ("engineer" does
+    not match "engineering"); _filtered_job_ids mirrors this off Postgres.
+    Structured filters (JOB_FILTER_KEYS) use the partial jobs indexes.
+    """
+    criteria = criteria or {}
+    sql, params = "", []
+    for negate, key in ((False, "must_contain"), (True, "must_not_contain")):
+        keywords = _keyword_list(criteria.get(key) or [])
+        if not keywords:
+            continue
+        query = " || ".join(["phraseto_tsquery('simple', %s)"] * len(keywords))
+        sql += f" AND {'NOT ' if negate else ''}({alias}.search_tsv @@ ({query}))"
+        params.extend(keywords)
+
+    company_ids = _as_list(criteria.get("company_id"))
+    if company_ids:
+        sql += f" AND {alias}.company_id = ANY(%s)"
+        params.append([int(c) for c in company_ids])
+    for key in ("employment_type", "salary_range"):
+        values = [str(v).strip().lower() for v in _as_list(criteria.get(key))]
+        if values:
+            sql += f" AND lower({alias}.{key}) = ANY(%s)"
+            params.append(values)
+    if criteria.get("posted_after"):
+        sql += f" AND {alias}.posted_at >= %s"
+        params.append(criteria["posted_after"])
+    if criteria.get("posted_before"):
+        sql += f" AND {alias}.posted_at < %s"
+        params.append(criteria["posted_before"])
+    return sql, params
+
+
+def _keyword_regex(keyword: str) -> Optional[str]:
+    """
+    Regex matching `keyword` as a run of whole tokens, the way
+    phraseto_tsquery('simple', ...) does: "engineer" matches "Engineer," but
+    not "engineering". Written for both the SQLite (Python re) and Postgres
+    regex engines, which disagree on word boundaries and on \\W in brackets.
+    """
+    tokens = re.findall(r"[^\W_]+", keyword.lower())
+    if not tokens:
+        return None
+    separator = r"(\W|_)"
+    return rf"(^|{separator})" + f"{separator}+".join(re.escape(t) for t in tokens) + rf"($|{separator})"
+
+
+def _filtered_job_ids(criteria: Optional[dict] = None) -> Optional[set]:
+    """
+    Active job ids passing the filters (None = no filters), for the NumPy backend.
+
+    Keywords match whole tokens (_keyword_regex), so the result set agrees with
+    the search_tsv filter of job_filter_sql. Only the text parser's special
+    tokens (URLs, e-mails, numbers with units) can still match differently.
+    """
+    criteria = {k: v for k, v in (criteria or {}).items() if v not in (None, "", [])}
+    if not criteria:
+        return None
+    from django.db.models import Q
+    from .supabase_models import Job
+
+    def matches(keyword):
+        pattern = _keyword_regex(keyword)
+        if pattern is None:
+            return Q(pk__in=[])
+        return Q(title__iregex=pattern) | Q(description__iregex=pattern) | Q(requirements__iregex=pattern)
+
+    qs = Job.objects.filter(is_active=True)
+    include = _keyword_list(criteria.get("must_contain") or [])
+    if include:
+        any_of = Q()
+        for keyword in include:
+            any_of |= matches(keyword)
+        qs = qs.filter(any_of)
+    for keyword in _keyword_list(criteria.get("must_not_contain") or []):
+        qs = qs.exclude(matches(keyword))
+    if criteria.get("company_id"):
+        qs = qs.filter(company_id__in=[int(c) for c in _as_list(criteria["company_id"])])
+    for key in ("employment_type", "salary_range"):
+        values = _as_list(criteria.get(key))
+        if values:
+            any_of = Q()
+            for value in values:
+                any_of |= Q(**{f"{key}__iexact": str(value).strip()})
+            qs = qs.filter(any_of)
+    if criteria.get("posted_after"):
+        qs = qs.filter(posted_at__gte=criteria["posted_after"])
+    if criteria.get("posted_before"):
+        qs = qs.filter(posted_at__lt=criteria["posted_before"])
+    return {str(j) for j in qs.values_list("id", flat=True)}
+
+
+def use_local_vector_index() -> bool:
+    backend = VECTOR_SEARCH_BACKEND.lower()
+    if backend == "numpy":
+        return True
+    return backend == "auto" and connection.vendor != "postgresql"
 
 
-def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_threshold: float = 0.5) -> List[Tuple]:
+def _search_local_index(
+    embeddings: List[List[float]], top_n: int, similarity_threshold: float, criteria: Optional[dict] = None
+) -> List[Tuple]:
+    """NumPy-backed search returning the same row shape as the pgvector queries."""
+    from .supabase_models import Job
+
+    allowed = _filtered_job_ids(criteria)
+    if allowed is not None and not allowed:
+        return []
+    hits = get_local_index().search(
+        embeddings, top_n=top_n, similarity_threshold=similarity_threshold, allowed_job_ids=allowed
+    )
+    if not hits:
+        return []
+    jobs = {
+        str(row[0]): row
+        for row in Job.objects.filter(id__in=[job_id for job_id, _ in hits], is_active=True)
+        .values_list("id", "title", "description", "requirements", "company_id")
+    }
+    return [(*jobs[job_id], score) for job_id, score in hits if job_id in jobs]
+
+
+def _search_with_fallback(
+    pg_search, embeddings: List[List[float]], top_n: int, similarity_threshold: float, criteria: Optional[dict] = None
+) -> List[Tuple]:
+    if use_local_vector_index():
+        return _search_local_index(embeddings, top_n, similarity_threshold, criteria)
+    try:
+        return pg_search()
+    except DatabaseError:
+        if not (VECTOR_SEARCH_FALLBACK and get_local_index().exists_on_disk()):
+            raise
+        logger.warning("pgvector search failed; serving from the local NumPy index", exc_info=True)
+        return _search_local_index(embeddings, top_n, similarity_threshold, criteria)
+
+
+def search_similar_jobs(
+    embedding: List[float],
+    top_n: int = 10,
+    similarity_threshold: float = 0.5,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    mode: Optional[str] = None,
+    quantization: Optional[str] = None,
+    rescore: Optional[bool] = None,
+    must_contain=None,
+    must_not_contain=None,
+    filters: Optional[dict] = None,
+) -> List[Tuple]:
     """
     Search for similar jobs using cosine similarity with pgvector.
     
@@ -253,24 +670,48 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
         embedding: Query embedding vector
         top_n: Maximum number of results to return
         similarity_threshold: Minimum similarity score (0-1) to include a result
+        ef_search / probes: Optional HNSW / IVFFlat recall knobs for this query
+        mode: "chunks" or "summary" (defaults to VECTOR_SEARCH_MODE)
+        quantization / rescore: Compact candidate search (defaults to
+            VECTOR_QUANTIZATION / VECTOR_RESCORE)
+        must_contain / must_not_contain: Keyword(s) a job must match (any) /
+            must not match, applied in the database before the LIMIT
+        filters: Structured job filters (see JOB_FILTER_KEYS), also applied
+            in the database
         
     Returns:
         List of tuples with job data and similarity scores
     """
     if not embedding:
         return []
+    quantization = (quantization or VECTOR_QUANTIZATION).lower()
+    criteria = {**(filters or {}), "must_contain": must_contain, "must_not_contain": must_not_contain}
+    where = job_filter_sql(criteria)
+    if (mode or VECTOR_SEARCH_MODE).lower() == "summary":
+        pg_search = lambda: _search_summaries_pg([embedding], max(top_n, 100), similarity_threshold, ef_search, probes, where)
+    elif quantization != "none":
+        pg_search = lambda: _search_quantized_pg(
+            [embedding], max(top_n, 100), similarity_threshold, quantization, rescore, ef_search, probes, filters=where
+        )
+    else:
+        pg_search = lambda: _search_similar_jobs_pg(embedding, top_n, similarity_threshold, ef_search, probes, where)
+    return _search_with_fallback(pg_search, [embedding], top_n, similarity_threshold, criteria)
+
 
-    # Convert embedding list to a pgvector literal string (e.g. [0.1,0.2,...])
-    emb_literal = "[" + ",".join(map(str, embedding)) + "]"
+def _search_similar_jobs_pg(embedding, top_n, similarity_threshold, ef_search, probes, filters=("", [])) -> List[Tuple]:
+    # float32 vector parameter, rendered by api/vector_adapter.py
+    query_vec = to_pg_vector(embedding)
 
     # We'll select the single best (nearest) embedding row per job using
     # DISTINCT ON (j.id) ordered by distance. Then outer-query sorts by the
     # computed score and we limit to the requested top_n. This removes duplicate
     # job rows when multiple chunk embeddings exist for the same job.
     sql_limit = max(top_n, 100)
-    with connection.cursor() as cursor:
+    filter_sql, filter_params = filters
+    with transaction.atomic(), connection.cursor() as cursor:
+        apply_ann_settings(cursor, ef_search, probes, filtered=bool(filter_sql))
         cursor.execute(
-            """
+            f"""
             SELECT q.id, q.title, q.description, q.requirements, q.company_id, q.score
             FROM (
               SELECT DISTINCT ON (j.id)
@@ -278,13 +719,13 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
                      (1 - (e.embedding <=> %s::vector)) AS score
               FROM job_embeddings e
               JOIN jobs j ON j.id = e.job_id
-              WHERE j.is_active = TRUE
+              WHERE j.is_active = TRUE{filter_sql}
               ORDER BY j.id, e.embedding <=> %s::vector
             ) q
             ORDER BY q.score DESC
             LIMIT %s
             """,
-            [emb_literal, emb_literal, sql_limit],
+            [query_vec, *filter_params, query_vec, sql_limit],
         )
         rows = cursor.fetchall()
 
@@ -294,11 +735,288 @@ def search_similar_jobs(embedding: List[float], top_n: int = 10, similarity_thre
     return filtered
 
 
+def search_similar_jobs_multi(
+    embeddings: List[List[float]],
+    top_n: int = 10,
+    similarity_threshold: float = 0.5,
+    candidates_per_vector: int = 100,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    mode: Optional[str] = None,
+    quantization: Optional[str] = None,
+    rescore: Optional[bool] = None,
+    must_contain=None,
+    must_not_contain=None,
+    filters: Optional[dict] = None,
+) -> List[Tuple]:
+    """
+    Search with several query vectors (e.g. one per CV chunk) in one round-trip.
+
+    Each query vector takes its nearest `candidates_per_vector` chunk rows via
+    a LATERAL subquery, and the database keeps the best score per job, so the
+    caller gets one row per job without merging per-chunk results in Python.
+
+    Returns:
+        List of (id, title, description, requirements, company_id, score)
+        tuples ordered by score, same shape as search_similar_jobs.
+    """
+    vectors = [v for v in embeddings or [] if v]
+    if not vectors:
+        return []
+    quantization = (quantization or VECTOR_QUANTIZATION).lower()
+    criteria = {**(filters or {}), "must_contain": must_contain, "must_not_contain": must_not_contain}
+    where = job_filter_sql(criteria)
+    if (mode or VECTOR_SEARCH_MODE).lower() == "summary":
+        pg_search = lambda: _search_summaries_pg(vectors, top_n, similarity_threshold, ef_search, probes, where)
+    elif quantization != "none":
+        pg_search = lambda: _search_quantized_pg(
+            vectors, top_n, similarity_threshold, quantization, rescore, ef_search, probes,
+            candidates_per_vector=candidates_per_vector, filters=where,
+        )
+    else:
+        pg_search = lambda: _search_similar_jobs_multi_pg(
+            vectors, top_n, similarity_threshold, candidates_per_vector, ef_search, probes, where
+        )
+    return _search_with_fallback(pg_search, vectors, top_n, similarity_threshold, criteria)
+
+
+def _search_similar_jobs_multi_pg(
+    vectors, top_n, similarity_threshold, candidates_per_vector, ef_search, probes, filters=("", [])
+) -> List[Tuple]:
+    query_vecs = to_pg_vectors(vectors)
+    per_vector = max(top_n, candidates_per_vector)
+    filter_sql, filter_params = filters
+    with transaction.atomic(), connection.cursor() as cursor:
+        apply_ann_settings(cursor, ef_search, probes, filtered=bool(filter_sql))
+        cursor.execute(
+            f"""
+            WITH hits AS (
+              SELECT c.job_id, c.score
+              FROM unnest(%s::vector[]) AS q(vec)
+              CROSS JOIN LATERAL (
+                SELECT e.job_id, (1 - (e.embedding <=> q.vec)) AS score
+                FROM job_embeddings e
+                JOIN jobs j ON j.id = e.job_id
+                WHERE j.is_active = TRUE{filter_sql}
+                ORDER BY e.embedding <=> q.vec
+                LIMIT %s
+              ) c
+            ),
+            best AS (
+              SELECT job_id, MAX(score) AS score
+              FROM hits
+              GROUP BY job_id
+            )
+            SELECT j.id, j.title, j.description, j.requirements, j.company_id, b.score
+            FROM best b
+            JOIN jobs j ON j.id = b.job_id
+            WHERE b.score >= %s
+            ORDER BY b.score DESC
+            LIMIT %s
+            """,
+            [query_vecs, *filter_params, per_vector, similarity_threshold, top_n],
+        )
+        return cursor.fetchall()
+
+
+def dimensioned_expression(column: str, dims: int) -> str:
+    """
+    Cast of a vector column declared without a dimension (job_summary_embeddings),
+    which pgvector cannot index directly. manage.py vector_index builds the ANN
+    index on this expression, so searches must order by it too.
+    """
+    return f"(({column})::vector({int(dims)}))"
+
+
+def quantized_expression(column: str, quantization: str, dims: int) -> Tuple[str, str]:
+    """
+    (compact expression, distance operator) for a vector expression. Applied to
+    e.embedding it must match the expression index built by manage.py vector_index.
+    """
+    dims = int(dims)
+    if quantization == "halfvec":
+        return f"(({column})::halfvec({dims}))", "<=>"
+    if quantization == "binary":
+        return f"((binary_quantize({column}))::bit({dims}))", "<~>"
+    raise ValueError(f"Unknown vector quantization {quantization!r}; expected one of {QUANTIZATIONS}")
+
+
+def _search_quantized_pg(
+    vectors, top_n, similarity_threshold, quantization, rescore, ef_search, probes,
+    candidates_per_vector: int = 0, filters=("", []),
+) -> List[Tuple]:
+    """
+    Multi-vector chunk search whose ANN step runs on the compact index.
+
+    The LATERAL subquery walks the halfvec/binary index for each query vector;
+    with rescoring (always on for binary, whose Hamming distance is not a
+    cosine score) the exact full-precision score is computed for those
+    candidate rows only, then the best score per job is kept.
+    """
+    rescore = VECTOR_RESCORE if rescore is None else rescore
+    if quantization == "binary":
+        rescore = True
+    dims = len(vectors[0])
+    expr, op = quantized_expression("e.embedding", quantization, dims)
+    query_expr, _ = quantized_expression("q.vec", quantization, dims)
+    score_expr = "(1 - (e.embedding <=> q.vec))" if rescore else f"(1 - ({expr} <=> {query_expr}))"
+    per_vector = max(top_n * (VECTOR_RESCORE_FACTOR if rescore else 1), candidates_per_vector, top_n)
+
+    query_vecs = to_pg_vectors(vectors)
+    filter_sql, filter_params = filters
+    with transaction.atomic(), connection.cursor() as cursor:
+        apply_ann_settings(cursor, ef_search, probes, filtered=bool(filter_sql))
+        cursor.execute(
+            f"""
+            WITH hits AS (
+              SELECT c.job_id, c.score
+              FROM unnest(%s::vector[]) AS q(vec)
+              CROSS JOIN LATERAL (
+                SELECT e.job_id, {score_expr} AS score
+                FROM job_embeddings e
+                JOIN jobs j ON j.id = e.job_id
+                WHERE j.is_active = TRUE{filter_sql}
+                ORDER BY {expr} {op} {query_expr}
+                LIMIT %s
+              ) c
+            ),
+            best AS (
+              SELECT job_id, MAX(score) AS score
+              FROM hits
+              GROUP BY job_id
+            )
+            SELECT j.id, j.title, j.description, j.requirements, j.company_id, b.score
+            FROM best b
+            JOIN jobs j ON j.id = b.job_id
+            WHERE b.score >= %s
+            ORDER BY b.score DESC
+            LIMIT %s
+            """,
+            [query_vecs, *filter_params, per_vector, similarity_threshold, top_n],
+        )
+        return cursor.fetchall()
+
+
+def _search_summaries_pg(vectors, top_n, similarity_threshold, ef_search, probes, filters=("", [])) -> List[Tuple]:
+    """
+    Two-step search: ANN over job_summary_embeddings picks a shortlist of
+    jobs, then the exact best-chunk score is computed only for those jobs.
+    Cost grows with the number of jobs returned rather than total chunks.
+    """
+    query_vecs = to_pg_vectors(vectors)
+    summary_expr = dimensioned_expression("s.embedding", len(vectors[0]))
+    shortlist = max(top_n * VECTOR_SUMMARY_SHORTLIST, 20)
+    filter_sql, filter_params = filters
+    with transaction.atomic(), connection.cursor() as cursor:
+        apply_ann_settings(cursor, ef_search, probes, filtered=bool(filter_sql))
+        cursor.execute(
+            f"""
+            WITH q AS (
+              SELECT vec FROM unnest(%s::vector[]) AS q(vec)
+            ),
+            shortlist AS (
+              SELECT DISTINCT s.job_id
+              FROM q
+              CROSS JOIN LATERAL (
+                SELECT s.job_id
+                FROM job_summary_embeddings s
+                JOIN jobs j ON j.id = s.job_id
+                WHERE j.is_active = TRUE{filter_sql}
+                ORDER BY {summary_expr} <=> q.vec
+                LIMIT %s
+              ) s
+            ),
+            best AS (
+              SELECT e.job_id, MAX(1 - (e.embedding <=> q.vec)) AS score
+              FROM shortlist sl
+              JOIN job_embeddings e ON e.job_id = sl.job_id
+              CROSS JOIN q
+              GROUP BY e.job_id
+            )
+            SELECT j.id, j.title, j.description, j.requirements, j.company_id, b.score
+            FROM best b
+            JOIN jobs j ON j.id = b.job_id
+            WHERE b.score >= %s
+            ORDER BY b.score DESC
+            LIMIT %s
+            """,
+            [query_vecs, *filter_params, shortlist, similarity_threshold, top_n],
+        )
+        return cursor.fetchall()
+
+
+def refresh_job_summaries(job_ids: Optional[List[str]] = None):
+    """
+    Recompute the pooled (centroid) summary vector for the given jobs, or for
+    every job when job_ids is None. Jobs left without chunks lose their summary.
+    """
+    ids = None if job_ids is None else [str(j) for j in job_ids]
+    if ids is not None and not ids:
+        return
+
+    if connection.vendor == "postgresql":
+        scope = "" if ids is None else "WHERE job_id = ANY(%s::uuid[])"
+        params = [] if ids is None else [ids]
+        with transaction.atomic(), connection.cursor() as c:
+            c.execute(
+                f"""
+                DELETE FROM job_summary_embeddings s
+                WHERE {"s.job_id = ANY(%s::uuid[]) AND" if ids is not None else ""}
+                      NOT EXISTS (SELECT 1 FROM job_embeddings e WHERE e.job_id = s.job_id)
+                """,
+                params,
+            )
+            c.execute(
+                f"""
+                INSERT INTO job_summary_embeddings (job_id, embedding, chunk_count, updated_at)
+                SELECT job_id, AVG(embedding), COUNT(*), NOW()
+                FROM job_embeddings
+                {scope}
+                GROUP BY job_id
+                ON CONFLICT (job_id) DO UPDATE
+                SET embedding = EXCLUDED.embedding,
+                    chunk_count = EXCLUDED.chunk_count,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                params,
+            )
+        return
+
+    # Other databases keep vectors as JSON; pool them in NumPy
+    import numpy as np
+    from django.utils import timezone
+    from .supabase_models import JobEmbedding, JobSummaryEmbedding
+    from .vector_adapter import from_pg_vector
+
+    qs = JobEmbedding.objects.all()
+    if ids is not None:
+        qs = qs.filter(job_id__in=ids)
+    pooled: Dict[str, List] = {}
+    for job_id, emb in qs.values_list("job_id", "embedding"):
+        vec = from_pg_vector(emb)
+        if vec is not None and len(vec):
+            pooled.setdefault(str(job_id), []).append(vec)
+
+    stale = JobSummaryEmbedding.objects.exclude(job_id__in=list(pooled))
+    if ids is not None:
+        stale = stale.filter(job_id__in=ids)
+    stale.delete()
+    now = timezone.now()
+    for job_id, vecs in pooled.items():
+        try:
+            centroid = np.mean(np.vstack(vecs), axis=0)
+        except ValueError:
+            continue  # mixed dimensions
+        JobSummaryEmbedding.objects.update_or_create(
+            job_id=job_id,
+            defaults={"embedding": centroid.tolist(), "chunk_count": len(vecs), "updated_at": now},
+        )
+
+
 def generate_answer(query: str, jobs: List[Tuple]) -> str:
     # If OpenAI chat is not configured, return a fallback summary instead of raising
     if not OPENAI_API_KEY or OpenAI is None:
         return "Summary disabled: chat model not configured. Returning results without summary."
-    client = get_openai_client()
     context_lines = []
     for idx, (job_id, title, description, requirements, company_id, _, score) in enumerate(jobs, start=1):
         context_lines.append(f"[{idx}] {title} (score={score:.3f})\nDesc: {description}\nReq: {requirements}\n")
@@ -312,36 +1030,30 @@ def generate_answer(query: str, jobs: List[Tuple]) -> str:
         {"role": "system", "content": prompt},
         {"role": "user", "content": f"User query:\n{query}\n\nMatched jobs:\n{context}"},
     ]
-    resp = client.chat.completions.create(model=CHAT_MODEL, messages=messages, temperature=0.2)
-    return resp.choices[0].message.content.strip()
+    return llm_gateway.chat(messages=messages, provider="openai", model=CHAT_MODEL, temperature=0.2).text
 
 
-def generate_text_fireworks(prompt, system_prompt="You are a helpful AI assistant."):
+def generate_text_fireworks(prompt, system_prompt="You are a helpful AI assistant.", cache_as=None, validate=None):
+    """
+    Chat completion text, or an "Error ..." string. With `cache_as` (an
+    endpoint listed in LLM_CACHE_ENDPOINTS) completions accepted by
+    `validate` are served from the LLM cache.
+    """
     if not FIREWORKS_API_KEY:
         return "Error: Fireworks API key not configured."
-    
-    # Use a default model if not configured specifically for chat
-    model = "accounts/fireworks/models/llama-v3p1-70b-instruct"
-    
-    url = f"{FIREWORKS_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 1024,
-    }
-    
+
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+        return llm_gateway.chat(
+            system=system_prompt,
+            user=prompt,
+            provider="fireworks",
+            # Use a default model if not configured specifically for chat
+            model="accounts/fireworks/models/llama-v3p1-70b-instruct",
+            temperature=0.7,
+            max_tokens=1024,
+            timeout=30,
+            cache_as=cache_as,
+            validate=validate,
+        ).text
     except Exception as e:
-        return f"Error generating text: {str(e)}"
\ No newline at end of file
+        return f"Error generating text: {str(e)}"
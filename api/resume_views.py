@@ -2,11 +2,11 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.conf import settings
-import requests
-import json
-import re
 from decouple import config
 
+from . import llm_gateway
+from .llm_gateway import LLMError
+from .task_queue import async_task
 from .resume_models import Resume, WorkExperience, Education, ResumeSkill, ResumeProject
 from .resume_serializers import (
     ResumeSerializer, WorkExperienceSerializer, EducationSerializer,
@@ -15,7 +15,6 @@ from .resume_serializers import (
 
 # Fireworks / LLM integration configuration
 FIREWORKS_API_KEY = config("FIREWORKS_API_KEY", default=None)
-FIREWORKS_BASE_URL = config("FIREWORKS_BASE_URL", default="https://api.fireworks.ai/inference/v1")
 CHAT_MODEL = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
 
 
@@ -23,26 +22,16 @@ def generate_text_fireworks(prompt, system_prompt="You are a helpful AI assistan
     if not FIREWORKS_API_KEY:
         return "Error: Fireworks API key not configured."
 
-    url = f"{FIREWORKS_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "model": CHAT_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 1024,
-    }
-
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+        return llm_gateway.chat(
+            system=system_prompt,
+            user=prompt,
+            provider="fireworks",
+            model=CHAT_MODEL,
+            temperature=0.7,
+            max_tokens=1024,
+            timeout=30,
+        ).text
     except Exception as e:
         return f"Error generating text: {str(e)}"
 
@@ -97,6 +86,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
         return Response({"skills": skills})
 
     @action(detail=False, methods=["post"], url_path="auto-fill-from-cv")
+    @async_task("resume_auto_fill")
     def auto_fill_from_cv(self, request):
         """Extract data from user's uploaded CV and format it for resume fields"""
         # Lazy import models that are only used here to avoid circular imports
@@ -160,35 +150,20 @@ class ResumeViewSet(viewsets.ModelViewSet):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": CHAT_MODEL,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"].strip()
+            completion = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                provider="fireworks",
+                model=CHAT_MODEL,
+                temperature=0.3,
+                json_mode=True,
+                timeout=60,
+            )
 
             # Parse JSON response
-            try:
-                extracted = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from response
-                json_match = re.search(r'\{[\s\S]*\}', content)
-                if json_match:
-                    extracted = json.loads(json_match.group(0))
-                else:
-                    return Response({"detail": "Failed to parse extraction response"}, status=400)
+            extracted = completion.json()
+            if not isinstance(extracted, dict):
+                return Response({"detail": "Failed to parse extraction response"}, status=400)
 
             # Format response for resume form
             result = {
@@ -203,7 +178,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
 
             return Response(result, status=200)
 
-        except requests.exceptions.RequestException as e:
+        except LLMError as e:
             return Response({
                 "detail": f"Failed to extract CV data: {str(e)}",
                 "hint": "Check API configuration or try again later"
@@ -0,0 +1,168 @@
+"""
+Two-level cache in front of RAGSearchView.
+
+  1. query text -> embedding: the query is normalized (NFC, collapsed
+     whitespace) and embedded through the content-addressed embedding cache
+     (api/embedding_cache.py), so a repeated query never reaches the provider.
+  2. (query embedding key, filters, top_n, threshold, job index version)
+     -> the ranked result rows, kept in a bounded in-process LRU with a TTL.
+     A hit skips the embedding, the vector query and the job lookup.
+
+Every job write bumps the shared `search_index_version` row
+(bump_job_index_version), which changes the key of every level-2 entry.
+Each process re-reads the version at most every
+SEARCH_INDEX_VERSION_TTL_SECONDS (a write in the same process is seen at
+once), so a cache hit costs no query and workers in other processes stop
+serving results from before a write within that many seconds.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from decouple import config
+from django.db.models import F
+
+from .embedding_cache import cache_key, normalize_text
+from .embedding_models import SearchIndexVersion
+from .rag import embed_text, embedding_identity
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_ENABLED = config("SEARCH_CACHE_ENABLED", default=True, cast=bool)
+SEARCH_CACHE_MAX_ENTRIES = config("SEARCH_CACHE_MAX_ENTRIES", default=2000, cast=int)
+SEARCH_CACHE_TTL_SECONDS = config("SEARCH_CACHE_TTL_SECONDS", default=600, cast=int)
+SEARCH_INDEX_VERSION_TTL_SECONDS = config("SEARCH_INDEX_VERSION_TTL_SECONDS", default=5.0, cast=float)
+
+JOB_INDEX = "jobs"
+
+_version_lock = threading.Lock()
+# (time.monotonic() of the read, version), or None once this process bumped it
+_version: Optional[Tuple[float, int]] = None
+
+
+# ----- job index version -------------------------------------------------
+
+def job_index_version() -> Optional[int]:
+    """
+    Current job index version, or None when it cannot be read (cache is
+    bypassed). Re-read at most every SEARCH_INDEX_VERSION_TTL_SECONDS.
+    """
+    global _version
+    with _version_lock:
+        known = _version
+    if known is not None and time.monotonic() - known[0] < SEARCH_INDEX_VERSION_TTL_SECONDS:
+        return known[1]
+    try:
+        version = SearchIndexVersion.objects.filter(name=JOB_INDEX).values_list("version", flat=True).first()
+    except Exception as e:
+        logger.warning(f"Could not read the job index version: {e}")
+        return None
+    with _version_lock:
+        _version = (time.monotonic(), version or 0)
+    return version or 0
+
+
+def bump_job_index_version():
+    """Invalidate every cached search result; call after any job write."""
+    global _version
+    try:
+        updated = SearchIndexVersion.objects.filter(name=JOB_INDEX).update(version=F("version") + 1)
+        if not updated:
+            _, created = SearchIndexVersion.objects.get_or_create(name=JOB_INDEX, defaults={"version": 1})
+            if not created:
+                SearchIndexVersion.objects.filter(name=JOB_INDEX).update(version=F("version") + 1)
+    except Exception as e:
+        logger.warning(f"Could not bump the job index version: {e}")
+    # Entries under the old version can never be hit again; free them in this process now
+    with _version_lock:
+        _version = None
+    _results.clear()
+
+
+# ----- level 1: query embedding ------------------------------------------
+
+def query_embedding_key(query: str) -> str:
+    provider, model, dims = embedding_identity()
+    return cache_key(provider, model, dims, query)
+
+
+def embed_query(query: str) -> List[float]:
+    return embed_text(normalize_text(query))
+
+
+# ----- level 2: result rows ----------------------------------------------
+
+def search_result_key(query: str, version: int, **params) -> str:
+    """Key of a search: the query's embedding key, every search parameter and the index version."""
+    payload = json.dumps(
+        {"q": query_embedding_key(query), "v": version, "p": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, ttl: int = SEARCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, List[Tuple]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[List[Tuple]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: str, rows: List[Tuple]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": SEARCH_CACHE_ENABLED,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            }
+
+
+_results = SearchResultCache()
+
+
+def get_search_result_cache() -> SearchResultCache:
+    return _results
+
+
+def result_rows(rows) -> List[Tuple]:
+    """
+    search_similar_jobs rows as cached: (id, title, description, requirements,
+    company_id, score), dropping any embedding column and rows without a score.
+    """
+    return [tuple(row[:5]) + (float(row[-1]),) for row in rows or [] if row and len(row) >= 6 and row[-1] is not None]
@@ -5,6 +5,23 @@ from api.rag import generate_text_fireworks
 logger = logging.getLogger(__name__)
 
 class CodingProfileAnalysisService:
+    @staticmethod
+    def _strip_code_fence(response_text):
+        # Clean up potential markdown code blocks
+        if "```json" in response_text:
+            response_text = response_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in response_text:
+            response_text = response_text.split("```")[1].split("```")[0].strip()
+        return response_text
+
+    @staticmethod
+    def _parses(response_text):
+        try:
+            json.loads(CodingProfileAnalysisService._strip_code_fence(response_text))
+        except ValueError:
+            return False
+        return True
+
     @staticmethod
     def analyze_profile(profile):
         """
@@ -42,15 +59,14 @@ class CodingProfileAnalysisService:
         try:
             # Using the existing generate_text_fireworks function from rag.py
             # We might need to adjust if it returns markdown code blocks
-            response_text = generate_text_fireworks(prompt, system_prompt="You are a helpful JSON-speaking assistant.")
-            
-            # Clean up potential markdown code blocks
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-                
-            analysis = json.loads(response_text)
+            # Unchanged stats give the same prompt, so parseable answers are cached
+            response_text = generate_text_fireworks(
+                prompt,
+                system_prompt="You are a helpful JSON-speaking assistant.",
+                cache_as="coding_profile_analysis",
+                validate=CodingProfileAnalysisService._parses,
+            )
+            analysis = json.loads(CodingProfileAnalysisService._strip_code_fence(response_text))
             return analysis
 
         except Exception as e:
@@ -1,6 +1,8 @@
 import requests
 import logging
 
+from .. import http_clients
+
 logger = logging.getLogger(__name__)
 
 class HackerRankService:
@@ -21,7 +23,7 @@ class HackerRankService:
         """
         try:
             # Fetch basic profile info
-            profile_response = requests.get(
+            profile_response = http_clients.get(
                 HackerRankService.PROFILE_URL.format(username),
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -1,6 +1,8 @@
 import requests
 import logging
 
+from .. import http_clients
+
 logger = logging.getLogger(__name__)
 
 class LeetCodeService:
@@ -54,7 +56,7 @@ class LeetCodeService:
             """
             
             # Try simple query first
-            simple_response = requests.post(
+            simple_response = http_clients.post(
                 LeetCodeService.BASE_URL,
                 json={'query': simple_check_query, 'variables': variables},
                 headers={
@@ -63,7 +65,8 @@ class LeetCodeService:
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                     'Origin': 'https://leetcode.com'
                 },
-                timeout=15
+                timeout=15,
+                idempotent=True,
             )
             
             logger.debug(f"LeetCode simple check response status: {simple_response.status_code} for user {username}")
@@ -100,7 +103,7 @@ class LeetCodeService:
                 }
             
             # User exists, now get full stats
-            response = requests.post(
+            response = http_clients.post(
                 LeetCodeService.BASE_URL,
                 json={'query': query, 'variables': variables},
                 headers={
@@ -109,7 +112,8 @@ class LeetCodeService:
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                     'Origin': 'https://leetcode.com'
                 },
-                timeout=15
+                timeout=15,
+                idempotent=True,
             )
             
             logger.debug(f"LeetCode API full query response status: {response.status_code}")
@@ -0,0 +1,291 @@
+"""
+Second retrieval stage: rerank ANN candidates by cosine, skill overlap and recency.
+
+CVMatchView (with "rerank": true) fetches RERANK_CANDIDATES jobs from the
+vector search and passes them through `rerank_jobs()`, which scores all of
+them at once with NumPy:
+
+    score = w_cos * cosine + w_skill * overlap + w_recency * recency
+
+  - overlap: share of a job's skills (job_skills) that appear in the CV text.
+    Each job's skills are a packed bitset over the skills vocabulary, so the
+    overlap of every candidate is one AND plus a popcount lookup. Jobs with no
+    skills drop the skill term and are scored on cosine and recency alone.
+  - recency: exp(-ln 2 * age / RERANK_RECENCY_HALF_LIFE_DAYS) of posted_at.
+
+The bitsets, posted_at timestamps and the compiled skill-name pattern are
+built once per process: in the background when core/wsgi.py or core/asgi.py
+loads (`warm_up()`; SKILL_INDEX_WARM_ON_START=False skips it), and again on
+a background thread after SKILL_INDEX_TTL_SECONDS or when JobViewSet changes
+a job's skills. Requests keep using the previous copy meanwhile, so only a
+request arriving before the first build finishes waits for it. CV skill
+bitsets are cached by text hash.
+`python manage.py rerank_benchmark` measures the added latency.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from decouple import config
+from django.db import connection
+
+from .rag import content_hash
+
+logger = logging.getLogger(__name__)
+
+RERANK_CANDIDATES = config("RERANK_CANDIDATES", default=200, cast=int)
+RERANK_WEIGHT_COSINE = config("RERANK_WEIGHT_COSINE", default=0.7, cast=float)
+RERANK_WEIGHT_SKILLS = config("RERANK_WEIGHT_SKILLS", default=0.25, cast=float)
+RERANK_WEIGHT_RECENCY = config("RERANK_WEIGHT_RECENCY", default=0.05, cast=float)
+RERANK_RECENCY_HALF_LIFE_DAYS = config("RERANK_RECENCY_HALF_LIFE_DAYS", default=30.0, cast=float)
+SKILL_INDEX_TTL_SECONDS = config("SKILL_INDEX_TTL_SECONDS", default=300, cast=int)
+SKILL_INDEX_WARM_ON_START = config("SKILL_INDEX_WARM_ON_START", default=True, cast=bool)
+SKILL_TEXT_CACHE_ENTRIES = 256
+
+# Number of set bits in every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+    return _POPCOUNT[bits].sum(axis=1, dtype=np.int32)
+
+
+class SkillIndex:
+    def __init__(self, ttl: int = SKILL_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at: Optional[float] = None
+        self._dirty = False
+        self._refreshing = False
+        self.skill_names: List[str] = []
+        self._pattern: Optional[re.Pattern] = None
+        self._name_bit: Dict[str, int] = {}
+        self._job_row: Dict[str, int] = {}
+        self._job_bits = np.zeros((0, 0), dtype=np.uint8)
+        self._job_skill_counts = np.zeros(0, dtype=np.int32)
+        self._posted_ts = np.zeros(0, dtype=np.float64)
+        self._text_bits: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @property
+    def _width(self) -> int:
+        return max(1, (len(self.skill_names) + 7) // 8)
+
+    def _load(self) -> dict:
+        """Read skills, jobs and job_skills into a fresh index state (no lock held)."""
+        from .supabase_models import Job, Skill
+
+        skills = list(Skill.objects.values_list("id", "name"))
+        skill_bit = {str(sid): i for i, (sid, _) in enumerate(skills)}
+        names = [(name or "").strip() for _, name in skills]
+
+        jobs = list(Job.objects.filter(is_active=True).values_list("id", "posted_at"))
+        job_row = {str(jid): i for i, (jid, _) in enumerate(jobs)}
+        posted_ts = np.array(
+            [posted.timestamp() if posted else np.nan for _, posted in jobs],
+            dtype=np.float64,
+        )
+
+        width = max(1, (len(names) + 7) // 8)
+        unpacked = np.zeros((len(jobs), width * 8), dtype=np.uint8)
+        try:
+            with connection.cursor() as c:
+                c.execute("SELECT job_id, skill_id FROM job_skills")
+                for job_id, skill_id in c.fetchall():
+                    row = job_row.get(str(job_id))
+                    bit = skill_bit.get(str(skill_id))
+                    if row is not None and bit is not None:
+                        unpacked[row, bit] = 1
+        except Exception as e:
+            logger.warning(f"Could not load job skills for reranking: {e}")
+
+        # Longest names first so "Node.js" wins over "Node"; skills are matched as whole tokens
+        by_length = sorted({n.lower() for n in names if n}, key=len, reverse=True)
+        pattern = (
+            re.compile(r"(?<![\w+#.])(" + "|".join(re.escape(n) for n in by_length) + r")(?![\w+#])", re.IGNORECASE)
+            if by_length
+            else None
+        )
+        name_bit: Dict[str, int] = {}
+        for bit, name in enumerate(names):
+            if name:
+                name_bit.setdefault(name.lower(), bit)
+
+        job_bits = np.packbits(unpacked, axis=1)
+        logger.info(f"Skill index built: {len(jobs)} jobs, {len(names)} skills")
+        return {
+            "skill_names": names,
+            "_pattern": pattern,
+            "_name_bit": name_bit,
+            "_job_row": job_row,
+            "_job_bits": job_bits,
+            "_job_skill_counts": _popcount_rows(job_bits),
+            "_posted_ts": posted_ts,
+        }
+
+    def _swap(self, state: dict, started: float):
+        # Caller holds the lock
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._text_bits.clear()
+        self._built_at = started
+
+    def refresh(self):
+        """Rebuild now; requests keep using the current copy until it is swapped in."""
+        started = time.monotonic()
+        with self._lock:
+            # A change marked after this point needs another rebuild
+            self._dirty = False
+        try:
+            state = self._load()
+        except Exception:
+            with self._lock:
+                self._dirty = True
+            raise
+        with self._lock:
+            self._swap(state, started)
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Skill index refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+            # This thread opened its own DB connection
+            connection.close()
+
+    def _ensure(self):
+        # Caller holds the lock
+        if self._built_at is None:
+            # Nothing to serve yet (warm-up still running or disabled): build inline
+            self._swap(self._load(), time.monotonic())
+            self._dirty = False
+        elif (self._dirty or time.monotonic() - self._built_at > self.ttl) and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh_in_background, name="skill-index-refresh", daemon=True).start()
+
+    def mark_dirty(self):
+        """Rebuild in the background on next use (a job's skills changed)."""
+        with self._lock:
+            self._dirty = True
+
+    def text_bits(self, text: str) -> np.ndarray:
+        """Packed bitset of the vocabulary skills mentioned in `text`."""
+        with self._lock:
+            self._ensure()
+            return self._text_bits_locked(text)
+
+    def _text_bits_locked(self, text: str) -> np.ndarray:
+        key = content_hash(text)
+        bits = self._text_bits.get(key)
+        if bits is not None:
+            self._text_bits.move_to_end(key)
+            return bits
+        unpacked = np.zeros(self._width * 8, dtype=np.uint8)
+        if self._pattern is not None and text:
+            for match in self._pattern.finditer(text):
+                bit = self._name_bit.get(match.group(1).lower())
+                if bit is not None:
+                    unpacked[bit] = 1
+        bits = np.packbits(unpacked)
+        self._text_bits[key] = bits
+        while len(self._text_bits) > SKILL_TEXT_CACHE_ENTRIES:
+            self._text_bits.popitem(last=False)
+        return bits
+
+    def text_skills(self, text: str) -> List[str]:
+        bits = np.unpackbits(self.text_bits(text))[: len(self.skill_names)]
+        return [self.skill_names[i] for i in np.flatnonzero(bits)]
+
+    def score(self, job_ids: List[str], cosine: np.ndarray, text: str, now: Optional[float] = None):
+        """Combined scores and their components for the candidate jobs, vectorized."""
+        with self._lock:
+            self._ensure()
+            cv_bits = self._text_bits_locked(text)
+            rows = np.array([self._job_row.get(j, -1) for j in job_ids], dtype=np.int64)
+            known = rows >= 0
+            safe_rows = np.where(known, rows, 0)
+            if len(self._job_bits):
+                job_bits = self._job_bits[safe_rows]
+                job_counts = np.where(known, self._job_skill_counts[safe_rows], 0)
+                posted = np.where(known, self._posted_ts[safe_rows], np.nan)
+            else:
+                job_bits = np.zeros((len(job_ids), self._width), dtype=np.uint8)
+                job_counts = np.zeros(len(job_ids), dtype=np.int32)
+                posted = np.full(len(job_ids), np.nan)
+
+        overlap_counts = _popcount_rows(job_bits & cv_bits)
+        has_skills = job_counts > 0
+        overlap = np.where(has_skills, overlap_counts / np.maximum(job_counts, 1), 0.0)
+
+        age_days = np.maximum(((now or time.time()) - posted) / 86400.0, 0.0)
+        recency = np.where(np.isnan(age_days), 0.0, np.exp(-math.log(2) * age_days / RERANK_RECENCY_HALF_LIFE_DAYS))
+
+        # Jobs without skills are scored on cosine and recency, renormalized to the same scale
+        skill_weight = np.where(has_skills, RERANK_WEIGHT_SKILLS, 0.0)
+        total = RERANK_WEIGHT_COSINE + skill_weight + RERANK_WEIGHT_RECENCY
+        combined = (
+            RERANK_WEIGHT_COSINE * cosine + skill_weight * overlap + RERANK_WEIGHT_RECENCY * recency
+        ) / np.maximum(total, 1e-12)
+        return combined, overlap, recency
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jobs": len(self._job_row),
+                "skills": len(self.skill_names),
+                "bitset_bytes": int(self._job_bits.nbytes),
+                "age_seconds": None if self._built_at is None else round(time.monotonic() - self._built_at, 1),
+                "refreshing": self._refreshing,
+            }
+
+
+_index = SkillIndex()
+
+
+def get_skill_index() -> SkillIndex:
+    return _index
+
+
+def warm_up():
+    """Build the skill index on a background thread, so no request pays for the first build."""
+    if not SKILL_INDEX_WARM_ON_START:
+        return
+    with _index._lock:
+        if _index._built_at is not None or _index._refreshing:
+            return
+        _index._refreshing = True
+    threading.Thread(target=_index._refresh_in_background, name="skill-index-warm-up", daemon=True).start()
+
+
+def rerank_jobs(rows: List[Tuple], text: str, top_n: Optional[int] = None) -> Tuple[List[Tuple], Dict[str, dict]]:
+    """
+    Rerank search rows (id, title, description, requirements, company_id,
+    score) for the skills in `text`. Returns rows in the new order, with the
+    combined score as the last column, and per-job score components.
+    """
+    rows = [r for r in rows or [] if r and r[-1] is not None]
+    if not rows:
+        return [], {}
+    job_ids = [str(r[0]) for r in rows]
+    cosine = np.array([float(r[-1]) for r in rows], dtype=np.float64)
+    combined, overlap, recency = get_skill_index().score(job_ids, cosine, text)
+
+    order = np.argsort(-combined, kind="stable")
+    if top_n is not None:
+        order = order[:top_n]
+    reranked, details = [], {}
+    for i in order:
+        reranked.append(tuple(rows[i][:-1]) + (float(combined[i]),))
+        details[job_ids[i]] = {
+            "cosine": float(cosine[i]),
+            "skill_overlap": round(float(overlap[i]), 4),
+            "recency": round(float(recency[i]), 4),
+        }
+    return reranked, details
@@ -99,6 +99,19 @@ class JobEmbedding(models.Model):
         db_table = "job_embeddings"
 
 
+class JobSummaryEmbedding(models.Model):
+    # One pooled (centroid) vector per job, maintained from job_embeddings.
+    # pgvector on Postgres, JSON list on sqlite - created by migration 0012.
+    job_id = models.UUIDField(primary_key=True)
+    embedding = models.JSONField(blank=True, null=True)
+    chunk_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "job_summary_embeddings"
+
+
 class Application(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     cv = models.ForeignKey(CV, models.DO_NOTHING, db_column="cv_id")
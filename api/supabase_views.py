@@ -4,10 +4,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import datetime
 import uuid
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from typing import Optional
 
 from .supabase_models import (
@@ -56,19 +58,44 @@ from .supabase_serializers import (
     AudioInterviewEvaluationSerializer,
 )
 from .rag import (
-    embed_text,
+    embed_texts,
     search_similar_jobs,
+    search_similar_jobs_multi,
     generate_answer,
     chunk_text,
-    FIREWORKS_BASE_URL,
     FIREWORKS_API_KEY,
 )
+from .cv_vectors import get_cv_vectors
+from .embedding_cache import get_embedding_cache
+from .embedding_dispatcher import get_embedding_dispatcher
+from .local_vector_index import get_local_index
+from .match_table import MATCH_READ_MODE, MATCH_TABLE_TOP_K, forget_jobs, get_cv_matches
+from .embedding_models import EmbeddingOutboxItem
+from .embedding_outbox import index_now_or_enqueue, indexing_status
+from .index_metadata import get_index_metadata, refresh_index_metadata_async
+from .task_models import BackgroundTask
+from .task_queue import async_task, task_status
+from .llm_cache import get_llm_cache
+from . import llm_gateway
+from .llm_gateway import LLMError
+from .skill_rerank import RERANK_CANDIDATES, get_skill_index, rerank_jobs
+from .search_cache import (
+    SEARCH_CACHE_ENABLED,
+    bump_job_index_version,
+    embed_query,
+    get_search_result_cache,
+    job_index_version,
+    result_rows,
+    search_result_key,
+)
 from decouple import config
 import re
 import base64
 import random
 import json
-import requests
+import queue
+import threading
+from . import http_clients
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 <<<<<<< HEAD
@@ -84,6 +111,18 @@ except Exception:
 EMB_DIM = config("FIREWORKS_EMBEDDING_DIM", default=None, cast=int)
 
 
+def _llm_error_response(e: LLMError, label: str = "Fireworks error"):
+    """
+    What the LLM endpoints return when a chat completion fails: 502 when the
+    provider may succeed on a later try (the background queue retries 5xx),
+    400 for errors a retry cannot fix.
+    """
+    status = 502 if e.transient else 400
+    if e.status_code is not None:
+        return Response({"detail": f"{label}: {e.status_code}", "body": e.body}, status=status)
+    return Response({"detail": f"Model call failed: {e}"}, status=status)
+
+
 def search_maharatech_courses(skill_name: str, max_results: int = 3) -> list:
     """
     Search for courses on MaharaTech (maharatech.gov.eg) related to a skill.
@@ -113,7 +152,7 @@ def search_maharatech_courses(skill_name: str, max_results: int = 3) -> list:
                 }
                 
                 # Try with areaids parameter (Moodle-specific)
-                response = requests.get(
+                response = http_clients.get(
                     search_url,
                     params={**search_params, "areaids": "core_course-course"},
                     headers=headers,
@@ -123,7 +162,7 @@ def search_maharatech_courses(skill_name: str, max_results: int = 3) -> list:
                 
                 if not response.ok:
                     # Try without areaids
-                    response = requests.get(
+                    response = http_clients.get(
                         search_url,
                         params=search_params,
                         headers=headers,
@@ -287,41 +326,33 @@ class JobViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
         if response.status_code == status.HTTP_201_CREATED:
-            title = response.data.get("title")
-            description = response.data.get("description")
-            requirements = response.data.get("requirements")
-            text = (f"{title}\n{description or ''}\n{requirements or ''}").strip()
-            
-            chunks = chunk_text(text)
-            
-            embedding_errors = []
-            for i, chunk in enumerate(chunks or []):
-                try:
-                    emb = embed_text(chunk)
-
-                    if EMB_DIM and len(emb) != EMB_DIM:
-                        embedding_errors.append(f"chunk_{i}: unexpected dim {len(emb)}")
-                        continue
-
-                    with connection.cursor() as c:
-                        job_id = response.data.get("id")
-                        emb_literal = "[" + ",".join(map(str, emb)) + "]"
-                        c.execute(
-                            "INSERT INTO job_embeddings (id, job_id, created_at, embedding) VALUES (%s, %s, NOW(), %s::vector)",
-                            [str(uuid.uuid4()), str(job_id), emb_literal],
-                        )
-                except Exception as e:
-                    # collect errors to return in the response for debugging
-                    embedding_errors.append(f"chunk_{i}: {e}")
-
-            # If there were embedding errors, attach them to the response for now
-            if embedding_errors:
+            # Embedding happens in the outbox worker unless EMBEDDING_ASYNC=False
+            indexing = index_now_or_enqueue(EmbeddingOutboxItem.KIND_JOB, response.data.get("id"))
+            bump_job_index_version()
+            data = dict(response.data)
+            data["indexing_status"] = indexing["status"]
+            if indexing.get("warnings"):
                 # don't fail the creation; return a warning in the response body
-                data = dict(response.data)
-                data["embedding_warnings"] = embedding_errors
-                return Response(data, status=response.status_code)
+                data["embedding_warnings"] = indexing["warnings"]
+            return Response(data, status=response.status_code)
         return response
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # Re-embeds edited text and rescores the job in cv_job_matches (deactivation drops it)
+        index_now_or_enqueue(EmbeddingOutboxItem.KIND_JOB, serializer.instance.id)
+        # Picks up is_active flips in the NumPy search index on the next query
+        get_local_index().mark_dirty()
+        bump_job_index_version()
+
+    def perform_destroy(self, instance):
+        job_id = instance.id
+        super().perform_destroy(instance)
+        forget_jobs([job_id])
+        get_local_index().mark_dirty()
+        bump_job_index_version()
+        refresh_index_metadata_async()
+
     @action(detail=True, methods=["post"], url_path="skills")
     def add_skill(self, request, pk=None):
         job_id = pk
@@ -336,6 +367,7 @@ class JobViewSet(viewsets.ModelViewSet):
                 )
             except Exception as e:
                 return Response({"detail": str(e)}, status=400)
+        get_skill_index().mark_dirty()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["delete"], url_path="skills/(?P<skill_id>[0-9a-f\-]{36})")
@@ -346,6 +378,7 @@ class JobViewSet(viewsets.ModelViewSet):
                 "DELETE FROM job_skills WHERE job_id = %s AND skill_id = %s",
                 [job_id, skill_id],
             )
+        get_skill_index().mark_dirty()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -784,6 +817,7 @@ class CoverLetterViewSet(viewsets.ModelViewSet):
         return CoverLetter.objects.filter(user_id=sb_user.id)
     
     @action(detail=False, methods=["post"], url_path="generate")
+    @async_task("cover_letter")
     def generate(self, request):
         """Generate a cover letter using AI based on CV and job description"""
         if not request.user.is_authenticated:
@@ -884,25 +918,14 @@ class CoverLetterViewSet(viewsets.ModelViewSet):
         )
         
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.7,
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            cover_letter_text = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            cover_letter_text = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.7,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
         
@@ -1013,6 +1036,50 @@ class CoverLetterViewSet(viewsets.ModelViewSet):
             return Response({"detail": str(e)}, status=500)
 
 
+def _parse_job_filters(data):
+    """
+    Structured search filters from a request body, either top-level or under
+    "filters": company_id, employment_type, salary_range (value or list),
+    posted_after / posted_before (ISO date or datetime), posted_within_days.
+    Returns (filters, error message).
+    """
+    source = data.get("filters") if isinstance(data.get("filters"), dict) else data
+    filters = {}
+    try:
+        company_id = source.get("company_id")
+        if company_id not in (None, "", []):
+            ids = company_id if isinstance(company_id, list) else [company_id]
+            filters["company_id"] = [int(c) for c in ids]
+    except (TypeError, ValueError):
+        return None, "company_id must be an integer or a list of integers"
+    for key in ("employment_type", "salary_range"):
+        value = source.get(key)
+        if value not in (None, "", []):
+            filters[key] = value if isinstance(value, list) else [value]
+
+    for key in ("posted_after", "posted_before"):
+        value = source.get(key)
+        if not value:
+            continue
+        parsed = parse_datetime(str(value))
+        if parsed is None:
+            day = parse_date(str(value))
+            parsed = datetime.datetime.combine(day, datetime.time.min) if day else None
+        if parsed is None:
+            return None, f"{key} must be an ISO date or datetime"
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        filters[key] = parsed
+    if source.get("posted_within_days") not in (None, ""):
+        try:
+            days = int(source.get("posted_within_days"))
+        except (TypeError, ValueError):
+            return None, "posted_within_days must be an integer"
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        filters["posted_after"] = max(filters["posted_after"], cutoff) if "posted_after" in filters else cutoff
+    return filters, None
+
+
 class RAGSearchView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -1022,13 +1089,43 @@ class RAGSearchView(APIView):
         similarity_threshold = float(request.data.get("similarity_threshold", 0.3))
         must_contain = request.data.get("must_contain") or []
         must_not_contain = request.data.get("must_not_contain") or []
+        filters, filter_error = _parse_job_filters(request.data)
+        if filter_error:
+            return Response({"detail": filter_error}, status=400)
         
         if not query:
             return Response({"detail": "query is required"}, status=400)
         
         try:
-            q_emb = embed_text(query)
-            rows = search_similar_jobs(q_emb, top_n=top_n, similarity_threshold=similarity_threshold)
+            q_emb = None
+            # Read the version before searching so a concurrent job write can't be cached under it
+            version = job_index_version() if SEARCH_CACHE_ENABLED else None
+            result_key = None
+            if version is not None:
+                result_key = search_result_key(
+                    query,
+                    version,
+                    top_n=top_n,
+                    similarity_threshold=similarity_threshold,
+                    must_contain=must_contain,
+                    must_not_contain=must_not_contain,
+                    filters=filters,
+                )
+            rows = get_search_result_cache().get(result_key) if result_key else None
+            if rows is None:
+                q_emb = embed_query(query)
+                # Keyword include/exclude runs inside the vector query (jobs.search_tsv)
+                rows = search_similar_jobs(
+                    q_emb,
+                    top_n=top_n,
+                    similarity_threshold=similarity_threshold,
+                    must_contain=must_contain,
+                    must_not_contain=must_not_contain,
+                    filters=filters,
+                )
+                rows = result_rows(rows)
+                if result_key:
+                    get_search_result_cache().put(result_key, rows)
             
             jobs = []
             for row in rows or []:
@@ -1053,44 +1150,16 @@ class RAGSearchView(APIView):
                 except Exception:
                     # Skip malformed rows defensively
                     continue
-            # Optional keyword filtering (case-insensitive)
-            def _text_blob(j):
-                return f"{j.get('title') or ''} {j.get('description') or ''} {j.get('requirements') or ''}".lower()
-
-            if must_contain:
-                kws = [str(k).lower() for k in (must_contain if isinstance(must_contain, list) else [must_contain])]
-                jobs = [j for j in jobs if any(k in _text_blob(j) for k in kws)]
-
-            if must_not_contain:
-                bad = [str(k).lower() for k in (must_not_contain if isinstance(must_not_contain, list) else [must_not_contain])]
-                jobs = [j for j in jobs if all(k not in _text_blob(j) for k in bad)]
-            
-            # If no rows were returned, try to sample a stored embedding to
-            # detect a possible embedding-dimension mismatch (common cause when
-            # embeddings were generated with a different dimension than the
-            # current server config).
-            stored_embedding_dim = None
-            try:
-                with connection.cursor() as c:
-                    c.execute("SELECT embedding FROM job_embeddings LIMIT 1")
-                    one = c.fetchone()
-                    if one and one[0] is not None:
-                        emb_val = one[0]
-                        # pgvector may come back as a list, or a string like '[0.1,0.2,...]'
-                        if isinstance(emb_val, (list, tuple)):
-                            stored_embedding_dim = len(emb_val)
-                        elif isinstance(emb_val, str):
-                            s = emb_val.strip()
-                            if s.startswith("[") and s.endswith("]"):
-                                stored_embedding_dim = len([x for x in s[1:-1].split(",") if x.strip() != ""]) 
-            except Exception:
-                stored_embedding_dim = None
 
             summary = generate_answer(query, rows)
 
             # If no matches, include diagnostic info to help debug embedding
-            # dimension mismatches or provider/config issues.
+            # dimension mismatches (embeddings generated with a different
+            # dimension than the current server config) or provider issues.
             if not jobs:
+                if q_emb is None:
+                    q_emb = embed_query(query)
+                index_meta = get_index_metadata() or {}
                 return Response({
                     "query": query,
                     "results": jobs,
@@ -1098,7 +1167,8 @@ class RAGSearchView(APIView):
                     "total_matches": 0,
                     "similarity_threshold": similarity_threshold,
                     "diagnostic": {
-                        "stored_embedding_dim": stored_embedding_dim,
+                        "stored_embedding_dim": index_meta.get("dimensions"),
+                        "stored_embedding_model": index_meta.get("embedding_model"),
                         "query_embedding_dim": len(q_emb) if isinstance(q_emb, (list, tuple)) else None,
                         "configured_fireworks_dim": EMB_DIM,
                     },
@@ -1150,6 +1220,68 @@ class RAGSearchView(APIView):
                 return Response({"detail": f"search failed: {str(e)}; fallback failed: {str(e2)}"}, status=400)
 
 
+class EmbeddingCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        stats = get_embedding_cache().stats()
+        stats["search_results"] = get_search_result_cache().stats()
+        stats["dispatcher"] = get_embedding_dispatcher().stats()
+        stats["llm_responses"] = get_llm_cache().stats()
+        stats["llm_gateway"] = llm_gateway.stats()
+        return Response(stats, status=200)
+
+
+class IndexingStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Embedding progress of a job (?job_id=) or CV (?cv_id=) written by the async endpoints."""
+        job_id = request.query_params.get("job_id")
+        cv_id = request.query_params.get("cv_id")
+        if bool(job_id) == bool(cv_id):
+            return Response({"detail": "Provide exactly one of job_id or cv_id"}, status=400)
+        try:
+            owner_id = uuid.UUID(job_id or cv_id)
+        except ValueError:
+            return Response({"detail": "Invalid id"}, status=400)
+        kind = EmbeddingOutboxItem.KIND_JOB if job_id else EmbeddingOutboxItem.KIND_CV
+        return Response(indexing_status(kind, owner_id), status=200)
+
+
+def _get_background_task(request, task_id):
+    task = BackgroundTask.objects.filter(id=task_id).first()
+    if task is None or (task.user_id != request.user.pk and not request.user.is_staff):
+        return None
+    return task
+
+
+class BackgroundTaskStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, task_id):
+        """Progress of a call queued with "async": true."""
+        task = _get_background_task(request, task_id)
+        if task is None:
+            return Response({"detail": "Task not found"}, status=404)
+        return Response(task_status(task, request), status=200)
+
+
+class BackgroundTaskResultView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, task_id):
+        """The endpoint's response for a finished task (202 while it is still queued or running)."""
+        task = _get_background_task(request, task_id)
+        if task is None:
+            return Response({"detail": "Task not found"}, status=404)
+        if task.status in BackgroundTask.ACTIVE_STATUSES:
+            return Response(task_status(task, request), status=202)
+        if task.status == BackgroundTask.STATUS_FAILED and task.result is None:
+            return Response({"detail": "Task failed", "error": task.last_error or None}, status=500)
+        return Response(task.result, status=task.status_code or 200)
+
+
 class CVMatchView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1162,12 +1294,23 @@ class CVMatchView(APIView):
         similarity_threshold = float(request.data.get("similarity_threshold", 0.6))
         must_contain = request.data.get("must_contain") or []
         must_not_contain = request.data.get("must_not_contain") or []
+        # "live" ranks jobs now; "materialized" reads cv_job_matches (stored CVs only)
+        mode = request.data.get("mode") or MATCH_READ_MODE
+        # Opt-in second stage: rerank the top ANN candidates by skill overlap and recency
+        rerank = str(request.data.get("rerank", "")).lower() in ("1", "true")
+        filters, filter_error = _parse_job_filters(request.data)
+        if filter_error:
+            return Response({"detail": filter_error}, status=400)
+
+        # Set when the CV comes from the DB, so its stored chunk vectors can be reused
+        stored_cv_id = None
 
         # If cv_id is provided, fetch parsed_text from DB
         if cv_id and not cv_text:
             try:
                 cv_obj = CV.objects.get(id=cv_id)
                 cv_text = cv_obj.parsed_text or ""
+                stored_cv_id = cv_obj.id
             except CV.DoesNotExist:
                 return Response({"detail": "cv_id not found"}, status=404)
 
@@ -1191,6 +1334,7 @@ class CVMatchView(APIView):
                         "hint": "Upload a CV first using /api/rag/cv-upload/",
                     }, status=404)
                 cv_text = latest_cv.parsed_text or ""
+                stored_cv_id = latest_cv.id
                 if not cv_text:
                     return Response({
                         "detail": "Latest CV has no parsed_text",
@@ -1203,101 +1347,82 @@ class CVMatchView(APIView):
             return Response({"detail": "cv_text or cv_id is required"}, status=400)
 
         try:
-            # Embed the entire CV text. If very long, chunk first and average embeddings.
-            chunks = chunk_text(cv_text)
-            if not chunks:
-                return Response({"detail": "No readable content in CV", "diagnostic": {"cv_text_len": len(cv_text or '')}}, status=400)
-
-            emb_list = []
-            for ch in chunks:
-                try:
-                    emb_list.append(embed_text(ch))
-                except Exception:
-                    continue
-
-            if not emb_list:
-                return Response({"detail": "Failed to embed CV content"}, status=400)
-
-            # Search per chunk, aggregate by job with max score to avoid dilution
-            job_id_to_best = {}
-            for vec in emb_list:
-                if not vec:
+            emb_list = None
+            result_limit = max(top_n, 100)
+            candidates = max(result_limit, RERANK_CANDIDATES) if rerank else result_limit
+            if mode == "materialized" and (
+                not stored_cv_id or must_contain or must_not_contain or filters or candidates > MATCH_TABLE_TOP_K
+            ):
+                # The stored top-K was ranked unfiltered and holds MATCH_TABLE_TOP_K jobs; a filtered
+                # request or a larger candidate pool (rerank, big top_n) would see a different set
+                mode = "live"
+            if mode == "materialized":
+                # Precomputed top-K from cv_job_matches: one indexed lookup, no embedding or ANN query
+                rows = get_cv_matches(stored_cv_id, top_n=candidates, similarity_threshold=similarity_threshold)
+            else:
+                # Embed the CV chunks (stored vectors are reused when current)
+                chunks = chunk_text(cv_text)
+                if not chunks:
+                    return Response({"detail": "No readable content in CV", "diagnostic": {"cv_text_len": len(cv_text or '')}}, status=400)
+                if stored_cv_id:
+                    emb_list = get_cv_vectors(stored_cv_id, cv_text)
+                else:
+                    embeddings, _ = embed_texts(chunks)
+                    emb_list = [emb for emb in embeddings if emb]
+
+                if not emb_list:
+                    return Response({"detail": "Failed to embed CV content"}, status=400)
+
+                # Search with all chunks at once; the DB keeps each job's best chunk score
+                # and applies the keyword include/exclude filters before the LIMIT
+                rows = search_similar_jobs_multi(
+                    emb_list,
+                    top_n=candidates,
+                    similarity_threshold=similarity_threshold,
+                    must_contain=must_contain,
+                    must_not_contain=must_not_contain,
+                    filters=filters,
+                )
+            rerank_details = {}
+            if rerank and rows:
+                rows, rerank_details = rerank_jobs(rows, cv_text, top_n=result_limit)
+            jobs = []
+            for row in rows or []:
+                if not row or row[5] is None:
                     continue
-                rows = search_similar_jobs(vec, top_n=max(top_n, 20), similarity_threshold=0.0)
-                for row in rows or []:
-                    try:
-                        if not row or len(row) < 6:
-                            continue
-                        score_idx = 6 if len(row) >= 7 else 5
-                        score_val = row[score_idx]
-                        if score_val is None:
-                            continue
-                        job_id = str(row[0])
-                        score_f = float(score_val)
-                        existing = job_id_to_best.get(job_id)
-                        if existing is None or score_f > existing.get("score", 0.0):
-                            job_id_to_best[job_id] = {
-                                "id": job_id,
-                                "title": row[1],
-                                "description": row[2],
-                                "requirements": row[3],
-                                "company": str(row[4]) if row[4] is not None else None,
-                                "score": score_f,
-                            }
-                    except Exception:
-                        continue
-
-            # Build list and apply similarity_threshold
-            jobs = [j for j in job_id_to_best.values() if j.get("score", 0.0) >= similarity_threshold]
-            jobs.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-            # Optional keyword filtering (case-insensitive)
-            def _text_blob_cv(j):
-                return f"{j.get('title') or ''} {j.get('description') or ''} {j.get('requirements') or ''}".lower()
-
-            if must_contain:
-                kws = [str(k).lower() for k in (must_contain if isinstance(must_contain, list) else [must_contain])]
-                jobs = [j for j in jobs if any(k in _text_blob_cv(j) for k in kws)]
-
-            if must_not_contain:
-                bad = [str(k).lower() for k in (must_not_contain if isinstance(must_not_contain, list) else [must_not_contain])]
-                jobs = [j for j in jobs if all(k not in _text_blob_cv(j) for k in bad)]
-
+                job = {
+                    "id": str(row[0]),
+                    "title": row[1],
+                    "description": row[2],
+                    "requirements": row[3],
+                    "company": str(row[4]) if row[4] is not None else None,
+                    "score": float(row[5]),
+                }
+                if rerank_details:
+                    job["rerank"] = rerank_details.get(job["id"])
+                jobs.append(job)
             if jobs:
-                return Response({
+                payload = {
                     "query_type": "cv",
                     "results": jobs,
                     "total_matches": len(jobs),
-                    "similarity_threshold": similarity_threshold
-                }, status=200)
+                    "similarity_threshold": similarity_threshold,
+                    "mode": mode,
+                }
+                if rerank:
+                    payload["reranked"] = True
+                    payload["cv_skills"] = get_skill_index().text_skills(cv_text)
+                return Response(payload, status=200)
 
-            # If no matches, include diagnostics and a low-threshold sample to debug
-            stored_embedding_dim = None
-            total_embeddings = None
-            active_embeddings = None
-            try:
-                with connection.cursor() as c:
-                    c.execute("SELECT COUNT(*) FROM job_embeddings")
-                    total_embeddings = c.fetchone()[0]
-                    c.execute("SELECT embedding FROM job_embeddings LIMIT 1")
-                    one = c.fetchone()
-                    if one and one[0] is not None:
-                        emb_val = one[0]
-                        if isinstance(emb_val, (list, tuple)):
-                            stored_embedding_dim = len(emb_val)
-                        elif isinstance(emb_val, str):
-                            s = emb_val.strip()
-                            if s.startswith("[") and s.endswith("]"):
-                                stored_embedding_dim = len([x for x in s[1:-1].split(",") if x.strip() != ""]) 
-                    # Count active jobs that have embeddings
-                    c.execute("""
-                        SELECT COUNT(*)
-                        FROM job_embeddings e
-                        JOIN jobs j ON j.id = e.job_id
-                        WHERE j.is_active = TRUE
-                    """)
-                    active_embeddings = c.fetchone()[0]
-            except Exception:
-                pass
+            if emb_list is None:
+                # Materialized mode found nothing; the diagnostics below need the CV vectors
+                emb_list = get_cv_vectors(stored_cv_id, cv_text)
+                if not emb_list:
+                    return Response({"detail": "Failed to embed CV content"}, status=400)
+
+            # If no matches, include diagnostics and a low-threshold sample to debug.
+            # Index shape comes from the metadata registry, not per-request table scans.
+            index_meta = get_index_metadata() or {}
 
             # Try again with a very low threshold to surface scores (using first chunk)
             sample_vec = emb_list[0]
@@ -1305,38 +1430,19 @@ class CVMatchView(APIView):
             fallback = []
             for row in fallback_rows or []:
                 try:
-                    if not row or len(row) < 7 or row[6] is None:
+                    if not row or row[-1] is None:
                         continue
                     fallback.append({
                         "id": str(row[0]),
                         "title": row[1],
-                        "score": float(row[6]),
+                        "score": float(row[-1]),
                     })
                 except Exception:
                     continue
 
-            # Extra diagnostics: check raw distances and query vector magnitude
-            raw_dist_samples = []
+            # Cosine distances of the same low-threshold sample (distance = 1 - score)
+            raw_dist_samples = [{"id": f["id"], "distance": 1.0 - f["score"]} for f in fallback[:5]]
             q_sum_abs = sum(abs(x) for x in sample_vec if isinstance(x, (int, float)))
-            try:
-                emb_literal = "[" + ",".join(map(str, sample_vec)) + "]"
-                with connection.cursor() as c:
-                    c.execute(
-                        """
-                        SELECT j.id,
-                               (e.embedding <=> %s::vector) AS distance
-                        FROM job_embeddings e
-                        JOIN jobs j ON j.id = e.job_id
-                        WHERE j.is_active = TRUE
-                        ORDER BY distance NULLS LAST
-                        LIMIT 5
-                        """,
-                        [emb_literal],
-                    )
-                    for rid, dist in c.fetchall() or []:
-                        raw_dist_samples.append({"id": str(rid), "distance": None if dist is None else float(dist)})
-            except Exception:
-                pass
 
             return Response({
                 "query_type": "cv",
@@ -1344,11 +1450,14 @@ class CVMatchView(APIView):
                 "total_matches": 0,
                 "similarity_threshold": similarity_threshold,
                 "diagnostic": {
-                    "stored_embedding_dim": stored_embedding_dim,
+                    "stored_embedding_dim": index_meta.get("dimensions"),
+                    "stored_embedding_model": index_meta.get("embedding_model"),
                     "query_embedding_dim": len(sample_vec) if sample_vec else None,
                     "configured_fireworks_dim": EMB_DIM,
-                    "total_embeddings": total_embeddings,
-                    "active_embeddings": active_embeddings,
+                    "total_embeddings": index_meta.get("chunk_count"),
+                    "active_embeddings": index_meta.get("active_chunk_count"),
+                    "active_jobs_indexed": index_meta.get("active_job_count"),
+                    "index_metadata_refreshed_at": index_meta.get("refreshed_at"),
                     "low_threshold_samples": fallback[:5],
                     "query_vector_sum_abs": q_sum_abs,
                     "raw_distance_samples": raw_dist_samples,
@@ -1475,12 +1584,6 @@ class CVUploadView(APIView):
                 existing_cv.parsed_text = cv_text
                 existing_cv.updated_at = timezone.now()
                 existing_cv.save(update_fields=["filename", "parsed_text", "updated_at"])
-                # Remove old embeddings for this CV
-                try:
-                    with connection.cursor() as c:
-                        c.execute("DELETE FROM cv_embeddings WHERE cv_id = %s", [str(existing_cv.id)])
-                except Exception as e:
-                    embedding_warnings.append(f"cleanup: {e}")
                 target_cv = existing_cv
                 status_code = 200
             else:
@@ -1493,28 +1596,16 @@ class CVUploadView(APIView):
                 )
                 status_code = 201
 
-            # Create embeddings for CV text (chunked)
-            chunks = chunk_text(cv_text)
-            for i, chunk in enumerate(chunks or []):
-                try:
-                    emb = embed_text(chunk)
-                    if EMB_DIM and len(emb) != EMB_DIM:
-                        embedding_warnings.append(f"chunk_{i}: unexpected dim {len(emb)}")
-                        continue
-                    with connection.cursor() as c:
-                        emb_literal = "[" + ",".join(map(str, emb)) + "]"
-                        c.execute(
-                            "INSERT INTO cv_embeddings (id, cv_id, created_at, embedding) VALUES (%s, %s, NOW(), %s::vector)",
-                            [str(uuid.uuid4()), str(target_cv.id), emb_literal],
-                        )
-                except Exception as e:
-                    embedding_warnings.append(f"chunk_{i}: {e}")
+            # Create embeddings for CV text (chunked); they replace any old chunks of this CV
+            indexing = index_now_or_enqueue(EmbeddingOutboxItem.KIND_CV, target_cv.id)
+            embedding_warnings.extend(indexing.get("warnings") or [])
 
             resp = {
                 "id": str(target_cv.id),
                 "user": str(target_cv.user_id),
                 "filename": target_cv.filename,
                 "parsed_text_len": len(target_cv.parsed_text or ''),
+                "indexing_status": indexing["status"],
             }
             if embedding_warnings:
                 resp["embedding_warnings"] = embedding_warnings
@@ -1526,6 +1617,7 @@ class CVUploadView(APIView):
 class CVRecommendationsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @async_task("cv_recommendations")
     def post(self, request):
         """Generate recommendation metrics and suggestions for a CV.
 
@@ -1642,30 +1734,6 @@ class CVRecommendationsView(APIView):
             "Output a single JSON object with the exact keys described."
         )
 
-        try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.1,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        except Exception as e:
-            return Response({"detail": f"Model call failed: {e}"}, status=400)
-
         def _parse_json(s: str):
             try:
                 return json.loads(s)
@@ -1679,6 +1747,22 @@ class CVRecommendationsView(APIView):
                         return None
                 return None
 
+        try:
+            # Unchanged CV, unchanged analysis: only JSON answers are cached
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.1,
+                json_mode=True,
+                timeout=60,
+                cache_as="cv_recommendations",
+                validate=lambda c: isinstance(_parse_json(c), dict),
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
+        except Exception as e:
+            return Response({"detail": f"Model call failed: {e}"}, status=400)
+
         data = _parse_json(content)
         if not isinstance(data, dict):
             return Response({
@@ -1826,26 +1910,15 @@ class CVRewriteView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.2,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=90)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.2,
+                json_mode=True,
+                timeout=90,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -1914,6 +1987,7 @@ class CVRewriteView(APIView):
 
         return cv_text, None
 
+    @async_task("cv_rewrite")
     def post(self, request):
         """
         Rewrite/improve a CV using AI, applying the provided suggestions/improvement plan.
@@ -1985,26 +2059,15 @@ class CVRewriteView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.2,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=90)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.2,
+                json_mode=True,
+                timeout=90,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -2080,7 +2143,7 @@ class VoiceChatTurnView(APIView):
                 whisper_headers = {"Authorization": f"Bearer {openai_api_key}"}
                 whisper_files = {"file": (audio_file.name, audio_file, audio_file.content_type)}
                 whisper_data = {"model": "whisper-1", "response_format": "verbose_json"}
-                wr = requests.post(whisper_url, headers=whisper_headers, files=whisper_files, data=whisper_data, timeout=60)
+                wr = http_clients.post(whisper_url, headers=whisper_headers, files=whisper_files, data=whisper_data, timeout=60)
                 if wr.ok:
                     user_text = wr.json().get("text", "")
                 else:
@@ -2130,15 +2193,9 @@ class VoiceChatTurnView(APIView):
         messages.append({"role": "user", "content": user_text})
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {"Authorization": f"Bearer {FIREWORKS_API_KEY}", "Content-Type": "application/json"}
-            payload = {"model": model_name, "messages": messages, "temperature": 0.6}
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Model error: {r.status_code}", "body": r.text}, status=400)
-            data = r.json()
-            assistant_text = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            assistant_text = llm_gateway.chat(messages=messages, temperature=0.6, timeout=60).text
+        except LLMError as e:
+            return _llm_error_response(e, "Model error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -2157,7 +2214,7 @@ class VoiceChatTurnView(APIView):
                         'model_id': 'eleven_monolingual_v1',
                         'voice_settings': {'stability': 0.5, 'similarity_boost': 0.5}
                     }
-                    er = requests.post(el_url, headers=el_headers, json=el_data, timeout=30)
+                    er = http_clients.post(el_url, headers=el_headers, json=el_data, timeout=30)
                     if er.ok:
                         audio_b64 = base64.b64encode(er.content).decode('utf-8')
                         audio_mime = 'audio/mpeg'
@@ -2281,7 +2338,7 @@ class OpenAIConversationalInterviewView(APIView):
         if audio_file and not user_text:
             try:
                 audio_file.seek(0)
-                client = OpenAI(api_key=openai_api_key)
+                client = http_clients.get_openai_client(openai_api_key)
                 audio_file.seek(0)
                 transcript = client.audio.transcriptions.create(
                     model="whisper-1",
@@ -2341,15 +2398,9 @@ class OpenAIConversationalInterviewView(APIView):
         
         # Chat Completions: Get AI response using OpenAI
         try:
-            client = OpenAI(api_key=openai_api_key)
-            chat_model = config("OPENAI_CHAT_MODEL", default="gpt-4o-mini")
-            response = client.chat.completions.create(
-                model=chat_model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
-            assistant_text = response.choices[0].message.content.strip()
+            assistant_text = llm_gateway.chat(
+                messages=messages, provider="openai", temperature=0.7, max_tokens=500
+            ).text
         except Exception as e:
             return Response({
                 "detail": f"Chat completion failed: {str(e)}",
@@ -2368,7 +2419,7 @@ class OpenAIConversationalInterviewView(APIView):
                 if voice not in valid_voices:
                     voice = "alloy"
                 
-                client = OpenAI(api_key=openai_api_key)
+                client = http_clients.get_openai_client(openai_api_key)
                 tts_response = client.audio.speech.create(
                     model="tts-1",  # or "tts-1-hd" for higher quality
                     voice=voice,
@@ -2448,23 +2499,13 @@ class VoiceChatEvaluateView(APIView):
                 "Provide the JSON now."
             )
 
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {"Authorization": f"Bearer {FIREWORKS_API_KEY}", "Content-Type": "application/json"}
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.4,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Model error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.4,
+                json_mode=True,
+                timeout=60,
+            ).text
 
             def _parse_json(s: str):
                 try:
@@ -2482,6 +2523,8 @@ class VoiceChatEvaluateView(APIView):
                 "summary": data.get("summary", "") or data.get("detailed_feedback", "")
             }
             return Response(result, status=200)
+        except LLMError as e:
+            return _llm_error_response(e, "Model error")
         except Exception as e:
             return Response({"detail": f"Evaluation failed: {e}"}, status=400)
 
@@ -2542,7 +2585,7 @@ class TechVoiceChatTurnView(APIView):
                 whisper_headers = {"Authorization": f"Bearer {openai_api_key}"}
                 whisper_files = {"file": (audio_file.name, audio_file, audio_file.content_type)}
                 whisper_data = {"model": "whisper-1", "response_format": "verbose_json"}
-                wr = requests.post(whisper_url, headers=whisper_headers, files=whisper_files, data=whisper_data, timeout=60)
+                wr = http_clients.post(whisper_url, headers=whisper_headers, files=whisper_files, data=whisper_data, timeout=60)
                 if wr.ok:
                     user_text = wr.json().get("text", "")
                 else:
@@ -2606,15 +2649,9 @@ class TechVoiceChatTurnView(APIView):
             messages.append({"role": "user", "content": user_text})
 
             try:
-                url = f"{FIREWORKS_BASE_URL}/chat/completions"
-                model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-                headers = {"Authorization": f"Bearer {FIREWORKS_API_KEY}", "Content-Type": "application/json"}
-                payload = {"model": model_name, "messages": messages, "temperature": 0.5}
-                r = requests.post(url, headers=headers, json=payload, timeout=60)
-                if not r.ok:
-                    return Response({"detail": f"Model error: {r.status_code}", "body": r.text}, status=400)
-                data = r.json()
-                assistant_text = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                assistant_text = llm_gateway.chat(messages=messages, temperature=0.5, timeout=60).text
+            except LLMError as e:
+                return _llm_error_response(e, "Model error")
             except Exception as e:
                 return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -2629,7 +2666,7 @@ class TechVoiceChatTurnView(APIView):
                     el_url = 'https://api.elevenlabs.io/v1/text-to-speech/pNInz6obpgDQGcFmaJgB'
                     el_headers = {'Accept': 'audio/mpeg', 'Content-Type': 'application/json', 'xi-api-key': elevenlabs_api_key}
                     el_data = {'text': assistant_text, 'model_id': 'eleven_monolingual_v1', 'voice_settings': {'stability': 0.5, 'similarity_boost': 0.5}}
-                    er = requests.post(el_url, headers=el_headers, json=el_data, timeout=30)
+                    er = http_clients.post(el_url, headers=el_headers, json=el_data, timeout=30)
                     if er.ok:
                         audio_b64 = base64.b64encode(er.content).decode('utf-8')
                         audio_mime = 'audio/mpeg'
@@ -2733,15 +2770,13 @@ class TechVoiceChatEvaluateView(APIView):
             user_prompt += f"Target Job Description:\n{job_description}\n\n"
         user_prompt += f"Interview Transcript:\n{transcript}\n\nProvide the JSON now."
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {"Authorization": f"Bearer {FIREWORKS_API_KEY}", "Content-Type": "application/json"}
-            payload = {"model": model_name, "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], "temperature": 0.4, "response_format": {"type": "json_object"}}
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Model error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.4,
+                json_mode=True,
+                timeout=60,
+            ).text
             def _parse_json(s: str):
                 try:
                     return json.loads(s)
@@ -2760,6 +2795,8 @@ class TechVoiceChatEvaluateView(APIView):
                 "summary": data.get("summary", "") or data.get("detailed_feedback", "")
             }
             return Response(result, status=200)
+        except LLMError as e:
+            return _llm_error_response(e, "Model error")
         except Exception as e:
             return Response({"detail": f"Evaluation failed: {e}"}, status=400)
 
@@ -2788,44 +2825,19 @@ class DashboardView(APIView):
             top_matches = []
             total_matches = 0
             if cv_text:
-                chunks = chunk_text(cv_text)
-                emb_list = []
-                for ch in chunks:
-                    try:
-                        emb_list.append(embed_text(ch))
-                    except Exception:
-                        continue
-                # Aggregate by job with best score across chunks
-                job_id_to_best = {}
-                for vec in emb_list:
-                    if not vec:
-                        continue
-                    rows = search_similar_jobs(vec, top_n=50, similarity_threshold=0.0)
-                    for row in rows or []:
-                        try:
-                            if not row or len(row) < 6:
-                                continue
-                            score_idx = 6 if len(row) >= 7 else 5
-                            score_val = row[score_idx]
-                            if score_val is None:
-                                continue
-                            job_id = str(row[0])
-                            score_f = float(score_val)
-                            existing = job_id_to_best.get(job_id)
-                            if existing is None or score_f > existing.get("score", 0.0):
-                                job_obj = {
-                                    "id": job_id,
-                                    "title": row[1],
-                                    "description": row[2],
-                                    "requirements": row[3],
-                                    "company": str(row[4]) if row[4] is not None else None,
-                                    "score": score_f,
-                                }
-                                job_id_to_best[job_id] = job_obj
-                        except Exception:
-                            continue
-                matches = list(job_id_to_best.values())
-                matches.sort(key=lambda x: x.get("score", 0.0), reverse=True)
+                if (request.query_params.get("mode") or MATCH_READ_MODE) == "materialized":
+                    rows = get_cv_matches(latest_cv.id, top_n=100, similarity_threshold=0.0)
+                else:
+                    # Stored chunk vectors of the CV; only re-embedded when missing or stale
+                    emb_list = get_cv_vectors(latest_cv.id, cv_text)
+                    # Best score per job across all chunks, aggregated in one query
+                    rows = search_similar_jobs_multi(emb_list, top_n=100, similarity_threshold=0.0)
+                matches = [{
+                    "id": str(row[0]),
+                    "title": row[1],
+                    "company": str(row[4]) if row[4] is not None else None,
+                    "score": float(row[5]),
+                } for row in rows or [] if row and row[5] is not None]
                 total_matches = len(matches)
                 top_matches = [{
                     "id": m.get("id"),
@@ -2844,33 +2856,25 @@ class DashboardView(APIView):
                 if not FIREWORKS_API_KEY:
                     cv_score_value = None
                 else:
+                    def _score(content):
+                        try:
+                            v = json.loads(content).get("overall_score")
+                        except Exception:
+                            return None
+                        return int(round(float(v))) if isinstance(v, (int, float)) else None
+
                     try:
-                        url = f"{FIREWORKS_BASE_URL}/chat/completions"
-                        model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-                        headers = {
-                            "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                            "Content-Type": "application/json",
-                        }
-                        payload = {
-                            "model": model_name,
-                            "messages": [
-                                {"role": "system", "content": system_prompt},
-                                {"role": "user", "content": user_prompt},
-                            ],
-                            "temperature": 0.1,
-                            "response_format": {"type": "json_object"},
-                        }
-                        r = requests.post(url, headers=headers, json=payload, timeout=45)
-                        if r.ok:
-                            data_resp = r.json()
-                            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "")
-                            try:
-                                obj = json.loads(content)
-                                v = obj.get("overall_score")
-                                if isinstance(v, (int, float)):
-                                    cv_score_value = int(round(float(v)))
-                            except Exception:
-                                cv_score_value = None
+                        # The same CV scores the same on every dashboard refresh
+                        content = llm_gateway.chat(
+                            system=system_prompt,
+                            user=user_prompt,
+                            temperature=0.1,
+                            json_mode=True,
+                            timeout=45,
+                            cache_as="dashboard_cv_score",
+                            validate=lambda c: _score(c) is not None,
+                        ).text
+                        cv_score_value = _score(content) if content else None
                     except Exception:
                         cv_score_value = None
 
@@ -2888,6 +2892,7 @@ class DashboardView(APIView):
 class CareerAdvisorView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @async_task("career_advisor")
     def post(self, request):
         """AI Career Advisor: Analyze CV and provide career path guidance.
 
@@ -2958,26 +2963,15 @@ class CareerAdvisorView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.3,
+                json_mode=True,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -3026,9 +3020,66 @@ class CareerAdvisorView(APIView):
         return Response(result, status=200)
 
 
+CAREER_STREAM_HEARTBEAT_SECONDS = config("CAREER_STREAM_HEARTBEAT_SECONDS", default=15, cast=int)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_career_analysis(cv_text: str, target_role, stored_cv_id):
+    """
+    Server-Sent Events for MultiAgentCareerView: one `status` event when an agent
+    starts, one `agent` event with its results when it finishes, then `complete`
+    with the full result (same body as the non-streaming response).
+    """
+    from django.db import connections
+    from .multi_agent_career import MultiAgentCareerCoordinator
+
+    events = queue.Queue()
+
+    def work():
+        try:
+            result = MultiAgentCareerCoordinator().analyze_career(
+                cv_text, target_role=target_role, cv_id=stored_cv_id, on_event=events.put
+            )
+            result["analyzed_chars"] = len(cv_text)
+            result["target_role"] = target_role
+            result["timestamp"] = timezone.now().isoformat()
+            events.put({"type": "complete", "result": result})
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(f"Streaming multi-agent career analysis failed: {e}", exc_info=True)
+            events.put({"type": "error", "detail": str(e)})
+        finally:
+            connections.close_all()
+            events.put(None)
+
+    def stream():
+        yield _sse("start", {"analyzed_chars": len(cv_text), "target_role": target_role})
+        while True:
+            try:
+                event = events.get(timeout=CAREER_STREAM_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            yield _sse(event["type"], event)
+
+    threading.Thread(target=work, name="career-stream", daemon=True).start()
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 class MultiAgentCareerView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @async_task("multi_agent_career")
     def post(self, request):
         """Multi-Agent Career Development System: Comprehensive career analysis using specialized agents.
         
@@ -3037,6 +3088,10 @@ class MultiAgentCareerView(APIView):
           - cv_text (optional): raw CV text
           - target_role (optional): specific role to analyze for
           - none: use the latest CV of the authenticated user
+          - stream (optional, or ?stream=1): respond with Server-Sent Events,
+            pushing each agent's status and result as soon as it completes
+          - async (optional, or ?async=1): queue the analysis and answer 202
+            with a task id to poll at /api/tasks/<task_id>/
         """
         from .multi_agent_career import MultiAgentCareerCoordinator
         
@@ -3044,11 +3099,15 @@ class MultiAgentCareerView(APIView):
         cv_text = request.data.get("cv_text")
         target_role = request.data.get("target_role")
 
+        # Set when the CV comes from the DB, so job matching can reuse its stored vectors
+        stored_cv_id = None
+
         # Resolve CV text (same logic as CareerAdvisorView)
         if cv_id and not cv_text:
             try:
                 cv_obj = CV.objects.get(id=cv_id)
                 cv_text = cv_obj.parsed_text or ""
+                stored_cv_id = cv_obj.id
             except CV.DoesNotExist:
                 return Response({"detail": "cv_id not found"}, status=404)
 
@@ -3070,6 +3129,7 @@ class MultiAgentCareerView(APIView):
                     "hint": "Upload a CV first using /api/rag/cv-upload/",
                 }, status=404)
             cv_text = latest_cv.parsed_text or ""
+            stored_cv_id = latest_cv.id
 
         if not cv_text:
             return Response({"detail": "cv_text is empty"}, status=400)
@@ -3080,10 +3140,14 @@ class MultiAgentCareerView(APIView):
                 "hint": "Configure FIREWORKS_API_KEY in environment",
             }, status=400)
 
+        stream = request.data.get("stream") or request.query_params.get("stream")
+        if str(stream).lower() in ("1", "true"):
+            return _stream_career_analysis(cv_text.strip(), target_role, stored_cv_id)
+
         try:
             # Initialize coordinator and run multi-agent analysis
             coordinator = MultiAgentCareerCoordinator()
-            result = coordinator.analyze_career(cv_text.strip(), target_role=target_role)
+            result = coordinator.analyze_career(cv_text.strip(), target_role=target_role, cv_id=stored_cv_id)
             
             # Check if there was an error in the result
             if "error" in result:
@@ -3195,26 +3259,15 @@ class InterviewQuestionsView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.4,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.4,
+                json_mode=True,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -3358,26 +3411,15 @@ class InterviewPracticeView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.3,
+                json_mode=True,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -3498,26 +3540,15 @@ class InterviewAnswerEvaluationView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.3,
+                json_mode=True,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -3638,6 +3669,7 @@ class InterviewAnswerSubmissionView(APIView):
 class InterviewBatchSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @async_task("interview_batch_evaluation")
     def post(self, request):
         """Submit all answers for a session and get batch AI evaluation.
 
@@ -3752,27 +3784,13 @@ class InterviewBatchSubmissionView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=120)  # Longer timeout for batch
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.3,
+                json_mode=True,
+                timeout=120,
+            ).text
             
             def _parse_json(s: str):
                 try:
@@ -3842,6 +3860,8 @@ class InterviewBatchSubmissionView(APIView):
                 "message": "All answers evaluated successfully using batch AI processing"
             }, status=200)
 
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Batch evaluation failed: {str(e)}"}, status=400)
 class InterviewHistoryView(APIView):
@@ -4086,26 +4106,15 @@ class AudioInterviewQuestionsView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.4,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.4,
+                json_mode=True,
+                timeout=60,
+            ).text
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Model call failed: {e}"}, status=400)
 
@@ -4181,7 +4190,7 @@ class AudioInterviewQuestionsView(APIView):
                             }
                         }
                         
-                        elevenlabs_response = requests.post(
+                        elevenlabs_response = http_clients.post(
                             elevenlabs_url, 
                             headers=elevenlabs_headers, 
                             json=elevenlabs_data, 
@@ -4359,7 +4368,7 @@ class AudioInterviewAnswerSubmissionView(APIView):
                         "response_format": "verbose_json"
                     }
                     
-                    whisper_response = requests.post(
+                    whisper_response = http_clients.post(
                         whisper_url, 
                         headers=whisper_headers, 
                         files=whisper_files, 
@@ -4420,6 +4429,7 @@ class AudioInterviewAnswerSubmissionView(APIView):
 class AudioInterviewBatchSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @async_task("audio_interview_batch_evaluation")
     def post(self, request):
         """Submit all audio answers for a session and get batch AI evaluation.
 
@@ -4514,27 +4524,13 @@ class AudioInterviewBatchSubmissionView(APIView):
         )
 
         try:
-            url = f"{FIREWORKS_BASE_URL}/chat/completions"
-            model_name = config("FIREWORKS_CHAT_MODEL", default="accounts/fireworks/models/llama-v3p3-70b-instruct")
-            headers = {
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": 0.3,
-                "response_format": {"type": "json_object"},
-            }
-            r = requests.post(url, headers=headers, json=payload, timeout=120)
-            if not r.ok:
-                return Response({"detail": f"Fireworks error: {r.status_code}", "body": r.text}, status=400)
-            
-            data_resp = r.json()
-            content = data_resp.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            content = llm_gateway.chat(
+                system=system_prompt,
+                user=user_prompt,
+                temperature=0.3,
+                json_mode=True,
+                timeout=120,
+            ).text
             
             def _parse_json(s: str):
                 try:
@@ -4609,6 +4605,8 @@ class AudioInterviewBatchSubmissionView(APIView):
                 "message": "All audio answers evaluated successfully using batch AI processing"
             }, status=200)
 
+        except LLMError as e:
+            return _llm_error_response(e, "Fireworks error")
         except Exception as e:
             return Response({"detail": f"Audio batch evaluation failed: {str(e)}"}, status=400)
 
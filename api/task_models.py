@@ -0,0 +1,58 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class BackgroundTask(models.Model):
+    """
+    A slow LLM endpoint call run off the request path (see api/task_queue.py).
+    `payload` is the original request body and query string; `result` and
+    `status_code` are what the endpoint answered once a worker replayed it.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100)
+    user_id = models.IntegerField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    dedupe_key = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    status_code = models.IntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    last_error = models.TextField(blank=True, default="")
+    available_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "background_tasks"
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="background_tasks_ready_idx"),
+            models.Index(fields=["user_id", "-created_at"], name="background_tasks_user_idx"),
+        ]
+        constraints = [
+            # At most one queued or running copy of the same call
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status__in=["pending", "running"]),
+                name="background_tasks_active_dedupe",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.id} ({self.status})"
@@ -0,0 +1,332 @@
+"""
+DB-backed background queue for the slow LLM endpoints.
+
+The endpoints in TASKS are decorated with `@async_task(name)`. Called with
+"async": true (in the body or ?async=1) they store the request as a
+BackgroundTask and answer 202 with the task id and the URLs to poll,
+instead of holding the connection (and a web worker) for the minutes a
+multi-agent analysis or a batch evaluation can take. Without the flag they
+run inline as before.
+
+`python manage.py process_background_tasks` claims pending tasks (SELECT ...
+FOR UPDATE SKIP LOCKED on Postgres, so several worker processes can run side
+by side) and replays each one through its view, authenticated as the user
+who queued it, so the endpoint code is the same either way. The response
+status and body are stored on the task. Exceptions and 5xx answers are
+retried with exponential backoff up to TASK_QUEUE_MAX_ATTEMPTS; a task whose
+worker died is picked up again once its TASK_QUEUE_LEASE_SECONDS lease runs out.
+
+While a task is pending or running, queueing the same call again (same
+endpoint, user and body) returns the existing task instead of paying for the
+LLM calls twice.
+"""
+import functools
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from importlib import import_module
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from decouple import config
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import F, Q
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .task_models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+TASK_QUEUE_MAX_ATTEMPTS = config("TASK_QUEUE_MAX_ATTEMPTS", default=3, cast=int)
+TASK_QUEUE_LEASE_SECONDS = config("TASK_QUEUE_LEASE_SECONDS", default=900, cast=int)
+
+# Task name -> (view class, viewset action or None for APIView.post)
+TASKS: Dict[str, Tuple[str, Optional[str]]] = {
+    "career_advisor": ("api.supabase_views.CareerAdvisorView", None),
+    "multi_agent_career": ("api.supabase_views.MultiAgentCareerView", None),
+    "cv_recommendations": ("api.supabase_views.CVRecommendationsView", None),
+    "cv_rewrite": ("api.supabase_views.CVRewriteView", None),
+    "cover_letter": ("api.supabase_views.CoverLetterViewSet", "generate"),
+    "interview_batch_evaluation": ("api.supabase_views.InterviewBatchSubmissionView", None),
+    "audio_interview_batch_evaluation": ("api.supabase_views.AudioInterviewBatchSubmissionView", None),
+    "resume_auto_fill": ("api.resume_views.ResumeViewSet", "auto_fill_from_cv"),
+}
+
+# Request flags that only control how the call is answered, not what it computes
+CONTROL_FLAGS = ("async", "stream")
+
+
+def _truthy(value) -> bool:
+    return value is True or str(value).lower() in ("1", "true", "yes")
+
+
+def _plain(data) -> dict:
+    if hasattr(data, "dict"):
+        # QueryDict from a form body; the JSON endpoints only use single values
+        data = data.dict()
+    return {k: v for k, v in dict(data or {}).items() if k not in CONTROL_FLAGS}
+
+
+def dedupe_key(name: str, user_id, payload: dict) -> str:
+    canonical = json.dumps(
+        [name, user_id, payload.get("data"), payload.get("query")],
+        sort_keys=True,
+        cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# ----- queue -------------------------------------------------------------
+
+def enqueue(name: str, user_id, payload: dict) -> Tuple[BackgroundTask, bool]:
+    """Queue a call, or return the identical one already in flight. Returns (task, created)."""
+    if name not in TASKS:
+        raise ValueError(f"unknown background task {name!r}")
+    key = dedupe_key(name, user_id, payload)
+    active = BackgroundTask.objects.filter(dedupe_key=key, status__in=BackgroundTask.ACTIVE_STATUSES)
+    task = active.first()
+    if task is not None:
+        return task, False
+    try:
+        with transaction.atomic():
+            task = BackgroundTask.objects.create(
+                name=name,
+                user_id=user_id,
+                payload=payload,
+                dedupe_key=key,
+                available_at=timezone.now(),
+            )
+        return task, True
+    except IntegrityError:
+        # Lost a race with an identical request; share its task
+        task = active.first()
+        if task is None:
+            raise
+        return task, False
+
+
+def claim_batch(batch_size: int) -> List[BackgroundTask]:
+    """Lease up to `batch_size` ready tasks (including ones whose worker died)."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=TASK_QUEUE_LEASE_SECONDS)
+    # A task that keeps killing its worker (OOM, hard timeout) never reaches _fail
+    BackgroundTask.objects.filter(
+        status=BackgroundTask.STATUS_RUNNING, updated_at__lt=stale, attempts__gte=TASK_QUEUE_MAX_ATTEMPTS
+    ).update(
+        status=BackgroundTask.STATUS_FAILED,
+        last_error="worker lost the task on every attempt",
+        finished_at=now,
+        updated_at=now,
+    )
+    ready = Q(status=BackgroundTask.STATUS_PENDING, available_at__lte=now) | Q(
+        status=BackgroundTask.STATUS_RUNNING, updated_at__lt=stale, attempts__lt=TASK_QUEUE_MAX_ATTEMPTS
+    )
+    with transaction.atomic():
+        qs = BackgroundTask.objects.filter(ready).order_by("available_at")
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        tasks = list(qs[:batch_size])
+        if tasks:
+            BackgroundTask.objects.filter(id__in=[t.id for t in tasks]).update(
+                status=BackgroundTask.STATUS_RUNNING,
+                attempts=F("attempts") + 1,
+                started_at=now,
+                updated_at=now,
+            )
+    for task in tasks:
+        task.status = BackgroundTask.STATUS_RUNNING
+        task.attempts += 1
+    return tasks
+
+
+def _finish(task: BackgroundTask, **fields) -> bool:
+    # `attempts` fences out a worker whose lease expired and was re-claimed
+    return bool(
+        BackgroundTask.objects.filter(
+            id=task.id, status=BackgroundTask.STATUS_RUNNING, attempts=task.attempts
+        ).update(updated_at=timezone.now(), **fields)
+    )
+
+
+def _fail(task: BackgroundTask, error: str, status_code: Optional[int] = None, result=None):
+    now = timezone.now()
+    if task.attempts >= TASK_QUEUE_MAX_ATTEMPTS:
+        _finish(
+            task,
+            status=BackgroundTask.STATUS_FAILED,
+            status_code=status_code,
+            result=result,
+            last_error=error[:2000],
+            finished_at=now,
+        )
+    else:
+        _finish(
+            task,
+            status=BackgroundTask.STATUS_PENDING,
+            last_error=error[:2000],
+            available_at=now + timedelta(seconds=2 ** task.attempts * 10),
+        )
+
+
+# ----- execution ---------------------------------------------------------
+
+def _view_for(name: str):
+    path, action = TASKS[name]
+    module_name, class_name = path.rsplit(".", 1)
+    cls = getattr(import_module(module_name), class_name)
+    return cls.as_view({"post": action}) if action else cls.as_view()
+
+
+def _build_request(task: BackgroundTask, user):
+    payload = task.payload or {}
+    path = payload.get("path") or "/"
+    query = payload.get("query") or {}
+    if query:
+        path = f"{path}?{urlencode(query)}"
+    request = RequestFactory().post(
+        path,
+        data=json.dumps(payload.get("data") or {}, cls=DjangoJSONEncoder),
+        content_type="application/json",
+        secure=bool(payload.get("secure")),
+        HTTP_HOST=payload.get("host") or "localhost",
+    )
+    # Honoured by DRF's Request in place of the view's authentication classes
+    request._force_auth_user = user
+    return request
+
+
+def _response_body(response):
+    data = getattr(response, "data", None)
+    if data is not None:
+        return data
+    if getattr(response, "streaming", False):
+        return None
+    try:
+        return json.loads(response.content or b"null")
+    except ValueError:
+        return {"content": response.content.decode("utf-8", errors="replace")[:10000]}
+
+
+def _run(task: BackgroundTask) -> bool:
+    from django.contrib.auth import get_user_model
+
+    try:
+        user = get_user_model().objects.get(pk=task.user_id)
+        response = _view_for(task.name)(_build_request(task, user))
+        status_code = response.status_code
+        body = _response_body(response)
+    except Exception as e:
+        logger.warning(f"Background task {task.name} {task.id} failed (attempt {task.attempts}): {e}")
+        _fail(task, str(e))
+        return False
+
+    if status_code >= 500:
+        detail = (body.get("detail") or body.get("error")) if isinstance(body, dict) else None
+        _fail(task, f"status {status_code}: {detail or 'server error'}", status_code, body)
+        return False
+    _finish(
+        task,
+        status=BackgroundTask.STATUS_DONE,
+        status_code=status_code,
+        result=body,
+        last_error="",
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def run_task(task: BackgroundTask) -> bool:
+    """Replay a claimed task through its view and store the outcome."""
+    try:
+        return _run(task)
+    finally:
+        # Runs on a pool thread, which opened its own DB connection
+        connections.close_all()
+
+
+def drain(batch_size: int = 4, concurrency: int = 1, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Run ready tasks until the queue is empty (or max_batches is hit)."""
+    counts = {"done": 0, "failed": 0}
+    batches = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="background-task")
+    try:
+        while max_batches is None or batches < max_batches:
+            tasks = claim_batch(batch_size)
+            if not tasks:
+                break
+            batches += 1
+            for ok in pool.map(run_task, tasks):
+                counts["done" if ok else "failed"] += 1
+    finally:
+        pool.shutdown(wait=True)
+    return counts
+
+
+def purge(days: int) -> int:
+    """Delete finished tasks older than `days`."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = BackgroundTask.objects.filter(
+        status__in=[BackgroundTask.STATUS_DONE, BackgroundTask.STATUS_FAILED], finished_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+# ----- endpoints ---------------------------------------------------------
+
+def task_status(task: BackgroundTask, request=None) -> dict:
+    data = {
+        "task_id": str(task.id),
+        "name": task.name,
+        "status": task.status,
+        "attempts": task.attempts,
+        "status_code": task.status_code,
+        "last_error": task.last_error or None,
+        "created_at": task.created_at,
+        "started_at": task.started_at,
+        "finished_at": task.finished_at,
+    }
+    if request is not None:
+        data["status_url"] = request.build_absolute_uri(reverse("background_task_status", args=[task.id]))
+        data["result_url"] = request.build_absolute_uri(reverse("background_task_result", args=[task.id]))
+    return data
+
+
+def async_task(name: str):
+    """Let a POST handler be queued with "async": true instead of run inline."""
+    if name not in TASKS:
+        raise ValueError(f"unknown background task {name!r}")
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            wants_async = _truthy(request.query_params.get("async")) or (
+                hasattr(request.data, "get") and _truthy(request.data.get("async"))
+            )
+            if not wants_async:
+                return handler(self, request, *args, **kwargs)
+            if request.FILES:
+                return Response(
+                    {"detail": "async mode takes a JSON body; upload files first and pass their ids"},
+                    status=400,
+                )
+            payload = {
+                "data": _plain(request.data),
+                "query": _plain(request.query_params),
+                "path": request.path,
+                "host": request.get_host(),
+                "secure": request.is_secure(),
+            }
+            task, created = enqueue(name, request.user.pk, payload)
+            data = task_status(task, request)
+            data["deduplicated"] = not created
+            return Response(data, status=202)
+
+        return wrapper
+
+    return decorator
@@ -16,6 +16,10 @@ from .supabase_views import (
     RecommendationViewSet,
     CoverLetterViewSet,
     RAGSearchView,
+    EmbeddingCacheStatsView,
+    IndexingStatusView,
+    BackgroundTaskStatusView,
+    BackgroundTaskResultView,
     CVMatchView,
     CVUploadView,
     CVRecommendationsView,
@@ -83,7 +87,11 @@ urlpatterns = [
     path("test-supabase/", test_supabase_connection, name="test_supabase_connection"),
     path("rag/search/", RAGSearchView.as_view(), name="rag_search"),
     path("rag/cv-match/", CVMatchView.as_view(), name="rag_cv_match"),
+    path("rag/embedding-cache/stats/", EmbeddingCacheStatsView.as_view(), name="rag_embedding_cache_stats"),
     path("rag/cv-upload/", CVUploadView.as_view(), name="rag_cv_upload"),
+    path("rag/indexing-status/", IndexingStatusView.as_view(), name="rag_indexing_status"),
+    path("tasks/<uuid:task_id>/", BackgroundTaskStatusView.as_view(), name="background_task_status"),
+    path("tasks/<uuid:task_id>/result/", BackgroundTaskResultView.as_view(), name="background_task_result"),
     path("rag/cv-recommendations/", CVRecommendationsView.as_view(), name="rag_cv_recommendations"),
     path("rag/cv-generate/", CVRewriteView.as_view(), name="rag_cv_rewrite"),
     path("dashboard/", DashboardView.as_view(), name="dashboard"),
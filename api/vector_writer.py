@@ -0,0 +1,150 @@
+"""
+Bulk writer for the chunk embedding tables (job_embeddings, cv_embeddings).
+
+Rows are buffered per owner (job_id / cv_id) and written in one transaction:
+owners queued with `replace()` have their existing chunks deleted first, then
+every buffered row is inserted with a multi-row `execute_values` statement, or
+streamed with COPY once the batch is large enough. One flush is a handful of
+round-trips regardless of chunk count, instead of one INSERT per chunk.
+
+On a non-Postgres database (USE_SQLITE=True) the same API writes through the
+ORM, storing vectors as JSON lists.
+
+Usage:
+    replace_embeddings("cv_embeddings", cv.id, vectors)
+
+    with EmbeddingWriter("job_embeddings") as writer:
+        for job_id, vectors in batch:
+            writer.replace(job_id, vectors)
+"""
+import io
+import uuid
+from typing import Iterable, List, Tuple
+
+from decouple import config
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .vector_adapter import to_pg_vector
+
+try:
+    from psycopg2.extras import execute_values
+except Exception:
+    execute_values = None
+
+VECTOR_WRITER_PAGE_SIZE = config("VECTOR_WRITER_PAGE_SIZE", default=500, cast=int)
+VECTOR_WRITER_COPY_THRESHOLD = config("VECTOR_WRITER_COPY_THRESHOLD", default=2000, cast=int)
+
+# table -> owner column
+OWNER_COLUMNS = {
+    "job_embeddings": "job_id",
+    "cv_embeddings": "cv_id",
+}
+
+
+class EmbeddingWriter:
+    def __init__(self, table: str):
+        if table not in OWNER_COLUMNS:
+            raise ValueError(f"Unsupported embedding table: {table}")
+        self.table = table
+        self.owner_column = OWNER_COLUMNS[table]
+        self._replace: List[str] = []
+        self._rows: List[Tuple[str, str, List[float]]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.clear()
+        return False
+
+    def add(self, owner_id, embedding: Iterable[float]):
+        """Buffer one chunk vector for `owner_id`, keeping its existing chunks."""
+        self._rows.append((str(uuid.uuid4()), str(owner_id), embedding))
+
+    def replace(self, owner_id, embeddings: Iterable[Iterable[float]]):
+        """Buffer `embeddings` as the complete new chunk set for `owner_id`."""
+        owner_id = str(owner_id)
+        if owner_id not in self._replace:
+            self._replace.append(owner_id)
+        for emb in embeddings:
+            self.add(owner_id, emb)
+
+    def clear(self):
+        self._replace, self._rows = [], []
+
+    def __len__(self):
+        return len(self._rows)
+
+    def flush(self) -> int:
+        """Write everything buffered in a single transaction; returns rows inserted."""
+        if not self._replace and not self._rows:
+            return 0
+        replace, rows = self._replace, self._rows
+        self.clear()
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                self._flush_pg(replace, rows)
+            else:
+                self._flush_orm(replace, rows)
+        return len(rows)
+
+    def _flush_pg(self, replace: List[str], rows):
+        with connection.cursor() as c:
+            if replace:
+                c.execute(
+                    f"DELETE FROM {self.table} WHERE {self.owner_column} = ANY(%s::uuid[])",
+                    [replace],
+                )
+            if not rows:
+                return
+            if len(rows) >= VECTOR_WRITER_COPY_THRESHOLD and hasattr(c.cursor, "copy_expert"):
+                self._copy(c, rows)
+            elif execute_values is not None:
+                execute_values(
+                    c.cursor,
+                    f"INSERT INTO {self.table} (id, {self.owner_column}, created_at, embedding) VALUES %s",
+                    [(row_id, owner, to_pg_vector(emb)) for row_id, owner, emb in rows],
+                    template="(%s, %s, NOW(), %s)",
+                    page_size=VECTOR_WRITER_PAGE_SIZE,
+                )
+            else:
+                c.executemany(
+                    f"INSERT INTO {self.table} (id, {self.owner_column}, created_at, embedding) VALUES (%s, %s, NOW(), %s)",
+                    [(row_id, owner, to_pg_vector(emb)) for row_id, owner, emb in rows],
+                )
+
+    def _copy(self, c, rows):
+        now = timezone.now().isoformat()
+        buf = io.StringIO()
+        for row_id, owner, emb in rows:
+            buf.write(f"{row_id}\t{owner}\t{now}\t{to_pg_vector(emb).literal()}\n")
+        buf.seek(0)
+        c.cursor.copy_expert(
+            f"COPY {self.table} (id, {self.owner_column}, created_at, embedding) FROM STDIN",
+            buf,
+        )
+
+    def _flush_orm(self, replace: List[str], rows):
+        from .supabase_models import CVEmbedding, JobEmbedding
+        model = JobEmbedding if self.table == "job_embeddings" else CVEmbedding
+        if replace:
+            model.objects.filter(**{f"{self.owner_column}__in": replace}).delete()
+        now = timezone.now()
+        model.objects.bulk_create(
+            [
+                model(id=row_id, created_at=now, embedding=[float(x) for x in emb], **{self.owner_column: owner})
+                for row_id, owner, emb in rows
+            ],
+            batch_size=VECTOR_WRITER_PAGE_SIZE,
+        )
+
+
+def replace_embeddings(table: str, owner_id, embeddings: Iterable[Iterable[float]]) -> int:
+    """Atomically swap the chunk vectors stored for one job or CV."""
+    writer = EmbeddingWriter(table)
+    writer.replace(owner_id, embeddings)
+    return writer.flush()
@@ -21,6 +21,10 @@ django_asgi_app = get_asgi_application()
 
 # Import routing after Django setup
 from api.routing import websocket_urlpatterns
+from api.skill_rerank import warm_up
+
+# Serving processes only: build the rerank skill index before the first request needs it
+warm_up()
 
 # Use AllowedHostsOriginValidator to enforce allowed hosts for websocket origin
 application = ProtocolTypeRouter({
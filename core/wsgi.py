@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Serving processes only: build the rerank skill index before the first request needs it
+from api.skill_rerank import warm_up  # noqa: E402
+
+warm_up()